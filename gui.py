@@ -2,13 +2,19 @@
 
 import sys
 from PySide6.QtWidgets import QApplication
-from gui.gui_main_window import RoastMasterUI
+from gui.gui_main_window import RoastMasterUI, warm_heavy_imports
 
 
 def main():
+    if "--profile" in sys.argv:
+        # Per-phase timing of every prediction, printed to the console
+        from gui import gui_prediction_worker
+        gui_prediction_worker.PROFILE_PREDICTIONS = True
     app = QApplication(sys.argv)
     win = RoastMasterUI()
     win.show()
+    # Window is up; load pandas/matplotlib while the operator picks an option
+    warm_heavy_imports()
     sys.exit(app.exec())
 
 
@@ -14,6 +14,7 @@ from PySide6.QtWidgets import (
 
 from scripts_utility.paths import DATA_FILE
 from scripts_utility.master_order import MASTER_ORDER
+from scripts_main.capture_roast_session import refresh_after_save
 
 
 INV_FILE = os.path.join("data", "coffee_inventory.csv")
@@ -348,6 +349,7 @@ class CaptureRoastSessionGUI(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Save Error", f"Error writing CSV:\n{e}")
             return
+        refresh_after_save()
 
         QMessageBox.information(
             self,
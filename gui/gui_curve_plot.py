@@ -1,31 +1,32 @@
 # gui/gui_curve_plot.py
 
-from typing import Optional, Dict, Any, List
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Tuple
 
+import numpy as np
 import pandas as pd
 from PySide6.QtWidgets import QMainWindow
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgb
 from matplotlib.figure import Figure
 
+from scripts_utility.curve_model import CURVE_POINTS, CurveModel
+from scripts_utility.roast_log import RoastLogVersion, load_roast_log
+from .gui_paths import ROAST_FILE
 
-def extract_curve_from_row(row: pd.Series) -> tuple[List[float], List[float]]:
-    """
-    Build time/temperature lists from a roast_data row.
-    Always returns lists (may be empty); caller decides whether to plot.
-    """
-    times: List[float] = []
-    temps: List[float] = []
+STAGE_TIME_COLS = [f"stage_{i}_time_sec" for i in range(10)]
+STAGE_TEMP_COLS = [f"stage_{i}_temp_f" for i in range(10)]
 
-    for i in range(10):
-        t_key = f"stage_{i}_time_sec"
-        y_key = f"stage_{i}_temp_f"
-        t = row.get(t_key)
-        y = row.get(y_key)
-        if pd.notna(t) and pd.notna(y):
-            times.append(float(t) / 60.0)
-            temps.append(float(y))
+# Above this many historical roasts the overlay is thinned by density
+# (None = always draw every roast)
+HISTORY_DOWNSAMPLE_LIMIT: Optional[int] = 2000
 
-    return times, temps
+# Pixel size of the cached history image and how many layers to keep
+HISTORY_LAYER_SIZE_PX: Tuple[int, int] = (800, 640)
+HISTORY_LAYER_CACHE_SIZE = 16
 
 
 def extract_curve_from_session(session_data: Dict[str, Any]) -> tuple[List[float], List[float]]:
@@ -48,8 +49,324 @@ def extract_curve_from_session(session_data: Dict[str, Any]) -> tuple[List[float
     return times, temps
 
 
+def smooth_curve_from_session(
+    session_data: Dict[str, Any],
+    points: int = CURVE_POINTS,
+) -> tuple[List[float], List[float]]:
+    """
+    extract_curve_from_session joined by a smooth monotone curve
+    (scripts_utility.curve_model). Empty lists if fewer than 2 stage points.
+    """
+    times, temps = extract_curve_from_session(session_data)
+    if len(times) < 2:
+        return [], []
+    curve_t, curve_y = CurveModel.fit(times, temps).sample(points)
+    return curve_t[0].tolist(), curve_y[0].tolist()
+
+
+def extract_curves_from_df(roast_df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Stage time/temp curves for a whole roast log.
+    Returns (times_min, temps_f), both shaped (n_roasts, 10), NaN where missing.
+    """
+    times = roast_df.reindex(columns=STAGE_TIME_COLS).apply(pd.to_numeric, errors="coerce")
+    temps = roast_df.reindex(columns=STAGE_TEMP_COLS).apply(pd.to_numeric, errors="coerce")
+    return times.to_numpy(dtype=float) / 60.0, temps.to_numpy(dtype=float)
+
+
+def curve_rows(times: np.ndarray, temps: np.ndarray) -> np.ndarray:
+    """Row indices of roasts with at least 2 plottable stage points."""
+    valid = ~(np.isnan(times) | np.isnan(temps))
+    return np.flatnonzero(valid.sum(axis=1) >= 2)
+
+
+def build_history_segments(
+    times: np.ndarray,
+    temps: np.ndarray,
+    points: int = CURVE_POINTS,
+) -> np.ndarray:
+    """
+    Turn (n, 10) time/temp arrays into (m, points, 2) polylines for a
+    LineCollection, sampled from a smooth monotone curve through each
+    roast's stage points (missing points are skipped); roasts with fewer
+    than 2 points are dropped.
+    """
+    keep = curve_rows(times, temps)
+    if len(keep) == 0:
+        return np.empty((0, points, 2))
+
+    curve_t, curve_y = CurveModel.fit(times[keep], temps[keep]).sample(points)
+    return np.stack([curve_t, curve_y], axis=-1)
+
+
+def downsample_curves(
+    segments: np.ndarray,
+    max_curves: int,
+    bins: int = 24,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Density-based thinning: bin curves by their drop point (time, temp) and
+    sample with probability inversely proportional to bin density, so crowded
+    typical roasts are thinned while rare outlier curves are kept.
+    """
+    n = len(segments)
+    if n <= max_curves:
+        return segments
+
+    end = segments[:, -1, :]
+    x_edges = np.linspace(end[:, 0].min(), end[:, 0].max() + 1e-9, bins + 1)
+    y_edges = np.linspace(end[:, 1].min(), end[:, 1].max() + 1e-9, bins + 1)
+    xi = np.clip(np.searchsorted(x_edges, end[:, 0], side="right") - 1, 0, bins - 1)
+    yi = np.clip(np.searchsorted(y_edges, end[:, 1], side="right") - 1, 0, bins - 1)
+    cell = xi * bins + yi
+
+    counts = np.bincount(cell, minlength=bins * bins)
+    weights = 1.0 / counts[cell]
+    rng = np.random.default_rng(seed)
+    chosen = rng.choice(n, size=max_curves, replace=False, p=weights / weights.sum())
+    return segments[np.sort(chosen)]
+
+
+def history_segments(roast_df: pd.DataFrame, max_curves: Optional[int]) -> np.ndarray:
+    segments = build_history_segments(*extract_curves_from_df(roast_df))
+    if max_curves is not None:
+        segments = downsample_curves(segments, max_curves)
+    return segments
+
+
+def add_history_collection(
+    ax,
+    roast_df: Optional[pd.DataFrame],
+    *,
+    color: str = "black",
+    alpha: float = 0.25,
+    max_curves: Optional[int] = HISTORY_DOWNSAMPLE_LIMIT,
+) -> Optional[LineCollection]:
+    """Draw every historical roast as one LineCollection (one artist, not one per roast)."""
+    if roast_df is None or len(roast_df) == 0:
+        return None
+
+    segments = history_segments(roast_df, max_curves)
+    if len(segments) == 0:
+        return None
+
+    collection = LineCollection(segments, colors=color, alpha=alpha, linewidths=1.0)
+    ax.add_collection(collection)
+    ax.autoscale_view()
+    return collection
+
+
+# -------------------------------------------------------------------
+# Cached history layer
+#
+# History only changes when a roast is saved, so the roast log is read and
+# the history curves are rasterized once per log version. Report plots then
+# show the cached image and draw only the predicted curve on top.
+#
+# Prediction workers warm these caches off the UI thread while report
+# windows read them on it, so every cache access holds _CACHE_LOCK. The
+# lock only covers the dict operations; reading and rendering happen
+# outside it, so the UI thread never waits on a worker's render.
+# -------------------------------------------------------------------
+
+_CACHE_LOCK = threading.Lock()
+
+
+def load_roast_history(path: str = ROAST_FILE) -> Tuple[Optional[pd.DataFrame], Optional[RoastLogVersion]]:
+    """
+    Read the roast log, reusing the previous DataFrame if the file has not changed
+    (shared with the CLI lookups, see scripts_utility/roast_log.py).
+    Returns (roast_df, version); callers must treat roast_df as read-only.
+    """
+    return load_roast_log(path)
+
+
+_CURVE_ARRAY_CACHE: Dict[RoastLogVersion, Tuple[np.ndarray, np.ndarray]] = {}
+
+
+def history_curve_arrays(
+    roast_df: pd.DataFrame,
+    version: Optional[RoastLogVersion],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (segments, rows) for every plottable roast, where rows[i] is the roast_df
+    row of segments[i]. Cached per roast log version so filtered subsets are
+    just an index into these arrays.
+    """
+    if version is not None:
+        with _CACHE_LOCK:
+            cached = _CURVE_ARRAY_CACHE.get(version)
+        if cached is not None:
+            return cached
+
+    times, temps = extract_curves_from_df(roast_df)
+    arrays = (build_history_segments(times, temps), curve_rows(times, temps))
+    if version is not None:
+        with _CACHE_LOCK:
+            _CURVE_ARRAY_CACHE.clear()  # only the current log version is useful
+            _CURVE_ARRAY_CACHE[version] = arrays
+    return arrays
+
+
+@dataclass
+class HistoryLayer:
+    image: np.ndarray  # RGBA, row 0 at the top
+    extent: Tuple[float, float, float, float]  # (xmin, xmax, ymin, ymax) in data units
+
+
+_HISTORY_LAYER_CACHE: "OrderedDict[tuple, Optional[HistoryLayer]]" = OrderedDict()
+
+
+def rasterize_curves(
+    segments: np.ndarray,
+    extent: Tuple[float, float, float, float],
+    size_px: Tuple[int, int],
+) -> np.ndarray:
+    """
+    Count, per pixel, how many history curves pass through it.
+    Every polyline piece is walked one pixel per step (DDA) for all curves
+    at once, then scattered into a (height, width) count grid with bincount.
+    Lines are thickened to 2 px with a 2x2 box sum, so a single curve
+    usually counts about twice on each pixel it covers.
+    """
+    w, h = size_px
+    xmin, xmax, ymin, ymax = extent
+    px = (segments[:, :, 0] - xmin) / (xmax - xmin) * (w - 2)
+    py = (ymax - segments[:, :, 1]) / (ymax - ymin) * (h - 2)  # row 0 at the top
+
+    x0, y0 = px[:, :-1].ravel(), py[:, :-1].ravel()
+    dx = (px[:, 1:] - px[:, :-1]).ravel()
+    dy = (py[:, 1:] - py[:, :-1]).ravel()
+
+    steps = np.maximum(np.ceil(np.maximum(np.abs(dx), np.abs(dy))).astype(np.int64), 1)
+    piece = np.repeat(np.arange(len(steps)), steps)
+    first_step = np.cumsum(steps) - steps
+    frac = (np.arange(piece.size) - first_step[piece]) / steps[piece]
+
+    xs = np.rint(x0[piece] + frac * dx[piece]).astype(np.int64)
+    ys = np.rint(y0[piece] + frac * dy[piece]).astype(np.int64)
+    # Last vertex of every curve
+    xs = np.concatenate([xs, np.rint(px[:, -1]).astype(np.int64)])
+    ys = np.concatenate([ys, np.rint(py[:, -1]).astype(np.int64)])
+
+    counts = np.bincount(ys * w + xs, minlength=w * h).reshape(h, w)
+    counts[1:] += counts[:-1].copy()
+    counts[:, 1:] += counts[:, :-1].copy()
+    return counts
+
+
+def render_history_layer(
+    segments: np.ndarray,
+    *,
+    color: str,
+    alpha: float,
+    size_px: Tuple[int, int] = HISTORY_LAYER_SIZE_PX,
+) -> HistoryLayer:
+    """
+    Rasterize history polylines into an RGBA image covering their data extent.
+    Pixel opacity is 1 - (1 - alpha) ** n for n overlapping curves, the same
+    result as stacking n translucent lines, without drawing them one by one.
+    """
+    # rasterize_curves counts each curve about twice per pixel
+    hit_alpha = 1.0 - np.sqrt(1.0 - alpha)
+    xmin, ymin = np.nanmin(segments[:, :, 0]), np.nanmin(segments[:, :, 1])
+    xmax, ymax = np.nanmax(segments[:, :, 0]), np.nanmax(segments[:, :, 1])
+    # Pad so edge lines are not clipped in half
+    pad_x = max((xmax - xmin) * 0.01, 0.05)
+    pad_y = max((ymax - ymin) * 0.01, 0.5)
+    extent = (xmin - pad_x, xmax + pad_x, ymin - pad_y, ymax + pad_y)
+
+    counts = rasterize_curves(segments, extent, size_px)
+
+    image = np.empty(counts.shape + (4,), dtype=np.uint8)
+    image[..., :3] = np.round(np.array(to_rgb(color)) * 255).astype(np.uint8)
+    image[..., 3] = np.round((1.0 - (1.0 - hit_alpha) ** counts) * 255).astype(np.uint8)
+
+    return HistoryLayer(image=image, extent=extent)
+
+
+def get_history_layer(
+    roast_df: Optional[pd.DataFrame],
+    version: RoastLogVersion,
+    *,
+    color: str = "black",
+    alpha: float = 0.25,
+    max_curves: Optional[int] = HISTORY_DOWNSAMPLE_LIMIT,
+    row_mask: Optional[np.ndarray] = None,
+    subset_key: Any = None,
+) -> Optional[HistoryLayer]:
+    """
+    Rendered history for this roast log version (rendered on first use, then cached).
+    `row_mask` selects a subset of roast_df rows; `subset_key` must identify it
+    (e.g. the active filter) so each subset gets its own cache entry.
+    """
+    key = (version, color, alpha, max_curves, subset_key)
+    with _CACHE_LOCK:
+        if key in _HISTORY_LAYER_CACHE:
+            _HISTORY_LAYER_CACHE.move_to_end(key)
+            return _HISTORY_LAYER_CACHE[key]
+
+    layer: Optional[HistoryLayer] = None
+    if roast_df is not None and len(roast_df) > 0:
+        segments, rows = history_curve_arrays(roast_df, version)
+        if row_mask is not None:
+            segments = segments[row_mask[rows]]
+        if max_curves is not None:
+            segments = downsample_curves(segments, max_curves)
+        if len(segments) > 0:
+            layer = render_history_layer(segments, color=color, alpha=alpha)
+
+    with _CACHE_LOCK:
+        _HISTORY_LAYER_CACHE[key] = layer
+        while len(_HISTORY_LAYER_CACHE) > HISTORY_LAYER_CACHE_SIZE:
+            _HISTORY_LAYER_CACHE.popitem(last=False)
+    return layer
+
+
+def draw_history(
+    ax,
+    roast_df: Optional[pd.DataFrame],
+    version: Optional[RoastLogVersion] = None,
+    *,
+    color: str = "black",
+    alpha: float = 0.25,
+    row_mask: Optional[np.ndarray] = None,
+    subset_key: Any = None,
+):
+    """
+    Draw the history overlay on `ax`. With a roast log `version` the cached
+    pre-rendered layer is composited as an image; without one the curves are
+    drawn directly as a LineCollection. `row_mask`/`subset_key` restrict the
+    overlay to a subset of roasts (see get_history_layer).
+    """
+    if version is None:
+        if roast_df is not None and row_mask is not None:
+            roast_df = roast_df[row_mask]
+        return add_history_collection(ax, roast_df, color=color, alpha=alpha)
+
+    layer = get_history_layer(
+        roast_df, version, color=color, alpha=alpha, row_mask=row_mask, subset_key=subset_key
+    )
+    if layer is None:
+        return None
+    return ax.imshow(
+        layer.image,
+        extent=layer.extent,
+        origin="upper",
+        aspect="auto",
+        interpolation="antialiased",
+        zorder=0,
+    )
+
+
 class CurvePlotWindow(QMainWindow):
-    def __init__(self, roast_df: Optional[pd.DataFrame], predicted_session: Dict[str, Any]):
+    def __init__(
+        self,
+        roast_df: Optional[pd.DataFrame],
+        predicted_session: Dict[str, Any],
+        history_version: Optional[RoastLogVersion] = None,
+    ):
         super().__init__()
         self.setWindowTitle("Roast Curve – Scout Prediction vs History")
 
@@ -58,17 +375,14 @@ class CurvePlotWindow(QMainWindow):
         ax = canvas.figure.add_subplot(111)
 
         # Historical curves
-        if roast_df is not None and len(roast_df) > 0:
-            for _, row in roast_df.iterrows():
-                t, y = extract_curve_from_row(row)
-                if len(t) >= 2:
-                    ax.plot(t, y, color="black", alpha=0.35)
+        draw_history(ax, roast_df, history_version, alpha=0.35)
 
-        # Predicted curve
+        # Predicted curve (smooth, with the stage points marked)
         if predicted_session:
-            t_pred, y_pred = extract_curve_from_session(predicted_session)
+            t_pred, y_pred = smooth_curve_from_session(predicted_session)
             if len(t_pred) >= 2:
                 ax.plot(t_pred, y_pred, color="red", linewidth=2)
+                ax.plot(*extract_curve_from_session(predicted_session), "o", color="red", markersize=3)
 
         ax.set_xlabel("Time (min)")
         ax.set_ylabel("Bean Temp (°F)")
@@ -0,0 +1,194 @@
+# gui/gui_daily_plan.py
+
+from typing import Dict, Any, Optional, Callable, List, Tuple
+
+from PySide6.QtCore import QThreadPool
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QFormLayout,
+    QLabel,
+    QLineEdit,
+    QPushButton,
+    QMessageBox,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+)
+
+from scripts_utility.roast_defaults import DEFAULT_ENVIRONMENT
+from scripts_main.daily_plan import build_daily_plan, load_daily_plan, usual_batch_weights
+from .gui_prediction_worker import CallableTask
+
+CONDITION_FIELDS = [
+    ("room_temp_f", "Room Temp (°F)"),
+    ("humidity_pct", "Humidity (%)"),
+    ("room_bean_temp_f", "Starting Bean Temp (°F)"),
+]
+
+# (header, model, predicted_session key, kind)
+PLAN_COLUMNS = [
+    ("Scout TP", "scout", "turning_point_time_sec", "time"),
+    ("Scout S8", "scout", "stage_8_time_sec", "time"),
+    ("Scout End °F", "scout", "end_temp_f", "num"),
+    ("Core TP", "core", "turning_point_time_sec", "time"),
+    ("Core S8", "core", "stage_8_time_sec", "time"),
+    ("Core End °F", "core", "end_temp_f", "num"),
+]
+
+
+def _fmt_cell(value: Any, kind: str) -> str:
+    try:
+        v = float(value)
+    except (TypeError, ValueError):
+        return "—"
+    if kind == "time":
+        total = int(round(v))
+        return f"{total // 60:02d}:{total % 60:02d}"
+    return f"{v:.0f}"
+
+
+class DailyPlanWindow(QWidget):
+    """
+    Enter today's conditions once and score every inventory lot at the
+    usual batch weights. The plan is cached, so the Scout/Core forms show
+    a lot's predictions as soon as it is picked from the inventory list.
+
+    model_provider returns a preloaded (Scout payload, Core bundle), or
+    None to load from disk.
+    """
+
+    def __init__(
+        self,
+        model_provider: Optional[Callable[[], Tuple[Any, Any]]] = None,
+        parent: Optional[QWidget] = None,
+    ):
+        super().__init__(parent)
+        self.model_provider = model_provider
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self._task: Optional[CallableTask] = None
+
+        self.setWindowTitle("Today's Roast Plan")
+        self.resize(1000, 500)
+
+        layout = QVBoxLayout(self)
+
+        # --------------------------
+        # Conditions
+        # --------------------------
+        form = QFormLayout()
+        self.inputs: Dict[str, QLineEdit] = {}
+        for key, label in CONDITION_FIELDS:
+            box = QLineEdit()
+            box.setPlaceholderText(f"{DEFAULT_ENVIRONMENT[key]:g}")
+            self.inputs[key] = box
+            form.addRow(label, box)
+
+        self.weights_box = QLineEdit()
+        self.weights_box.setPlaceholderText("comma-separated, e.g. 150, 200")
+        form.addRow("Batch Weights (lbs)", self.weights_box)
+        layout.addLayout(form)
+
+        controls = QHBoxLayout()
+        self.build_btn = QPushButton("Build Plan")
+        self.build_btn.clicked.connect(self.on_build)
+        controls.addWidget(self.build_btn)
+        self.status_label = QLabel("")
+        controls.addWidget(self.status_label, 1)
+        layout.addLayout(controls)
+
+        # --------------------------
+        # Results
+        # --------------------------
+        headers = ["Lot", "Batch (lbs)"] + [c[0] for c in PLAN_COLUMNS]
+        self.table = QTableWidget(0, len(headers))
+        self.table.setHorizontalHeaderLabels(headers)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        layout.addWidget(self.table, 1)
+
+        # Show this morning's plan if it was already built
+        plan = load_daily_plan()
+        if plan is not None:
+            for key, box in self.inputs.items():
+                value = plan["conditions"].get(key)
+                if value is not None:
+                    box.setText(f"{value:g}")
+            self.weights_box.setText(", ".join(f"{w:g}" for w in plan["batch_weights"]))
+            self.show_plan(plan)
+        else:
+            self.weights_box.setText(", ".join(f"{w:g}" for w in usual_batch_weights()))
+
+    # --------------------------
+    # Inputs
+    # --------------------------
+    def _read_inputs(self) -> Optional[Tuple[Dict[str, float], List[float]]]:
+        conditions: Dict[str, float] = {}
+        for key, label in CONDITION_FIELDS:
+            box = self.inputs[key]
+            text = box.text().strip() or box.placeholderText()
+            try:
+                conditions[key] = float(text)
+            except ValueError:
+                box.setStyleSheet("border: 2px solid red;")
+                QMessageBox.warning(self, "Invalid Input", f"{label} must be a number.")
+                return None
+            box.setStyleSheet("")
+
+        try:
+            weights = [float(w) for w in self.weights_box.text().split(",") if w.strip()]
+        except ValueError:
+            QMessageBox.warning(self, "Invalid Input", "Batch weights must be numbers separated by commas.")
+            return None
+        return conditions, weights
+
+    # --------------------------
+    # Build (background)
+    # --------------------------
+    def on_build(self):
+        read = self._read_inputs()
+        if read is None:
+            return
+        conditions, weights = read
+        provider = self.model_provider
+
+        def job() -> Dict[str, Any]:
+            payload, bundle = provider() if provider is not None else (None, None)
+            return build_daily_plan(conditions, weights or None, payload=payload, bundle=bundle)
+
+        self._task = CallableTask(job)
+        self._task.setAutoDelete(False)
+        self._task.signals.finished.connect(self._on_result)
+        self._task.signals.failed.connect(self._on_error)
+        self.build_btn.setEnabled(False)
+        self.status_label.setText("Scoring every lot…")
+        self.pool.start(self._task)
+
+    def _on_error(self, message: str):
+        self.build_btn.setEnabled(True)
+        self.status_label.setText("")
+        QMessageBox.critical(self, "Roast Plan Error", f"Error building today's plan:\n{message}")
+
+    def _on_result(self, plan: Dict[str, Any]):
+        self.build_btn.setEnabled(True)
+        self.show_plan(plan)
+
+    def show_plan(self, plan: Dict[str, Any]):
+        entries = plan.get("entries", [])
+        self.status_label.setText(
+            f"{len(entries)} plans for {plan['plan_date']} (built {plan['built_at'][11:16]}, "
+            f"{plan['elapsed_sec']:.2f}s) — pick a lot in the Scout/Core forms to see its prediction"
+        )
+
+        self.table.setRowCount(len(entries))
+        for r, entry in enumerate(entries):
+            cells = [entry["label"], f"{entry['batch_weight_lbs']:g}"]
+            for _header, model, key, kind in PLAN_COLUMNS:
+                prediction = entry.get(model) or {}
+                cells.append(_fmt_cell(prediction.get("predicted_session", {}).get(key), kind))
+            for c, text in enumerate(cells):
+                self.table.setItem(r, c, QTableWidgetItem(text))
+        self.table.resizeColumnsToContents()
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
@@ -0,0 +1,357 @@
+# gui/gui_history_filter.py
+
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Any, Optional, List, Tuple
+
+import numpy as np
+import pandas as pd
+from PySide6.QtCore import Signal
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QGridLayout,
+    QLabel,
+    QComboBox,
+    QLineEdit,
+)
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+from .gui_curve_plot import (
+    RoastLogVersion,
+    build_history_segments,
+    draw_history,
+    extract_curve_from_session,
+    extract_curves_from_df,
+    smooth_curve_from_session,
+)
+
+# -------------------------------------------------------------------
+# Filter definitions
+# -------------------------------------------------------------------
+
+CATEGORY_COLS = ["process_method", "country", "supplier"]
+
+# (label, low inclusive, high exclusive); None = open-ended
+BATCH_WEIGHT_BANDS: List[Tuple[str, Optional[float], Optional[float]]] = [
+    ("< 150 lbs", None, 150),
+    ("150–249 lbs", 150, 250),
+    ("250–349 lbs", 250, 350),
+    ("350–449 lbs", 350, 450),
+    ("450+ lbs", 450, None),
+]
+
+ROOM_TEMP_BANDS: List[Tuple[str, Optional[float], Optional[float]]] = [
+    ("< 50 °F", None, 50),
+    ("50–59 °F", 50, 60),
+    ("60–69 °F", 60, 70),
+    ("70–79 °F", 70, 80),
+    ("80+ °F", 80, None),
+]
+
+
+@dataclass(frozen=True)
+class HistoryFilter:
+    """Active overlay filter. Frozen so it can key the rendered-layer cache."""
+    process_method: Optional[str] = None
+    country: Optional[str] = None
+    supplier: Optional[str] = None
+    batch_band: Optional[int] = None
+    room_temp_band: Optional[int] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+    def is_active(self) -> bool:
+        return any(v is not None for v in vars(self).values())
+
+
+def _normalize_category(series: pd.Series) -> np.ndarray:
+    vals = series.astype(str).str.strip().str.lower()
+    return vals.where(~vals.isin(["", "nan", "none"]), "").to_numpy()
+
+
+def _band_masks(values: np.ndarray, bands) -> List[np.ndarray]:
+    masks = []
+    for _, low, high in bands:
+        mask = ~np.isnan(values)
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values < high
+        masks.append(mask)
+    return masks
+
+
+class HistoryIndex:
+    """
+    Precomputed bitmaps over the roast log: one boolean mask per category
+    value and per numeric band, plus roast dates as day numbers. Selecting
+    a filter is just AND-ing a few of these arrays.
+    """
+
+    def __init__(self, roast_df: pd.DataFrame):
+        self.n_rows = len(roast_df)
+        self.category_masks: Dict[str, Dict[str, np.ndarray]] = {}
+
+        for col in CATEGORY_COLS:
+            if col not in roast_df.columns:
+                self.category_masks[col] = {}
+                continue
+            vals = _normalize_category(roast_df[col])
+            self.category_masks[col] = {v: vals == v for v in sorted(set(vals)) if v}
+
+        def numeric(col: str) -> np.ndarray:
+            if col not in roast_df.columns:
+                return np.full(self.n_rows, np.nan)
+            return pd.to_numeric(roast_df[col], errors="coerce").to_numpy(dtype=float)
+
+        self.batch_band_masks = _band_masks(numeric("batch_weight_lbs"), BATCH_WEIGHT_BANDS)
+        self.room_temp_band_masks = _band_masks(numeric("room_temp_f"), ROOM_TEMP_BANDS)
+
+        if "roast_date" in roast_df.columns:
+            dates = pd.to_datetime(roast_df["roast_date"], errors="coerce")
+            self.has_date = dates.notna().to_numpy()
+            self.date_days = dates.to_numpy(dtype="datetime64[D]").astype(np.int64)
+        else:
+            self.has_date = np.zeros(self.n_rows, dtype=bool)
+            self.date_days = np.zeros(self.n_rows, dtype=np.int64)
+
+    def values(self, col: str) -> List[str]:
+        return list(self.category_masks.get(col, {}).keys())
+
+    def mask(self, history_filter: HistoryFilter) -> np.ndarray:
+        mask = np.ones(self.n_rows, dtype=bool)
+        empty = np.zeros(self.n_rows, dtype=bool)
+
+        for col in CATEGORY_COLS:
+            value = getattr(history_filter, col)
+            if value is not None:
+                mask &= self.category_masks[col].get(value, empty)
+
+        if history_filter.batch_band is not None:
+            mask &= self.batch_band_masks[history_filter.batch_band]
+        if history_filter.room_temp_band is not None:
+            mask &= self.room_temp_band_masks[history_filter.room_temp_band]
+
+        if history_filter.date_from is not None or history_filter.date_to is not None:
+            mask &= self.has_date
+            if history_filter.date_from is not None:
+                mask &= self.date_days >= np.datetime64(history_filter.date_from, "D").astype(np.int64)
+            if history_filter.date_to is not None:
+                mask &= self.date_days <= np.datetime64(history_filter.date_to, "D").astype(np.int64)
+
+        return mask
+
+
+_INDEX_CACHE: Dict[RoastLogVersion, HistoryIndex] = {}
+# Prediction workers build the index off the UI thread; the lock covers the dict only
+_INDEX_LOCK = threading.Lock()
+
+
+def get_history_index(roast_df: pd.DataFrame, version: Optional[RoastLogVersion]) -> HistoryIndex:
+    """HistoryIndex for this roast log version (built once per version, from any thread)."""
+    if version is None:
+        return HistoryIndex(roast_df)
+    with _INDEX_LOCK:
+        index = _INDEX_CACHE.get(version)
+    if index is None:
+        index = HistoryIndex(roast_df)
+        with _INDEX_LOCK:
+            _INDEX_CACHE.clear()
+            _INDEX_CACHE[version] = index
+    return index
+
+
+# -------------------------------------------------------------------
+# Widgets
+# -------------------------------------------------------------------
+
+def _parse_date(text: str) -> Optional[date]:
+    text = text.strip()
+    if not text:
+        return None
+    try:
+        return datetime.strptime(text, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+class HistoryFilterPanel(QWidget):
+    """Filter controls for the history overlay; emits filters_changed(HistoryFilter)."""
+
+    filters_changed = Signal(object)
+
+    def __init__(self, index: HistoryIndex, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        grid = QGridLayout(self)
+        grid.setContentsMargins(0, 0, 0, 0)
+
+        def combo(items: List[str]) -> QComboBox:
+            box = QComboBox()
+            box.addItem("All", userData=None)
+            for i, item in enumerate(items):
+                box.addItem(item, userData=i)
+            box.currentIndexChanged.connect(self._emit)
+            return box
+
+        self.category_boxes: Dict[str, QComboBox] = {}
+        for col in CATEGORY_COLS:
+            box = QComboBox()
+            box.addItem("All", userData=None)
+            for value in index.values(col):
+                box.addItem(value, userData=value)
+            box.currentIndexChanged.connect(self._emit)
+            self.category_boxes[col] = box
+
+        self.batch_box = combo([label for label, _, _ in BATCH_WEIGHT_BANDS])
+        self.room_temp_box = combo([label for label, _, _ in ROOM_TEMP_BANDS])
+
+        self.date_from = QLineEdit()
+        self.date_from.setPlaceholderText("From YYYY-MM-DD")
+        self.date_to = QLineEdit()
+        self.date_to.setPlaceholderText("To YYYY-MM-DD")
+        for box in (self.date_from, self.date_to):
+            box.editingFinished.connect(self._emit)
+
+        rows = [
+            ("Process", self.category_boxes["process_method"], "Country", self.category_boxes["country"]),
+            ("Supplier", self.category_boxes["supplier"], "Batch", self.batch_box),
+            ("Room Temp", self.room_temp_box, "Dates", None),
+        ]
+        for r, (l1, w1, l2, w2) in enumerate(rows):
+            grid.addWidget(QLabel(l1), r, 0)
+            grid.addWidget(w1, r, 1)
+            grid.addWidget(QLabel(l2), r, 2)
+            if w2 is not None:
+                grid.addWidget(w2, r, 3)
+        date_row = QWidget()
+        date_layout = QGridLayout(date_row)
+        date_layout.setContentsMargins(0, 0, 0, 0)
+        date_layout.addWidget(self.date_from, 0, 0)
+        date_layout.addWidget(self.date_to, 0, 1)
+        grid.addWidget(date_row, 2, 3)
+
+    def current_filter(self) -> HistoryFilter:
+        return HistoryFilter(
+            process_method=self.category_boxes["process_method"].currentData(),
+            country=self.category_boxes["country"].currentData(),
+            supplier=self.category_boxes["supplier"].currentData(),
+            batch_band=self.batch_box.currentData(),
+            room_temp_band=self.room_temp_box.currentData(),
+            date_from=_parse_date(self.date_from.text()),
+            date_to=_parse_date(self.date_to.text()),
+        )
+
+    def _emit(self, *_):
+        self.filters_changed.emit(self.current_filter())
+
+
+class HistoryCurvePanel(QWidget):
+    """
+    Curve plot used by the report dialogs: filter controls on top, then the
+    (cached) history layer with the predicted curve drawn over it.
+    `highlight` (roast_df row labels, e.g. the most similar roasts) are
+    drawn in `highlight_color` regardless of the filter.
+    """
+
+    def __init__(
+        self,
+        roast_df: Optional[pd.DataFrame],
+        history_version: Optional[RoastLogVersion],
+        predicted_session: Dict[str, Any],
+        title: str,
+        parent: Optional[QWidget] = None,
+        highlight: Optional[pd.Index] = None,
+        highlight_color: str = "tab:blue",
+    ):
+        super().__init__(parent)
+        self.roast_df = roast_df
+        self.history_version = history_version
+        self.predicted_session = predicted_session
+        self.title = title
+        # label -> (segments, color)
+        self.highlights: Dict[str, Tuple[np.ndarray, str]] = {}
+        if highlight is not None:
+            self._set_segments("Most similar roasts", highlight, highlight_color)
+        self.history_filter = HistoryFilter()
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.index: Optional[HistoryIndex] = None
+        if roast_df is not None and len(roast_df) > 0:
+            self.index = get_history_index(roast_df, history_version)
+            self.filter_panel = HistoryFilterPanel(self.index)
+            self.filter_panel.filters_changed.connect(self.set_filter)
+            layout.addWidget(self.filter_panel)
+
+        self.count_label = QLabel("")
+        layout.addWidget(self.count_label)
+
+        self.canvas = FigureCanvasQTAgg(Figure(figsize=(5, 4)))
+        layout.addWidget(self.canvas, 1)
+        self.ax = self.canvas.figure.add_subplot(111)
+
+        self.redraw()
+
+    def _set_segments(self, label: str, rows: pd.Index, color: str) -> None:
+        if self.roast_df is None or len(rows) == 0:
+            self.highlights.pop(label, None)
+            return
+        segments = build_history_segments(*extract_curves_from_df(self.roast_df.loc[rows]))
+        self.highlights[label] = (segments, color)
+
+    def set_highlight(self, label: str, rows: pd.Index, color: str) -> None:
+        """Highlight roast_df rows (labels) as one legend entry, replacing any earlier set with that label."""
+        self._set_segments(label, rows, color)
+        self.redraw()
+
+    def set_filter(self, history_filter: HistoryFilter) -> None:
+        self.history_filter = history_filter
+        self.redraw()
+
+    def redraw(self) -> None:
+        ax = self.ax
+        ax.clear()
+
+        row_mask = None
+        if self.index is not None:
+            total = self.index.n_rows
+            if self.history_filter.is_active():
+                row_mask = self.index.mask(self.history_filter)
+                self.count_label.setText(f"Showing {int(row_mask.sum())} of {total} historical roasts")
+            else:
+                self.count_label.setText(f"Showing all {total} historical roasts")
+
+        # Historical curves (cached layer per log version + filter)
+        draw_history(
+            ax,
+            self.roast_df,
+            self.history_version,
+            row_mask=row_mask,
+            subset_key=self.history_filter if row_mask is not None else None,
+        )
+
+        # Highlighted roasts (e.g. most similar)
+        for label, (segments, color) in self.highlights.items():
+            if len(segments) > 0:
+                ax.add_collection(LineCollection(segments, colors=color, linewidths=1.5, alpha=0.9, label=label))
+                ax.autoscale_view()
+
+        # Predicted curve
+        t_pred, y_pred = smooth_curve_from_session(self.predicted_session)
+        if len(t_pred) > 1:
+            ax.plot(t_pred, y_pred, color="red", linewidth=2, label="Predicted")
+            ax.plot(*extract_curve_from_session(self.predicted_session), "o", color="red", markersize=3)
+        if self.highlights:
+            ax.legend(loc="lower right", fontsize="small")
+
+        ax.set_xlabel("Time (min)")
+        ax.set_ylabel("Bean Temp (°F)")
+        ax.set_title(self.title)
+        ax.grid(True, alpha=0.2)
+
+        self.canvas.draw_idle()
@@ -16,11 +16,17 @@ from PySide6.QtWidgets import (
     QComboBox,
     QPushButton,
     QMessageBox,
+    QProgressBar,
 )
 
 # Local curve + report
 from .gui_curve_plot import CurvePlotWindow
 from .gui_print_core_report import open_core_report_dialog
+from .gui_prediction_worker import PredictionRunner
+from .gui_live_preview import LivePreviewPanel
+from .gui_what_if_sweep import open_what_if_sweep
+from scripts_utility.roast_defaults import form_defaults
+from scripts_main.infer_core import core_uses_profile
 
 # -------------------------------------------------------------------
 # Paths
@@ -33,25 +39,12 @@ ROAST_PATH = os.path.join("data", "roast_data.csv")
 # Default stage values (so you can just tweak instead of typing)
 # -------------------------------------------------------------------
 
-# Typical bean-temp curve you were already using in your samples
-STAGE_TEMP_DEFAULTS: Dict[int, str] = {
-    1: "300",
-    2: "320",
-    3: "340",
-    4: "360",
-    5: "380",
-    6: "400",
-    7: "430",
-    8: "445",
-    9: "455",
-}
-
-# Default key anchors for Core (MMSS)
-STAGE_TIME_MMSS_DEFAULTS: Dict[int, str] = {
-    1: "0400",  # 4:00
-    6: "0800",  # 8:00
-    9: "1100",  # 11:00
-}
+# Typical bean-temp curve, anchor times (MMSS) and conditions; shared with
+# the Scout form and the CLI planners (scripts_utility/roast_defaults.py)
+FORM_DEFAULTS: Dict[str, str] = form_defaults()
+
+# Stages whose times Core predicts; times typed here become burner solver targets
+SOLVER_TARGET_STAGES = (2, 3, 4, 5, 7, 8)
 
 # -------------------------------------------------------------------
 # Helpers
@@ -82,6 +75,32 @@ def parse_date_yyyy_mm_dd(s: Optional[str]) -> Optional[date]:
         return None
 
 
+def seconds_to_mmss(sec: Optional[float]) -> str:
+    if sec is None:
+        return "n/a"
+    total = int(round(sec))
+    return f"{total // 60:02d}:{total % 60:02d}"
+
+
+def burner_plan_summary_html(plan: Any) -> str:
+    """Target vs. predicted times and solver stats for a BurnerPlan."""
+    lines = ["<b>Burner Recommendation</b><br>"]
+    for key, target in plan.target_times.items():
+        label = key.replace("_time_sec", "").replace("_", " ").title()
+        if key in plan.predicted_times:
+            lines.append(
+                f"{label}: target {seconds_to_mmss(target)} → predicted "
+                f"{seconds_to_mmss(plan.predicted_times[key])}<br>"
+            )
+        else:
+            lines.append(f"{label}: {seconds_to_mmss(target)} (anchor input)<br>")
+    lines.append(
+        f"Mean error: {plan.mean_abs_error_sec:.1f} s — "
+        f"{plan.evaluations} plans scored in {plan.elapsed_sec:.2f} s<br>"
+    )
+    return "".join(lines)
+
+
 def load_inventory_rows() -> List[Dict[str, Any]]:
     if not os.path.exists(INVENTORY_PATH):
         return []
@@ -108,12 +127,18 @@ class CoreInputSessionWindow(QWidget):
         (predicted_session, confidence, ml_filled_fields)
     """
 
-    def __init__(self, submit_callback: Callable[[Dict[str, Any]], Any]):
+    def __init__(
+        self,
+        submit_callback: Callable[[Dict[str, Any]], Any],
+        model_provider: Optional[Callable[[], Any]] = None,
+    ):
         super().__init__()
         self.setWindowTitle("Core Input – Roast Prediction (Big Model)")
         self.resize(900, 750)
 
         self._submit_callback = submit_callback
+        # returns a preloaded Core bundle for the what-if sweep (None = load from disk)
+        self._model_provider = model_provider
         self._child_windows: List[QWidget] = []  # keep plot/report alive
 
         # key -> QLineEdit
@@ -210,6 +235,12 @@ class CoreInputSessionWindow(QWidget):
             "Roast Date [Blank = Today] (YYYY-MM-DD)",
             placeholder="YYYY-MM-DD (blank = today)",
         )
+        if core_uses_profile():
+            add_field(
+                "profile_id",
+                "Roast Profile [Optional] (e.g. P3)",
+                placeholder="from python -m scripts_main.roast_profiles",
+            )
 
         # --------------------------
         # Environment
@@ -218,11 +249,11 @@ class CoreInputSessionWindow(QWidget):
         form_layout.addRow(QLabel("Environment / Batch (required)"))
         form_layout.addRow(QLabel(""))
 
-        add_field("room_temp_f", "Room Temp (°F)", default="70")
-        add_field("humidity_pct", "Humidity (%)", default="50")
-        add_field("bean_temp_start_f", "Starting Bean Temp (°F)", default="70")
-        add_field("green_bean_moisture_pct", "Green Bean Moisture (%)", default="10.0")
-        add_field("batch_weight_lbs", "Batch Weight (lbs)", default="200")
+        add_field("room_temp_f", "Room Temp (°F)", default=FORM_DEFAULTS["room_temp_f"])
+        add_field("humidity_pct", "Humidity (%)", default=FORM_DEFAULTS["humidity_pct"])
+        add_field("bean_temp_start_f", "Starting Bean Temp (°F)", default=FORM_DEFAULTS["room_bean_temp_f"])
+        add_field("green_bean_moisture_pct", "Green Bean Moisture (%)", default=FORM_DEFAULTS["green_bean_moisture_pct"])
+        add_field("batch_weight_lbs", "Batch Weight (lbs)", default=FORM_DEFAULTS["batch_weight_lbs"])
 
         # --------------------------
         # Stage 0 (Charge)
@@ -234,7 +265,7 @@ class CoreInputSessionWindow(QWidget):
         add_field(
             "stage_0_temp_f",
             "Stage 0 – Bean Temp (°F) [Required]",
-            default="400",
+            default=FORM_DEFAULTS["stage_0_temp_f"],
         )
         add_field(
             "stage_0_burner_pct",
@@ -271,7 +302,7 @@ class CoreInputSessionWindow(QWidget):
             form_layout.addRow(QLabel(""))
 
             # Temps: required for 1–9 in Core, with defaults
-            temp_default = STAGE_TEMP_DEFAULTS.get(i)
+            temp_default = FORM_DEFAULTS.get(f"stage_{i}_temp_f")
             add_field(
                 f"stage_{i}_temp_f",
                 f"Stage {i} – Bean Temp (°F) [Required]",
@@ -287,7 +318,7 @@ class CoreInputSessionWindow(QWidget):
             # Times: required for stages 1,6,9; optional otherwise, with defaults on required
             if i in (1, 6, 9):
                 label = f"Stage {i} – Time (MMSS, e.g. 1230 for 12:30) [Required]"
-                time_default = STAGE_TIME_MMSS_DEFAULTS.get(i)
+                time_default = FORM_DEFAULTS.get(f"stage_{i}_time_mmss")
             else:
                 label = f"Stage {i} – Time (MMSS, e.g. 1230 for 12:30) [Optional]"
                 time_default = None
@@ -320,24 +351,86 @@ class CoreInputSessionWindow(QWidget):
         # --------------------------
         btn_row = QHBoxLayout()
         btn_run = QPushButton("Run Core Prediction")
+        btn_sweep = QPushButton("What-if Sweep…")
+        btn_burners = QPushButton("Recommend Burners…")
+        btn_burners.setToolTip(
+            "Enter target times for any of stages 2, 3, 4, 5, 7, 8 and leave the "
+            "burners to recommend blank."
+        )
         btn_cancel = QPushButton("Cancel")
 
         btn_run.clicked.connect(self.on_submit)
+        btn_sweep.clicked.connect(self.on_what_if_sweep)
+        btn_burners.clicked.connect(self.on_recommend_burners)
         btn_cancel.clicked.connect(self.close)
 
         btn_row.addWidget(btn_run)
+        btn_row.addWidget(btn_sweep)
+        btn_row.addWidget(btn_burners)
         btn_row.addWidget(btn_cancel)
         outer_layout.addLayout(btn_row)
 
+        # Busy indicator while the model runs in the background
+        self.busy_bar = QProgressBar()
+        self.busy_bar.setRange(0, 0)
+        self.busy_bar.setTextVisible(False)
+        self.busy_bar.hide()
+        outer_layout.addWidget(self.busy_bar)
+
+        # Live preview: debounced background prediction on every edit
+        self.live_preview = LivePreviewPanel(
+            self._submit_callback,
+            lambda: self._collect_session_data(quiet=True),
+        )
+        outer_layout.addWidget(self.live_preview)
+        for box in self.inputs.values():
+            box.textChanged.connect(self.live_preview.schedule)
+        self.inventory_combo.currentIndexChanged.connect(self.live_preview.schedule)
+        # Lots in today's roast plan show their prediction without running a model
+        self.inventory_combo.currentIndexChanged.connect(self._show_planned_prediction)
+
         self.setLayout(outer_layout)
 
+        # Prediction + history load run off the UI thread
+        self.prediction_runner = PredictionRunner(self._submit_callback, ROAST_PATH, self)
+        self.prediction_runner.result_ready.connect(self.on_prediction_ready)
+        self.prediction_runner.error.connect(self.on_prediction_error)
+        self.prediction_runner.busy_changed.connect(self.busy_bar.setVisible)
+
+        # Burner solver runs on its own worker (it takes a couple of seconds)
+        self.burner_runner = PredictionRunner(self._run_burner_solver, ROAST_PATH, self)
+        self.burner_runner.result_ready.connect(self.on_burner_plan_ready)
+        self.burner_runner.error.connect(self.on_burner_plan_error)
+        self.burner_runner.busy_changed.connect(self.busy_bar.setVisible)
+
+    def _show_planned_prediction(self, *_):
+        try:
+            weight = float(self.inputs["batch_weight_lbs"].text().strip())
+        except ValueError:
+            weight = None
+        self.live_preview.show_plan_entry("core", self.inventory_combo.currentData(), weight)
+
     # ------------------------------------------------------------------
-    # Submit → build session_data, call callback, show report + curve
+    # Form → session_data (shared by Submit and live preview)
     # ------------------------------------------------------------------
-    def on_submit(self):
-        # Clear any old red borders
-        for box in self.inputs.values():
-            box.setStyleSheet("")
+    def _mark_invalid(self, key: str, quiet: bool) -> None:
+        if not quiet:
+            self.inputs[key].setStyleSheet("border: 2px solid red;")
+
+    def _warn(self, title: str, msg: str, quiet: bool) -> None:
+        if not quiet:
+            QMessageBox.warning(self, title, msg)
+
+    def _collect_session_data(self, quiet: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Validate the form and build session_data.
+        Returns None if the form is incomplete/invalid. With quiet=True
+        (live preview) no borders or message boxes are shown.
+        """
+        if not quiet:
+            # Clear any old red borders
+            for box in self.inputs.values():
+                box.setStyleSheet("")
 
         session_data: Dict[str, Any] = {}
         missing_fields: List[str] = []
@@ -352,13 +445,9 @@ class CoreInputSessionWindow(QWidget):
         if roast_date_text:
             rd = parse_date_yyyy_mm_dd(roast_date_text)
             if rd is None:
-                self.inputs["roast_date"].setStyleSheet("border: 2px solid red;")
-                QMessageBox.warning(
-                    self,
-                    "Invalid Roast Date",
-                    "Roast date must be YYYY-MM-DD or blank.",
-                )
-                return
+                self._mark_invalid("roast_date", quiet)
+                self._warn("Invalid Roast Date", "Roast date must be YYYY-MM-DD or blank.", quiet)
+                return None
             # Core uses datetime
             session_data["roast_date"] = datetime.combine(rd, datetime.min.time())
         else:
@@ -409,48 +498,36 @@ class CoreInputSessionWindow(QWidget):
             raw = session_data.get(key)
             if raw is None:
                 missing_fields.append(key)
-                self.inputs[key].setStyleSheet("border: 2px solid red;")
+                self._mark_invalid(key, quiet)
                 continue
             try:
                 session_data[key] = float(raw)
             except Exception:
-                self.inputs[key].setStyleSheet("border: 2px solid red;")
-                QMessageBox.warning(
-                    self,
-                    "Invalid Input",
-                    f"{key} must be a number.",
-                )
-                return
+                self._mark_invalid(key, quiet)
+                self._warn("Invalid Input", f"{key} must be a number.", quiet)
+                return None
 
         # 5) Stage 0
         s0_temp_raw = session_data.get("stage_0_temp_f")
         if not s0_temp_raw:
             missing_fields.append("stage_0_temp_f")
-            self.inputs["stage_0_temp_f"].setStyleSheet("border: 2px solid red;")
+            self._mark_invalid("stage_0_temp_f", quiet)
         else:
             try:
                 session_data["stage_0_temp_f"] = float(s0_temp_raw)
             except Exception:
-                self.inputs["stage_0_temp_f"].setStyleSheet("border: 2px solid red;")
-                QMessageBox.warning(
-                    self,
-                    "Invalid Input",
-                    "Stage 0 temp must be a number.",
-                )
-                return
+                self._mark_invalid("stage_0_temp_f", quiet)
+                self._warn("Invalid Input", "Stage 0 temp must be a number.", quiet)
+                return None
 
         s0_burn_raw = session_data.get("stage_0_burner_pct")
         if s0_burn_raw is not None:
             try:
                 session_data["stage_0_burner_pct"] = float(s0_burn_raw)
             except Exception:
-                self.inputs["stage_0_burner_pct"].setStyleSheet("border: 2px solid red;")
-                QMessageBox.warning(
-                    self,
-                    "Invalid Input",
-                    "Stage 0 burner must be a number if provided.",
-                )
-                return
+                self._mark_invalid("stage_0_burner_pct", quiet)
+                self._warn("Invalid Input", "Stage 0 burner must be a number if provided.", quiet)
+                return None
 
         session_data["stage_0_time_sec"] = 0.0
 
@@ -460,25 +537,17 @@ class CoreInputSessionWindow(QWidget):
             try:
                 session_data["turning_point_temp_f"] = float(tp_temp_raw)
             except Exception:
-                self.inputs["turning_point_temp_f"].setStyleSheet("border: 2px solid red;")
-                QMessageBox.warning(
-                    self,
-                    "Invalid Input",
-                    "Turning point temp must be a number.",
-                )
-                return
+                self._mark_invalid("turning_point_temp_f", quiet)
+                self._warn("Invalid Input", "Turning point temp must be a number.", quiet)
+                return None
 
         tp_mmss = session_data.get("turning_point_time_mmss")
         if tp_mmss:
             tp_sec = mmss_to_seconds(tp_mmss)
             if tp_sec is None:
-                self.inputs["turning_point_time_mmss"].setStyleSheet("border: 2px solid red;")
-                QMessageBox.warning(
-                    self,
-                    "Invalid Input",
-                    "Turning point time must be MMSS (e.g. 0430).",
-                )
-                return
+                self._mark_invalid("turning_point_time_mmss", quiet)
+                self._warn("Invalid Input", "Turning point time must be MMSS (e.g. 0430).", quiet)
+                return None
             session_data["turning_point_time_sec"] = tp_sec
 
         session_data.pop("turning_point_time_mmss", None)
@@ -489,18 +558,14 @@ class CoreInputSessionWindow(QWidget):
             t_raw = session_data.get(temp_key)
             if not t_raw:
                 missing_fields.append(temp_key)
-                self.inputs[temp_key].setStyleSheet("border: 2px solid red;")
+                self._mark_invalid(temp_key, quiet)
             else:
                 try:
                     session_data[temp_key] = float(t_raw)
                 except Exception:
-                    self.inputs[temp_key].setStyleSheet("border: 2px solid red;")
-                    QMessageBox.warning(
-                        self,
-                        "Invalid Input",
-                        f"{temp_key} must be a number.",
-                    )
-                    return
+                    self._mark_invalid(temp_key, quiet)
+                    self._warn("Invalid Input", f"{temp_key} must be a number.", quiet)
+                    return None
 
             burn_key = f"stage_{i}_burner_pct"
             b_raw = session_data.get(burn_key)
@@ -508,13 +573,9 @@ class CoreInputSessionWindow(QWidget):
                 try:
                     session_data[burn_key] = float(b_raw)
                 except Exception:
-                    self.inputs[burn_key].setStyleSheet("border: 2px solid red;")
-                    QMessageBox.warning(
-                        self,
-                        "Invalid Input",
-                        f"{burn_key} must be a number if provided.",
-                    )
-                    return
+                    self._mark_invalid(burn_key, quiet)
+                    self._warn("Invalid Input", f"{burn_key} must be a number if provided.", quiet)
+                    return None
 
             mmss_key = f"stage_{i}_time_mmss"
             mmss_raw = session_data.get(mmss_key)
@@ -522,29 +583,21 @@ class CoreInputSessionWindow(QWidget):
             if i in (1, 6, 9):
                 if not mmss_raw:
                     missing_fields.append(mmss_key)
-                    self.inputs[mmss_key].setStyleSheet("border: 2px solid red;")
+                    self._mark_invalid(mmss_key, quiet)
                 else:
                     sec = mmss_to_seconds(mmss_raw)
                     if sec is None:
-                        self.inputs[mmss_key].setStyleSheet("border: 2px solid red;")
-                        QMessageBox.warning(
-                            self,
-                            "Invalid Input",
-                            f"{mmss_key} must be MMSS (e.g. 0430).",
-                        )
-                        return
+                        self._mark_invalid(mmss_key, quiet)
+                        self._warn("Invalid Input", f"{mmss_key} must be MMSS (e.g. 0430).", quiet)
+                        return None
                     session_data[f"stage_{i}_time_sec"] = sec
             else:
                 if mmss_raw:
                     sec = mmss_to_seconds(mmss_raw)
                     if sec is None:
-                        self.inputs[mmss_key].setStyleSheet("border: 2px solid red;")
-                        QMessageBox.warning(
-                            self,
-                            "Invalid Input",
-                            f"{mmss_key} must be MMSS (e.g. 0430) if provided.",
-                        )
-                        return
+                        self._mark_invalid(mmss_key, quiet)
+                        self._warn("Invalid Input", f"{mmss_key} must be MMSS (e.g. 0430) if provided.", quiet)
+                        return None
                     session_data[f"stage_{i}_time_sec"] = sec
 
             session_data.pop(mmss_key, None)
@@ -567,44 +620,98 @@ class CoreInputSessionWindow(QWidget):
             try:
                 session_data[key] = float(raw)
             except Exception:
-                self.inputs[key].setStyleSheet("border: 2px solid red;")
-                QMessageBox.warning(
-                    self,
-                    "Invalid Input",
-                    f"{key} must be a number if provided.",
-                )
-                return
+                self._mark_invalid(key, quiet)
+                self._warn("Invalid Input", f"{key} must be a number if provided.", quiet)
+                return None
 
         # 9) Check missing required fields
         if missing_fields:
             msg = "These fields are required:\n" + "\n".join(f"- {f}" for f in missing_fields)
-            QMessageBox.warning(self, "Missing Required Fields", msg)
+            self._warn("Missing Required Fields", msg, quiet)
+            return None
+
+        return session_data
+
+    # ------------------------------------------------------------------
+    # Submit → build session_data, call callback, show report + curve
+    # ------------------------------------------------------------------
+    def on_submit(self):
+        session_data = self._collect_session_data()
+        if session_data is None:
             return
 
-        # 10) Run Core via callback
-        try:
-            predicted_session, confidence, ml_filled_fields = self._submit_callback(session_data)
-        except Exception as e:
-            QMessageBox.critical(self, "Core Error", f"Error running Core model:\n{e}")
+        # 10) Run Core in the background (repeated clicks coalesce);
+        #     history is loaded by the worker as well
+        self.prediction_runner.submit(session_data)
+
+    def on_what_if_sweep(self):
+        session_data = self._collect_session_data()
+        if session_data is None:
             return
+        open_what_if_sweep(self._child_windows, session_data, "core", self._model_provider)
 
-        # 11) Load roast_data.csv for history
-        roast_df: Optional[pd.DataFrame] = None
-        try:
-            if os.path.exists(ROAST_PATH):
-                roast_df = pd.read_csv(ROAST_PATH)
-        except Exception as e:
-            print("Error loading roast_data.csv:", e)
+    def on_recommend_burners(self):
+        session_data = self._collect_session_data()
+        if session_data is None:
+            return
+        if not any(session_data.get(f"stage_{i}_time_sec") is not None for i in SOLVER_TARGET_STAGES):
+            QMessageBox.warning(
+                self,
+                "No Target Times",
+                "Enter a target time for at least one of stages "
+                + ", ".join(str(i) for i in SOLVER_TARGET_STAGES) + ".",
+            )
+            return
+        self.burner_runner.submit(session_data)
+
+    def _run_burner_solver(self, session_data: Dict[str, Any]):
+        # Runs on the worker thread
+        from scripts_main.burner_solver import solve_burners
+
+        targets = {
+            f"stage_{i}_time_sec": session_data[f"stage_{i}_time_sec"]
+            for i in SOLVER_TARGET_STAGES
+            if session_data.get(f"stage_{i}_time_sec") is not None
+        }
+        bundle = self._model_provider() if self._model_provider is not None else None
+        plan = solve_burners(session_data, targets, bundle=bundle)
+        # The plan rides along in the result, so the report always matches its request
+        return plan.predicted_session, plan.confidence, plan.ml_filled_fields, plan
+
+    def on_burner_plan_ready(self, result):
+        predicted_session, confidence, ml_filled_fields, roast_df, history_version, plan = result
+        open_core_report_dialog(
+            self,
+            predicted_session,
+            confidence,
+            ml_filled_fields,
+            roast_df,
+            history_version,
+            title="Core Burner Recommendation – Report & Curve",
+            summary_html=burner_plan_summary_html(plan),
+        )
 
-        # 12) Combined text + curve dialog (like Scout)
+    def on_burner_plan_error(self, message: str):
+        QMessageBox.critical(self, "Burner Solver Error", f"Could not recommend burners:\n{message}")
+
+    # ------------------------------------------------------------------
+    # Result → show report + curve
+    # ------------------------------------------------------------------
+    def on_prediction_ready(self, result):
+        predicted_session, confidence, ml_filled_fields, roast_df, history_version = result
+
+        # Combined text + curve dialog (like Scout)
         open_core_report_dialog(
             self,
             predicted_session,
             confidence,
             ml_filled_fields,
             roast_df,
+            history_version,
         )
-        # 13) (no separate curve window needed – included in dialog above)
 
         # leave the input window open so you can tweak; uncomment to auto-close:
         # self.close()
+
+    def on_prediction_error(self, message: str):
+        QMessageBox.critical(self, "Core Error", f"Error running Core model:\n{message}")
@@ -7,11 +7,15 @@ import pandas as pd
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QComboBox, QFormLayout, QLineEdit, QPushButton,
-    QMessageBox
+    QMessageBox, QProgressBar
 )
 
 from .gui_paths import ROAST_FILE, INV_FILE
 from .gui_print_scout_report import open_scout_report_dialog
+from .gui_prediction_worker import PredictionRunner
+from .gui_live_preview import LivePreviewPanel
+from .gui_what_if_sweep import open_what_if_sweep
+from scripts_utility.roast_defaults import DEFAULT_ANCHOR_TIMES_SEC, form_defaults
 
 
 def mmss_to_seconds(mmss_str: Optional[str]) -> Optional[float]:
@@ -41,10 +45,13 @@ class ScoutForm(QWidget):
     def __init__(
         self,
         run_scout_callback: Callable[[Dict[str, Any]], Any],
+        model_provider: Optional[Callable[[], Any]] = None,
     ):
         super().__init__()
         self.setWindowTitle("Run Scout (Small) Prediction")
         self.run_scout_callback = run_scout_callback
+        # returns a preloaded Scout payload for the what-if sweep (None = load from disk)
+        self.model_provider = model_provider
 
         # keep references so child windows don't get GC'd
         self.child_windows: List[QWidget] = []
@@ -120,47 +127,30 @@ class ScoutForm(QWidget):
         # Process method row (if no inventory process)
         form.addRow("Process Method * (if no inventory)", self.process_method_combo)
 
-        # Environment / metadata (with your usual defaults)
-        add_field("room_temp_f", "Room Temp (°F)", True, "70")
-        add_field("humidity_pct", "Humidity (%)", True, "50")
-        add_field("room_bean_temp_f", "Starting Bean Temp (°F)", True, "70")
-        add_field("green_bean_moisture_pct", "Green Bean Moisture (%)", True, "10")
-        add_field("batch_weight_lbs", "Batch Weight (lbs)", True, "200")
+        # Environment / metadata (with your usual defaults, see scripts_utility/roast_defaults.py)
+        defaults = form_defaults()
+        add_field("room_temp_f", "Room Temp (°F)", True, defaults["room_temp_f"])
+        add_field("humidity_pct", "Humidity (%)", True, defaults["humidity_pct"])
+        add_field("room_bean_temp_f", "Starting Bean Temp (°F)", True, defaults["room_bean_temp_f"])
+        add_field("green_bean_moisture_pct", "Green Bean Moisture (%)", True, defaults["green_bean_moisture_pct"])
+        add_field("batch_weight_lbs", "Batch Weight (lbs)", True, defaults["batch_weight_lbs"])
 
         # Stage defaults (temps + key anchor times)
-        stage_defaults = {
-            0: "400",
-            1: "300",
-            2: "320",
-            3: "340",
-            4: "360",
-            5: "380",
-            6: "400",
-            7: "430",
-            8: "445",
-            9: "455",
-        }
-
-        time_defaults = {
-            1: "0400",
-            6: "0800",
-            9: "1100",
-        }
-
         for i in range(10):
             add_field(
                 f"stage_{i}_temp_f",
                 f"Stage {i} Temp (°F)",
                 True,
-                stage_defaults.get(i),
+                defaults.get(f"stage_{i}_temp_f"),
             )
 
-            if i in time_defaults:
+            if i in DEFAULT_ANCHOR_TIMES_SEC:
+                time_default = defaults[f"stage_{i}_time_mmss"]
                 add_field(
                     f"stage_{i}_time_mmss",
-                    f"Stage {i} Time (MMSS, e.g. {time_defaults[i]})",
+                    f"Stage {i} Time (MMSS, e.g. {time_default})",
                     True,
-                    time_defaults[i],
+                    time_default,
                 )
 
         main_layout.addLayout(form)
@@ -170,16 +160,52 @@ class ScoutForm(QWidget):
         btn.clicked.connect(self.on_submit)
         main_layout.addWidget(btn)
 
+        sweep_btn = QPushButton("What-if Sweep…")
+        sweep_btn.clicked.connect(self.on_what_if_sweep)
+        main_layout.addWidget(sweep_btn)
+
+        # Busy indicator while the model runs in the background
+        self.busy_bar = QProgressBar()
+        self.busy_bar.setRange(0, 0)
+        self.busy_bar.setTextVisible(False)
+        self.busy_bar.hide()
+        main_layout.addWidget(self.busy_bar)
+
+        # Live preview: debounced background prediction on every edit
+        self.live_preview = LivePreviewPanel(
+            self.run_scout_callback,
+            lambda: self._collect_session_data(quiet=True),
+        )
+        main_layout.addWidget(self.live_preview)
+        for box in self.inputs.values():
+            box.textChanged.connect(self.live_preview.schedule)
+        for combo in (self.inventory_combo, self.process_method_combo):
+            combo.currentIndexChanged.connect(self.live_preview.schedule)
+        # Lots in today's roast plan show their prediction without running a model
+        self.inventory_combo.currentIndexChanged.connect(self._show_planned_prediction)
+
         self.setLayout(main_layout)
 
+        # Prediction + history load run off the UI thread
+        self.prediction_runner = PredictionRunner(self.run_scout_callback, ROAST_FILE, self)
+        self.prediction_runner.result_ready.connect(self.on_prediction_ready)
+        self.prediction_runner.error.connect(self.on_prediction_error)
+        self.prediction_runner.busy_changed.connect(self.busy_bar.setVisible)
+
     # ----------------------------------------------------------
-    # SUBMIT
+    # FORM → session_data (shared by Submit and live preview)
     # ----------------------------------------------------------
-    def on_submit(self):
-        # Reset borders
-        for box in self.inputs.values():
-            box.setStyleSheet("")
-        self.process_method_combo.setStyleSheet("")
+    def _collect_session_data(self, quiet: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Validate the form and build session_data, or return None if required
+        fields are missing. With quiet=True (live preview) no borders or
+        message boxes are shown.
+        """
+        if not quiet:
+            # Reset borders
+            for box in self.inputs.values():
+                box.setStyleSheet("")
+            self.process_method_combo.setStyleSheet("")
 
         required_keys = (
             ["room_temp_f", "humidity_pct", "room_bean_temp_f",
@@ -204,7 +230,8 @@ class ScoutForm(QWidget):
 
             if key in required_keys and final_val is None:
                 missing.append(key)
-                box.setStyleSheet("border: 2px solid red;")
+                if not quiet:
+                    box.setStyleSheet("border: 2px solid red;")
 
             data[key] = final_val
 
@@ -222,12 +249,14 @@ class ScoutForm(QWidget):
 
         if pm_required and explicit_pm == "":
             missing.append("process_method")
-            self.process_method_combo.setStyleSheet("border: 2px solid red;")
+            if not quiet:
+                self.process_method_combo.setStyleSheet("border: 2px solid red;")
 
         if missing:
-            msg = "These fields are required:\n" + "\n".join(f"- {k}" for k in missing)
-            QMessageBox.warning(self, "Missing Required Fields", msg)
-            return
+            if not quiet:
+                msg = "These fields are required:\n" + "\n".join(f"- {k}" for k in missing)
+                QMessageBox.warning(self, "Missing Required Fields", msg)
+            return None
 
         # -----------------------------
         # Build session_data
@@ -279,25 +308,40 @@ class ScoutForm(QWidget):
         session_data["stage_6_time_sec"] = mmss_to_seconds(data.get("stage_6_time_mmss"))
         session_data["stage_9_time_sec"] = mmss_to_seconds(data.get("stage_9_time_mmss"))
 
-        # -----------------------------
-        # Run model
-        # -----------------------------
+        return session_data
+
+    def _show_planned_prediction(self, *_):
+        box = self.inputs["batch_weight_lbs"]
         try:
-            predicted_session, confidence, ml_filled_fields = self.run_scout_callback(session_data)
-        except Exception as e:
-            QMessageBox.critical(self, "Scout Error", f"Error running Scout model:\n{e}")
-            return
+            weight = float(box.text().strip() or box.placeholderText())
+        except ValueError:
+            weight = None
+        self.live_preview.show_plan_entry("scout", self.inventory_combo.currentData(), weight)
 
+    # ----------------------------------------------------------
+    # SUBMIT
+    # ----------------------------------------------------------
+    def on_submit(self):
+        session_data = self._collect_session_data()
+        if session_data is None:
+            return
 
         # -----------------------------
-        # Load roast_data.csv for history
+        # Run model (background; repeated clicks coalesce)
         # -----------------------------
-        roast_df: Optional[pd.DataFrame] = None
-        try:
-            if os.path.exists(ROAST_FILE):
-                roast_df = pd.read_csv(ROAST_FILE)
-        except Exception as e:
-            print("Error loading roast_data.csv:", e)
+        self.prediction_runner.submit(session_data)
+
+    def on_what_if_sweep(self):
+        session_data = self._collect_session_data()
+        if session_data is None:
+            return
+        open_what_if_sweep(self.child_windows, session_data, "scout", self.model_provider)
+
+    # ----------------------------------------------------------
+    # RESULT
+    # ----------------------------------------------------------
+    def on_prediction_ready(self, result):
+        predicted_session, confidence, ml_filled_fields, roast_df, history_version = result
 
         # -----------------------------
         # Combined text + curve dialog
@@ -308,4 +352,8 @@ class ScoutForm(QWidget):
             confidence,
             ml_filled_fields,
             roast_df,
+            history_version,
         )
+
+    def on_prediction_error(self, message: str):
+        QMessageBox.critical(self, "Scout Error", f"Error running Scout model:\n{message}")
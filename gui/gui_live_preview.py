@@ -0,0 +1,186 @@
+# gui/gui_live_preview.py
+
+from typing import Dict, Any, Optional, Callable
+
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QCheckBox
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+from matplotlib.figure import Figure
+
+from scripts_main.daily_plan import load_daily_plan, lookup_plan_entry
+from .gui_curve_plot import smooth_curve_from_session
+from .gui_prediction_worker import PredictionRunner
+
+# Wait this long after the last edit before predicting
+LIVE_PREVIEW_DEBOUNCE_MS = 250
+
+
+def _fmt_mmss(seconds: Any) -> str:
+    try:
+        total = int(round(float(seconds)))
+    except (TypeError, ValueError):
+        return "--:--"
+    return f"{total // 60:02d}:{total % 60:02d}"
+
+
+def _fmt_burner(pct: Any) -> str:
+    try:
+        return f"{float(pct):5.1f}%"
+    except (TypeError, ValueError):
+        return "   n/a"
+
+
+def build_preview_text(predicted_session: Dict[str, Any], ml_filled_fields: Dict[str, Any]) -> str:
+    """One line per stage: time and burner, with ML-filled values marked '*'."""
+    lines = []
+    for i in range(1, 10):
+        time_key = f"stage_{i}_time_sec"
+        burner_key = f"stage_{i}_burner_pct"
+        t_mark = "*" if time_key in ml_filled_fields else " "
+        b_mark = "*" if burner_key in ml_filled_fields else " "
+        lines.append(
+            f"Stage {i}  {_fmt_mmss(predicted_session.get(time_key))}{t_mark}"
+            f"  {_fmt_burner(predicted_session.get(burner_key))}{b_mark}"
+        )
+    lines.append("* = predicted")
+    return "\n".join(lines)
+
+
+class LivePreviewPanel(QWidget):
+    """
+    Inline preview for the input forms.
+
+    Call schedule() whenever a field changes. After LIVE_PREVIEW_DEBOUNCE_MS
+    of quiet, collect_session_data() is called on the UI thread and the
+    prediction runs in the background; older requests are dropped. The
+    only per-keystroke UI work is restarting the debounce timer.
+    """
+
+    def __init__(
+        self,
+        predict_callback: Callable[[Dict[str, Any]], Any],
+        collect_session_data: Callable[[], Optional[Dict[str, Any]]],
+        parent: Optional[QWidget] = None,
+    ):
+        super().__init__(parent)
+        self.collect_session_data = collect_session_data
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        header = QHBoxLayout()
+        self.enabled_box = QCheckBox("Live preview")
+        self.enabled_box.toggled.connect(self._on_toggled)
+        header.addWidget(self.enabled_box)
+        self.status_label = QLabel("")
+        header.addWidget(self.status_label, 1)
+        layout.addLayout(header)
+
+        body = QHBoxLayout()
+        self.text_label = QLabel("")
+        font = QFont("Courier New")
+        font.setStyleHint(QFont.Monospace)
+        self.text_label.setFont(font)
+        body.addWidget(self.text_label)
+
+        # Thumbnail: one persistent line, updated with set_data
+        self.canvas = FigureCanvasQTAgg(Figure(figsize=(3, 2), tight_layout=True))
+        self.canvas.setMinimumSize(240, 160)
+        self.ax = self.canvas.figure.add_subplot(111)
+        self.ax.tick_params(labelsize=7)
+        self.ax.grid(True, alpha=0.2)
+        (self.curve_line,) = self.ax.plot([], [], color="red", linewidth=1.5)
+        body.addWidget(self.canvas, 1)
+        layout.addLayout(body)
+
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(LIVE_PREVIEW_DEBOUNCE_MS)
+        self.debounce.timeout.connect(self._fire)
+
+        self.runner = PredictionRunner(predict_callback, None, self)
+        self.runner.result_ready.connect(self._on_result)
+        self.runner.error.connect(self._on_error)
+        self.runner.busy_changed.connect(self._on_busy)
+
+        self._set_body_visible(False)
+
+    def is_enabled(self) -> bool:
+        return self.enabled_box.isChecked()
+
+    def schedule(self, *_) -> None:
+        """Restart the debounce timer (connect to field change signals)."""
+        if self.is_enabled():
+            self.debounce.start()
+
+    def _set_body_visible(self, visible: bool) -> None:
+        self.text_label.setVisible(visible)
+        self.canvas.setVisible(visible)
+
+    def _on_toggled(self, checked: bool) -> None:
+        self._set_body_visible(checked)
+        if checked:
+            self._fire()
+        else:
+            self.debounce.stop()
+            self.runner.cancel()
+            self.status_label.setText("")
+
+    def _fire(self) -> None:
+        session_data = self.collect_session_data()
+        if session_data is None:
+            self.runner.cancel()
+            self.status_label.setText("Waiting for required fields…")
+            return
+        self.runner.submit(session_data)
+
+    def _on_busy(self, busy: bool) -> None:
+        if busy and self.is_enabled():
+            self.status_label.setText("Predicting…")
+
+    def _on_result(self, result) -> None:
+        if not self.is_enabled():
+            return
+        predicted_session, _confidence, ml_filled_fields = result[:3]
+        self.show_result(predicted_session, ml_filled_fields)
+
+    def show_result(
+        self,
+        predicted_session: Dict[str, Any],
+        ml_filled_fields: Dict[str, Any],
+        status: str = "Up to date",
+    ) -> None:
+        """Display a prediction (live or precomputed, e.g. from today's roast plan)."""
+        self._set_body_visible(True)
+        self.status_label.setText(status)
+        self.text_label.setText(build_preview_text(predicted_session, ml_filled_fields))
+
+        t, y = smooth_curve_from_session(predicted_session)
+        self.curve_line.set_data(t, y)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.canvas.draw_idle()
+
+    def show_plan_entry(self, model: str, lot: Optional[Dict[str, Any]], batch_weight: Optional[float]) -> bool:
+        """
+        Show the cached prediction for `lot` from today's roast plan
+        (scripts_main/daily_plan.py). Returns False if none is cached.
+        """
+        plan = load_daily_plan()
+        entry = lookup_plan_entry(plan, lot, batch_weight)
+        prediction = entry.get(model) if entry else None
+        if not prediction:
+            return False
+        c = plan["conditions"]
+        self.show_result(
+            prediction["predicted_session"],
+            prediction["ml_filled_fields"],
+            f"Today's plan: {entry['batch_weight_lbs']:g} lbs, room {c.get('room_temp_f')}°F, "
+            f"humidity {c.get('humidity_pct')}% (cached)",
+        )
+        return True
+
+    def _on_error(self, message: str) -> None:
+        if self.is_enabled():
+            self.status_label.setText(f"Preview failed: {message.splitlines()[0] if message else 'error'}")
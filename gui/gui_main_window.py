@@ -1,15 +1,40 @@
 # gui/gui_main_window.py
 
-from typing import Optional, Dict, Any
+import importlib
+import threading
+from typing import Optional, Dict, Any, Callable, TYPE_CHECKING
 
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QPushButton, QMessageBox
 )
 
-from .gui_inference_scout_input_session import ScoutForm
-from .gui_capture_roast_session import CaptureRoastSessionGUI
-from .gui_edit_coffee_inventory import CoffeeInventoryWindow
-from .gui_inference_core_input_session import CoreInputSessionWindow
+# Child windows pull in pandas + matplotlib, so they are imported on first use
+# (and warmed in the background) instead of before the control panel appears.
+if TYPE_CHECKING:
+    from .gui_inference_scout_input_session import ScoutForm
+    from .gui_edit_coffee_inventory import CoffeeInventoryWindow
+    from .gui_daily_plan import DailyPlanWindow
+
+# Heavy pure-Python/C dependencies that are safe to import off the UI thread
+WARM_IMPORTS = [
+    "pandas",
+    "matplotlib.figure",
+]
+
+
+def warm_heavy_imports() -> threading.Thread:
+    """Import heavy dependencies in a background thread so first clicks are fast."""
+
+    def _warm():
+        for name in WARM_IMPORTS:
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                print(f"Background import of {name} failed:", e)
+
+    thread = threading.Thread(target=_warm, name="warm-imports", daemon=True)
+    thread.start()
+    return thread
 
 
 class RoastMasterUI(QWidget):
@@ -18,8 +43,9 @@ class RoastMasterUI(QWidget):
         self.setWindowTitle("RoastMaster Control Panel")
         self.setMinimumWidth(380)
 
-        self.scout_form: Optional[ScoutForm] = None
-        self.inventory_window: Optional[CoffeeInventoryWindow] = None
+        self.scout_form: Optional["ScoutForm"] = None
+        self.inventory_window: Optional["CoffeeInventoryWindow"] = None
+        self.daily_plan_window: Optional["DailyPlanWindow"] = None
 
         layout = QVBoxLayout()
 
@@ -30,6 +56,7 @@ class RoastMasterUI(QWidget):
             ("4. Rebuild Scout (Small) Model with Roast Data", self.rebuild_scout),
             ("5. Run Core (Big) Prediction on Given Data", self.run_core),
             ("6. Rebuild Core (Big) Model with Roast Data", self.rebuild_core),
+            ("7. Build Today's Roast Plan", self.daily_plan),
         ]
 
         for label, handler in buttons:
@@ -43,10 +70,25 @@ class RoastMasterUI(QWidget):
         # Keep child windows alive
         self._child_windows = []
 
+        # In-process warm models (used when the inference daemon is not running)
+        self._model_cache = None
+
+        # Running Scout / Core rebuild (one at a time, off the UI thread)
+        self._training_task = None
+
+    def model_cache(self):
+        """Lazily created ModelCache; reloads only when the model files change."""
+        if self._model_cache is None:
+            from scripts_main.inference_server import ModelCache
+            self._model_cache = ModelCache()
+        return self._model_cache
+
     # ----------------------------------------------------------
     # 1) Add Roast Data — full GUI (CaptureRoastSessionGUI)
     # ----------------------------------------------------------
     def add_roast_data(self):
+        from .gui_capture_roast_session import CaptureRoastSessionGUI
+
         win = CaptureRoastSessionGUI()
         win.show()
         self._child_windows.append(win)
@@ -55,6 +97,8 @@ class RoastMasterUI(QWidget):
     # 2) Inventory editor — full GUI (CoffeeInventoryWindow)
     # ----------------------------------------------------------
     def edit_coffee_inventory(self):
+        from .gui_edit_coffee_inventory import CoffeeInventoryWindow
+
         if self.inventory_window is None or not self.inventory_window.isVisible():
             self.inventory_window = CoffeeInventoryWindow()
         self.inventory_window.show()
@@ -65,12 +109,21 @@ class RoastMasterUI(QWidget):
     # 3) Run Scout — GUI using real infer_scout
     # ----------------------------------------------------------
     def run_scout(self):
-        from scripts_main.infer_scout import infer_scout
+        from . import gui_prediction_worker
+        from .gui_inference_scout_input_session import ScoutForm
+        from scripts_main.inference_client import infer_scout_remote
         from scripts_utility.master_order import SCOUT_FEATURE_ORDER
 
         def run_scout_model(session_data: Dict[str, Any]):
             flat_inputs = {key: session_data.get(key) for key in SCOUT_FEATURE_ORDER}
-            ml_filled_fields, confidence = infer_scout(flat_inputs)
+            # Prefer the warm inference daemon when it is running; `gui.py --profile`
+            # predicts in-process so the timing breakdown covers it
+            remote = None if gui_prediction_worker.PROFILE_PREDICTIONS else infer_scout_remote(flat_inputs)
+            if remote is not None:
+                ml_filled_fields, confidence = remote
+            else:
+                from scripts_main.infer_scout import infer_scout
+                ml_filled_fields, confidence = infer_scout(flat_inputs, payload=self.model_cache().scout())
 
             predicted_session: Dict[str, Any] = dict(session_data)
             predicted_session.update(flat_inputs)
@@ -78,7 +131,7 @@ class RoastMasterUI(QWidget):
             # return everything the GUI needs
             return predicted_session, confidence, ml_filled_fields
 
-        self.scout_form = ScoutForm(run_scout_model)
+        self.scout_form = ScoutForm(run_scout_model, lambda: self.model_cache().scout())
         self.scout_form.show()
         self.scout_form.raise_()
         self.scout_form.activateWindow()
@@ -97,26 +150,18 @@ class RoastMasterUI(QWidget):
             )
             return
 
-        try:
-            train_scout()
-            QMessageBox.information(
-                self,
-                "Rebuild Scout",
-                "Scout model training completed.",
-            )
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Rebuild Scout Error",
-                f"Error while training Scout model:\n{e}",
-            )
+        self._run_training("Scout", train_scout)
 
     # ----------------------------------------------------------
     # 5) Run Core — GUI (CoreInputSessionWindow handles report+curve)
     # ----------------------------------------------------------
     def run_core(self):
+        from . import gui_prediction_worker
+        from .gui_inference_core_input_session import CoreInputSessionWindow
+
         try:
             from scripts_main.infer_core import infer_core
+            from scripts_main.inference_client import infer_core_remote
             from scripts_utility.master_order import CORE_FEATURE_ORDER
         except ImportError as e:
             QMessageBox.critical(
@@ -129,7 +174,11 @@ class RoastMasterUI(QWidget):
         def run_core_model(session_data: Dict[str, Any]):
             # Build flat input dict in the same feature order Core expects
             flat_inputs = {key: session_data.get(key) for key in CORE_FEATURE_ORDER}
-            ml_filled_fields, confidence = infer_core(flat_inputs)
+            remote = None if gui_prediction_worker.PROFILE_PREDICTIONS else infer_core_remote(flat_inputs)
+            if remote is not None:
+                ml_filled_fields, confidence = remote
+            else:
+                ml_filled_fields, confidence = infer_core(flat_inputs, bundle=self.model_cache().core())
 
             predicted_session: Dict[str, Any] = dict(session_data)
             predicted_session.update(flat_inputs)
@@ -138,7 +187,7 @@ class RoastMasterUI(QWidget):
             # CoreInputSessionWindow expects (predicted_session, confidence, ml_filled_fields)
             return predicted_session, confidence, ml_filled_fields
 
-        win = CoreInputSessionWindow(run_core_model)
+        win = CoreInputSessionWindow(run_core_model, lambda: self.model_cache().core())
         win.show()
         win.raise_()
         win.activateWindow()
@@ -158,16 +207,43 @@ class RoastMasterUI(QWidget):
             )
             return
 
-        try:
-            train_core()
-            QMessageBox.information(
-                self,
-                "Rebuild Core",
-                "Core model training completed.",
-            )
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Rebuild Core Error",
-                f"Error while training Core model:\n{e}",
+        self._run_training("Core", train_core)
+
+    def _run_training(self, model: str, train: Callable[[], None]) -> None:
+        """Retrain on a pool thread so the control panel stays responsive; report when done."""
+        from PySide6.QtCore import QThreadPool
+        from .gui_prediction_worker import CallableTask
+
+        title = f"Rebuild {model}"
+        if self._training_task is not None:
+            QMessageBox.information(self, title, "A model rebuild is already running.")
+            return
+
+        def on_finished(_result):
+            self._training_task = None
+            QMessageBox.information(self, title, f"{model} model training completed.")
+
+        def on_failed(message: str):
+            self._training_task = None
+            QMessageBox.critical(self, f"{title} Error", f"Error while training {model} model:\n{message}")
+
+        self._training_task = CallableTask(train)
+        self._training_task.setAutoDelete(False)
+        self._training_task.signals.finished.connect(on_finished)
+        self._training_task.signals.failed.connect(on_failed)
+        print(f"🔁 {title} started in the background...")
+        QThreadPool.globalInstance().start(self._training_task)
+
+    # ----------------------------------------------------------
+    # 7) Today's roast plan — every inventory lot, precomputed
+    # ----------------------------------------------------------
+    def daily_plan(self):
+        from .gui_daily_plan import DailyPlanWindow
+
+        if self.daily_plan_window is None or not self.daily_plan_window.isVisible():
+            self.daily_plan_window = DailyPlanWindow(
+                lambda: (self.model_cache().scout(), self.model_cache().core())
             )
+        self.daily_plan_window.show()
+        self.daily_plan_window.raise_()
+        self.daily_plan_window.activateWindow()
@@ -0,0 +1,175 @@
+# gui/gui_prediction_worker.py
+
+from typing import Dict, Any, Optional, Callable
+
+from contextlib import nullcontext
+from functools import partial
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from scripts_utility.tracing import print_breakdown, tracing
+from .gui_curve_plot import load_roast_history, get_history_layer
+from .gui_history_filter import get_history_index
+
+# Set by `python gui.py --profile`: print a per-phase timing breakdown of
+# every prediction to the console
+PROFILE_PREDICTIONS = False
+
+# -------------------------------------------------------------------
+# Background work for the GUI windows
+#
+# CallableTask runs any function on a QThreadPool thread (daily plan,
+# what-if sweep, similar curves, predictions). PredictionRunner adds
+# request coalescing for the Scout / Core input windows: the model
+# callback and the roast log load both run on a worker thread so the form
+# stays responsive, clicks while a prediction is running are coalesced
+# (only the most recent session_data is computed next), and results for
+# superseded requests are dropped.
+# -------------------------------------------------------------------
+
+
+class TaskSignals(QObject):
+    # result / error message
+    finished = Signal(object)
+    failed = Signal(str)
+
+
+class CallableTask(QRunnable):
+    """
+    Runs fn() on a pool thread. signals.finished emits its return value,
+    signals.failed the exception text; both arrive on the UI thread.
+    Keep a reference to the task (or setAutoDelete(False)) until then.
+    """
+
+    def __init__(self, fn: Callable[[], Any]):
+        super().__init__()
+        self.fn = fn
+        self.signals = TaskSignals()
+
+    def run(self):
+        try:
+            result = self.fn()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(result)
+
+
+def _predict(
+    callback: Callable[[Dict[str, Any]], Any],
+    session_data: Dict[str, Any],
+    roast_path: Optional[str],
+) -> tuple:
+    """Worker-thread body of one PredictionRunner request."""
+    # Tracers are per thread, so the span context starts here on the worker
+    with tracing() if PROFILE_PREDICTIONS else nullcontext() as tracer:
+        predicted_session, confidence, ml_filled_fields, *extra = callback(session_data)
+    if tracer is not None:
+        for root in ("infer_core", "infer_scout"):
+            if any(s.name == root for s in tracer.spans):
+                print_breakdown(tracer, root)
+
+    roast_df = None
+    history_version = None
+    if roast_path is not None:
+        try:
+            # Cached per roast log version; also pre-render the default
+            # history layer and filter index so the report opens instantly
+            roast_df, history_version = load_roast_history(roast_path)
+            if roast_df is not None and history_version is not None:
+                get_history_layer(roast_df, history_version)
+                get_history_index(roast_df, history_version)
+        except Exception as e:
+            print("Error loading roast_data.csv:", e)
+
+    return (predicted_session, confidence, ml_filled_fields, roast_df, history_version, *extra)
+
+
+class PredictionRunner(QObject):
+    """
+    Runs `callback(session_data)` off the UI thread.
+    Pass roast_path=None to skip loading the roast log (live preview).
+
+    result_ready emits (predicted_session, confidence, ml_filled_fields,
+    roast_df, history_version), followed by anything else the callback
+    returned after its first three values; error emits the exception text;
+    busy_changed tells the form when to show/hide its busy indicator.
+    """
+
+    result_ready = Signal(object)
+    error = Signal(str)
+    busy_changed = Signal(bool)
+
+    def __init__(
+        self,
+        callback: Callable[[Dict[str, Any]], Any],
+        roast_path: Optional[str],
+        parent: Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self.callback = callback
+        self.roast_path = roast_path
+
+        # One prediction at a time; the models are not worth racing
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+        self._latest_id = 0
+        self._running_id: Optional[int] = None
+        self._pending: Optional[Dict[str, Any]] = None
+        self._tasks: Dict[int, CallableTask] = {}  # keep signal objects alive
+
+    def is_busy(self) -> bool:
+        return self._running_id is not None
+
+    def submit(self, session_data: Dict[str, Any]) -> int:
+        """Queue a prediction; replaces any request still waiting to start."""
+        self._latest_id += 1
+        if self._running_id is None:
+            self._start(self._latest_id, session_data)
+        else:
+            self._pending = session_data
+        return self._latest_id
+
+    def cancel(self) -> None:
+        """Drop the pending request and ignore the result of the running one."""
+        self._pending = None
+        self._latest_id += 1
+
+    def _start(self, request_id: int, session_data: Dict[str, Any]) -> None:
+        task = CallableTask(partial(_predict, self.callback, session_data, self.roast_path))
+        task.setAutoDelete(False)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        self._tasks[request_id] = task
+
+        if self._running_id is None:
+            self.busy_changed.emit(True)
+        self._running_id = request_id
+        self.pool.start(task)
+
+    def _next(self, request_id: int) -> bool:
+        """Start the pending request if there is one. Returns True if it did."""
+        self._tasks.pop(request_id, None)
+        if self._pending is None:
+            self._running_id = None
+            self.busy_changed.emit(False)
+            return False
+        session_data, self._pending = self._pending, None
+        self._start(self._latest_id, session_data)
+        return True
+
+    # One task runs at a time, so a finished / failed signal is always the running request's
+    def _on_finished(self, result: Any) -> None:
+        request_id = self._running_id
+        if self._next(request_id):
+            return  # superseded by a newer click
+        if request_id == self._latest_id:
+            self.result_ready.emit(result)
+
+    def _on_failed(self, message: str) -> None:
+        request_id = self._running_id
+        if self._next(request_id):
+            return
+        if request_id == self._latest_id:
+            self.error.emit(message)
@@ -3,6 +3,8 @@
 from typing import Dict, Any, Optional
 import math
 from scripts_utility.capture import seconds_to_mmss
+from scripts_main.fuel_analytics import fuel_summary
+from scripts_main.roast_phases import phase_summary
 import pandas as pd
 from PySide6.QtWidgets import (
     QDialog,
@@ -12,14 +14,14 @@ from PySide6.QtWidgets import (
     QPushButton,
     QWidget,
 )
-from PySide6.QtCore import Qt
 
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
-from matplotlib.figure import Figure
-
-from .gui_curve_plot import (
-    extract_curve_from_row,
-    extract_curve_from_session,
+from .gui_curve_plot import RoastLogVersion
+from .gui_history_filter import HistoryCurvePanel
+from .gui_similar_roasts import (
+    SIMILAR_COLOR,
+    SimilarCurvesButton,
+    build_similar_roasts_html,
+    similar_roasts_for_report,
 )
 
 
@@ -240,6 +242,16 @@ def build_core_report_html(
             f"{_fmt_value(val, key, predicted_keys, round_to=1)}<br>"
         )
 
+    # --- Fuel ---
+    fuel = fuel_summary(session_data)
+    if fuel:
+        lines.append(f"<b>Estimated Fuel:</b> {fuel}<br>")
+
+    # --- Phases ---
+    phases = phase_summary(session_data)
+    if phases:
+        lines.append(f"<b>Phases:</b> {phases}<br>")
+
     # --- Sensory Scores ---
     lines.append("<br>")
     sens_fields = [
@@ -267,9 +279,12 @@ class CoreReportDialog(QDialog):
         confidence: Optional[Dict[str, float]],
         ml_filled_fields: Dict[str, Any],
         roast_df: Optional[pd.DataFrame] = None,
+        history_version: Optional[RoastLogVersion] = None,
+        title: str = "Core Prediction – Report & Curve",
+        summary_html: Optional[str] = None,
     ):
         super().__init__(parent)
-        self.setWindowTitle("Core Prediction – Report & Curve")
+        self.setWindowTitle(title)
         self.resize(1000, 700)
 
         main_layout = QHBoxLayout(self)
@@ -278,14 +293,24 @@ class CoreReportDialog(QDialog):
         text = QTextEdit()
         text.setReadOnly(True)
         html = build_core_report_html(session_data, confidence, ml_filled_fields)
+        if summary_html:
+            html = summary_html + "<hr>" + html
+        similar = similar_roasts_for_report(session_data, roast_df, history_version)
+        if not similar.empty:
+            html += "<hr>" + build_similar_roasts_html(similar)
         text.setHtml(html)
 
         left_layout = QVBoxLayout()
         left_layout.addWidget(text)
 
+        btn_row = QHBoxLayout()
+        self.shape_btn = SimilarCurvesButton(self, session_data, roast_df, history_version, text, html)
+        btn_row.addWidget(self.shape_btn)
+        btn_row.addStretch(1)
         close_btn = QPushButton("Close")
         close_btn.clicked.connect(self.close)
-        left_layout.addWidget(close_btn, alignment=Qt.AlignmentFlag.AlignRight)
+        btn_row.addWidget(close_btn)
+        left_layout.addLayout(btn_row)
 
         left_container = QWidget()
         left_container.setLayout(left_layout)
@@ -294,29 +319,17 @@ class CoreReportDialog(QDialog):
         right_container = QWidget()
         right_layout = QVBoxLayout(right_container)
 
-        canvas = FigureCanvasQTAgg(Figure(figsize=(5, 4)))
-        right_layout.addWidget(canvas)
-
-        ax = canvas.figure.add_subplot(111)
-
-        # Historical curves (if any)
-        if roast_df is not None and len(roast_df) > 0:
-            for _, row in roast_df.iterrows():
-                t, y = extract_curve_from_row(row)
-                if t is not None and y is not None and len(t) > 1:
-                    ax.plot(t, y, alpha=0.25)
-
-        # Predicted curve from this Core session
-        t_pred, y_pred = extract_curve_from_session(session_data)
-        if t_pred is not None and y_pred is not None and len(t_pred) > 1:
-            ax.plot(t_pred, y_pred, linewidth=2)
-
-        ax.set_xlabel("Time (min)")
-        ax.set_ylabel("Bean Temp (°F)")
-        ax.set_title("Core Predicted Roast vs Historical Roasts")
-        ax.grid(True, alpha=0.2)
-
-        canvas.draw()
+        # Filterable history overlay + predicted curve
+        self.curve_panel = HistoryCurvePanel(
+            roast_df,
+            history_version,
+            session_data,
+            "Core Predicted Roast vs Historical Roasts",
+            highlight=similar.index,
+            highlight_color=SIMILAR_COLOR,
+        )
+        right_layout.addWidget(self.curve_panel)
+        self.shape_btn.curve_panel = self.curve_panel
 
         # ------- Assemble -------
         main_layout.addWidget(left_container, 1)
@@ -329,6 +342,12 @@ def open_core_report_dialog(
     confidence: Optional[Dict[str, float]],
     ml_filled_fields: Dict[str, Any],
     roast_df: Optional[pd.DataFrame] = None,
+    history_version: Optional[RoastLogVersion] = None,
+    title: str = "Core Prediction – Report & Curve",
+    summary_html: Optional[str] = None,
 ) -> None:
-    dlg = CoreReportDialog(parent, session_data, confidence, ml_filled_fields, roast_df)
+    dlg = CoreReportDialog(
+        parent, session_data, confidence, ml_filled_fields, roast_df, history_version,
+        title=title, summary_html=summary_html,
+    )
     dlg.exec()  # modal, exactly like Scout
@@ -11,14 +11,16 @@ from PySide6.QtWidgets import (
     QPushButton,
     QWidget,
 )
-from PySide6.QtCore import Qt
 
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
-from matplotlib.figure import Figure
-
-from .gui_curve_plot import (
-    extract_curve_from_row,
-    extract_curve_from_session,
+from scripts_main.fuel_analytics import fuel_summary
+from scripts_main.roast_phases import phase_summary
+from .gui_curve_plot import RoastLogVersion
+from .gui_history_filter import HistoryCurvePanel
+from .gui_similar_roasts import (
+    SIMILAR_COLOR,
+    SimilarCurvesButton,
+    build_similar_roasts_html,
+    similar_roasts_for_report,
 )
 
 
@@ -114,6 +116,15 @@ def build_scout_report_text(
             f"Stage {i} - Temp: {temp_txt} - Burner: {burner_txt} - Time: {time_txt}"
         )
 
+    fuel = fuel_summary(session)
+    if fuel:
+        lines.append("")
+        lines.append(f"Estimated Fuel: {fuel}")
+
+    phases = phase_summary(session)
+    if phases:
+        lines.append(f"Phases: {phases}")
+
     # Compact: one <br> per line, no extra blank lines
     return "<br>".join(lines)
 
@@ -132,6 +143,7 @@ class ScoutReportDialog(QDialog):
         confidence: Optional[float],
         ml_filled_fields: Dict[str, Any],
         roast_df: Optional[pd.DataFrame] = None,
+        history_version: Optional[RoastLogVersion] = None,
     ):
         super().__init__(parent)
         self.setWindowTitle("Scout Prediction – Report & Curve")
@@ -143,14 +155,22 @@ class ScoutReportDialog(QDialog):
         text = QTextEdit()
         text.setReadOnly(True)
         html = build_scout_report_text(session, ml_filled_fields, confidence)
+        similar = similar_roasts_for_report(session, roast_df, history_version)
+        if not similar.empty:
+            html += "<hr>" + build_similar_roasts_html(similar)
         text.setHtml(html)
 
         left_layout = QVBoxLayout()
         left_layout.addWidget(text)
 
+        btn_row = QHBoxLayout()
+        self.shape_btn = SimilarCurvesButton(self, session, roast_df, history_version, text, html)
+        btn_row.addWidget(self.shape_btn)
+        btn_row.addStretch(1)
         close_btn = QPushButton("Close")
         close_btn.clicked.connect(self.close)
-        left_layout.addWidget(close_btn, alignment=Qt.AlignmentFlag.AlignRight)
+        btn_row.addWidget(close_btn)
+        left_layout.addLayout(btn_row)
 
         left_container = QWidget()
         left_container.setLayout(left_layout)
@@ -159,29 +179,17 @@ class ScoutReportDialog(QDialog):
         right_container = QWidget()
         right_layout = QVBoxLayout(right_container)
 
-        canvas = FigureCanvasQTAgg(Figure(figsize=(5, 4)))
-        right_layout.addWidget(canvas)
-
-        ax = canvas.figure.add_subplot(111)
-
-        # Historical curves
-        if roast_df is not None and len(roast_df) > 0:
-            for _, row in roast_df.iterrows():
-                t, y = extract_curve_from_row(row)
-                if t is not None and y is not None and len(t) > 1:
-                    ax.plot(t, y, alpha=0.25)
-
-        # Predicted curve
-        t_pred, y_pred = extract_curve_from_session(session)
-        if t_pred is not None and y_pred is not None and len(t_pred) > 1:
-            ax.plot(t_pred, y_pred, linewidth=2)
-
-        ax.set_xlabel("Time (min)")
-        ax.set_ylabel("Bean Temp (°F)")
-        ax.set_title("Scout Predicted Roast vs Historical Roasts")
-        ax.grid(True, alpha=0.2)
-
-        canvas.draw()
+        # Filterable history overlay + predicted curve
+        self.curve_panel = HistoryCurvePanel(
+            roast_df,
+            history_version,
+            session,
+            "Scout Predicted Roast vs Historical Roasts",
+            highlight=similar.index,
+            highlight_color=SIMILAR_COLOR,
+        )
+        right_layout.addWidget(self.curve_panel)
+        self.shape_btn.curve_panel = self.curve_panel
 
         # ------- Assemble -------
         main_layout.addWidget(left_container, 1)
@@ -194,6 +202,7 @@ def open_scout_report_dialog(
     confidence: Optional[float],
     ml_filled_fields: Dict[str, Any],
     roast_df: Optional[pd.DataFrame] = None,
+    history_version: Optional[RoastLogVersion] = None,
 ) -> None:
-    dlg = ScoutReportDialog(parent, session, confidence, ml_filled_fields, roast_df)
+    dlg = ScoutReportDialog(parent, session, confidence, ml_filled_fields, roast_df, history_version)
     dlg.exec()
@@ -0,0 +1,116 @@
+# gui/gui_similar_roasts.py
+
+from typing import Any, Dict, Optional
+
+import pandas as pd
+from PySide6.QtCore import QThreadPool
+from PySide6.QtWidgets import QMessageBox, QPushButton, QTextEdit, QWidget
+
+from scripts_main.similar_roasts import DEFAULT_K, MATCH_HEADERS, describe_match, find_similar_roasts
+from .gui_curve_plot import RoastLogVersion
+from .gui_prediction_worker import CallableTask
+
+# Colors of the matches in the curve overlay (match the report headings)
+SIMILAR_COLOR = "#1f6fd1"
+SHAPE_COLOR = "#e07b00"
+
+
+def similar_roasts_for_report(
+    session: Dict[str, Any],
+    roast_df: Optional[pd.DataFrame],
+    history_version: Optional[RoastLogVersion],
+    k: int = DEFAULT_K,
+) -> pd.DataFrame:
+    """Most similar past roasts for a report; empty if there is no history or the lookup fails."""
+    if roast_df is None or len(roast_df) == 0:
+        return pd.DataFrame()
+    try:
+        return find_similar_roasts(session, k, roast_df=roast_df, version=history_version)
+    except Exception as e:
+        print(f"⚠️ Similar roast lookup failed: {e}")
+        return pd.DataFrame()
+
+
+def shape_matches_for_report(
+    session: Dict[str, Any],
+    roast_df: Optional[pd.DataFrame],
+    history_version: Optional[RoastLogVersion],
+    k: int = DEFAULT_K,
+) -> pd.DataFrame:
+    """Past roasts whose curve is closest in shape to the prediction (scripts_main/shape_index.py)."""
+    if roast_df is None or len(roast_df) == 0:
+        return pd.DataFrame()
+    from scripts_main.shape_index import find_similar_shapes
+
+    return find_similar_shapes(session, k, roast_df=roast_df, version=history_version, save=False)
+
+
+def build_similar_roasts_html(
+    matches: pd.DataFrame,
+    title: str = "Most Similar Past Roasts",
+    color: str = SIMILAR_COLOR,
+) -> str:
+    """HTML table of matched roasts, nearest first (highlighted in the curve plot)."""
+    if matches.empty:
+        return ""
+    lines = [f'<b style="color:{color};">{title}</b>']
+    lines.append('<table cellspacing="0" cellpadding="3">')
+    lines.append("<tr>" + "".join(f"<th align='left'>{h}</th>" for h in MATCH_HEADERS) + "</tr>")
+    for _, row in matches.iterrows():
+        lines.append("<tr>" + "".join(f"<td>{cell}</td>" for cell in describe_match(row)) + "</tr>")
+    lines.append("</table>")
+    return "".join(lines)
+
+
+class SimilarCurvesButton(QPushButton):
+    """
+    "Find Similar Curves" for a report dialog: searches on a pool thread,
+    then appends the matches to the report text and highlights them in the
+    curve panel.
+    """
+
+    def __init__(
+        self,
+        parent: QWidget,
+        session: Dict[str, Any],
+        roast_df: Optional[pd.DataFrame],
+        history_version: Optional[RoastLogVersion],
+        text: QTextEdit,
+        html: str,
+    ):
+        super().__init__("Find Similar Curves", parent)
+        self.session, self.roast_df, self.history_version = session, roast_df, history_version
+        self.report, self.report_html = text, html
+        self.curve_panel = None  # set once the dialog has built it
+        self.pool = QThreadPool(self)
+        self._task: Optional[CallableTask] = None
+        self.setEnabled(roast_df is not None and len(roast_df) > 0)
+        self.clicked.connect(self.on_find_similar_curves)
+
+    def on_find_similar_curves(self):
+        """Past roasts whose curve is shaped like the prediction: list them and highlight them."""
+        session, roast_df, version = self.session, self.roast_df, self.history_version
+        self._task = CallableTask(lambda: shape_matches_for_report(session, roast_df, version))
+        self._task.setAutoDelete(False)
+        self._task.signals.finished.connect(self._on_result)
+        self._task.signals.failed.connect(self._on_error)
+        self.setEnabled(False)
+        self.setText("Searching…")
+        self.pool.start(self._task)
+
+    def _on_error(self, message: str):
+        self.setText("Find Similar Curves")
+        self.setEnabled(True)
+        QMessageBox.critical(self.window(), "Curve Search Error", f"Error searching similar curves:\n{message}")
+
+    def _on_result(self, matches: pd.DataFrame):
+        self.setText("Find Similar Curves")
+        if matches.empty:
+            self.setEnabled(True)
+            QMessageBox.information(self.window(), "Similar Curves", "No past roast has a comparable curve.")
+            return
+        self.report.setHtml(self.report_html + "<hr>" + build_similar_roasts_html(
+            matches, "Most Similar Curves (distance in RMS °F)", SHAPE_COLOR,
+        ))
+        if self.curve_panel is not None:
+            self.curve_panel.set_highlight("Similar curve shape", matches.index, SHAPE_COLOR)
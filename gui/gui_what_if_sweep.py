@@ -0,0 +1,276 @@
+# gui/gui_what_if_sweep.py
+
+from typing import Dict, Any, Optional, Callable, List
+
+from PySide6.QtCore import QThreadPool
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QGridLayout,
+    QLabel,
+    QLineEdit,
+    QCheckBox,
+    QComboBox,
+    QPushButton,
+    QMessageBox,
+)
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+from matplotlib.figure import Figure
+
+from scripts_main.what_if_sweep import (
+    SWEEP_VARIABLES,
+    DEFAULT_SURFACE_TARGETS,
+    SweepResult,
+    run_sweep,
+    sweep_range,
+)
+from .gui_prediction_worker import CallableTask
+
+# -------------------------------------------------------------------
+# Default ranges: base value (or fallback) ± span, with `steps` points
+# -------------------------------------------------------------------
+
+SWEEP_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "room_temp_f": {"label": "Room Temp (°F)", "fallback": 70.0, "span": 15.0, "steps": 10, "on": True},
+    "humidity_pct": {"label": "Humidity (%)", "fallback": 50.0, "span": 20.0, "steps": 10, "on": True},
+    "room_bean_temp_f": {"label": "Starting Bean Temp (°F)", "fallback": 70.0, "span": 15.0, "steps": 5, "on": False},
+    "green_bean_moisture_pct": {"label": "Green Bean Moisture (%)", "fallback": 10.0, "span": 2.0, "steps": 5, "on": False},
+    "batch_weight_lbs": {"label": "Batch Weight (lbs)", "fallback": 200.0, "span": 100.0, "steps": 10, "on": True},
+}
+
+
+def _fmt_num(x: float) -> str:
+    return f"{x:g}"
+
+
+class WhatIfSweepWindow(QWidget):
+    """
+    Sweep environment variables around a base session and show two
+    predicted surfaces (default: last predicted stage time and final burner).
+
+    model_provider returns a preloaded Scout payload / Core bundle (or None
+    to load from disk).
+    """
+
+    def __init__(
+        self,
+        base_session: Dict[str, Any],
+        model: str,
+        model_provider: Optional[Callable[[], Any]] = None,
+        parent: Optional[QWidget] = None,
+    ):
+        super().__init__(parent)
+        self.base_session = dict(base_session)
+        self.model = model
+        self.model_provider = model_provider
+        self.result: Optional[SweepResult] = None
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self._task: Optional[CallableTask] = None
+
+        self.setWindowTitle(f"What-if Sweep – {'Scout (Small)' if model == 'scout' else 'Core (Big)'}")
+        self.resize(1100, 750)
+
+        layout = QVBoxLayout(self)
+
+        # --------------------------
+        # Ranges
+        # --------------------------
+        grid = QGridLayout()
+        for col, header in enumerate(["Sweep", "Low", "High", "Steps"]):
+            grid.addWidget(QLabel(header), 0, col)
+
+        self.range_rows: Dict[str, Dict[str, Any]] = {}
+        for r, var in enumerate(SWEEP_VARIABLES, start=1):
+            spec = SWEEP_DEFAULTS[var]
+            try:
+                center = float(self.base_session.get(var))
+            except (TypeError, ValueError):
+                center = spec["fallback"]
+
+            enabled = QCheckBox(spec["label"])
+            enabled.setChecked(spec["on"])
+            low = QLineEdit(_fmt_num(max(0.0, center - spec["span"])))
+            high = QLineEdit(_fmt_num(center + spec["span"]))
+            steps = QLineEdit(str(spec["steps"]))
+            for w in (low, high, steps):
+                w.setMaximumWidth(90)
+            enabled.toggled.connect(self._refresh_axis_combos)
+
+            grid.addWidget(enabled, r, 0)
+            grid.addWidget(low, r, 1)
+            grid.addWidget(high, r, 2)
+            grid.addWidget(steps, r, 3)
+            self.range_rows[var] = {"enabled": enabled, "low": low, "high": high, "steps": steps}
+        layout.addLayout(grid)
+
+        # --------------------------
+        # Surface selection + run
+        # --------------------------
+        controls = QHBoxLayout()
+        self.x_combo = QComboBox()
+        self.y_combo = QComboBox()
+        self.left_target = QComboBox()
+        self.right_target = QComboBox()
+        for label, box in (("X:", self.x_combo), ("Y:", self.y_combo),
+                           ("Left:", self.left_target), ("Right:", self.right_target)):
+            controls.addWidget(QLabel(label))
+            controls.addWidget(box)
+            box.currentIndexChanged.connect(self.redraw)
+
+        self.run_btn = QPushButton("Run Sweep")
+        self.run_btn.clicked.connect(self.on_run)
+        controls.addWidget(self.run_btn)
+        layout.addLayout(controls)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+        self.canvas = FigureCanvasQTAgg(Figure(figsize=(10, 5), tight_layout=True))
+        layout.addWidget(self.canvas, 1)
+
+        self._refresh_axis_combos()
+        self.on_run()
+
+    # --------------------------
+    # Inputs
+    # --------------------------
+    def _enabled_variables(self) -> List[str]:
+        return [v for v, row in self.range_rows.items() if row["enabled"].isChecked()]
+
+    def _refresh_axis_combos(self, *_):
+        enabled = self._enabled_variables()
+        for box, default_idx in ((self.x_combo, 0), (self.y_combo, 1)):
+            current = box.currentData()
+            box.blockSignals(True)
+            box.clear()
+            for var in enabled:
+                box.addItem(SWEEP_DEFAULTS[var]["label"], userData=var)
+            idx = box.findData(current)
+            if idx < 0:
+                idx = min(default_idx, box.count() - 1)
+            box.setCurrentIndex(idx)
+            box.blockSignals(False)
+
+    def _read_ranges(self) -> Optional[Dict[str, Any]]:
+        ranges = {}
+        for var in self._enabled_variables():
+            row = self.range_rows[var]
+            try:
+                low = float(row["low"].text())
+                high = float(row["high"].text())
+                steps = int(row["steps"].text())
+            except ValueError:
+                QMessageBox.warning(self, "Invalid Range", f"{SWEEP_DEFAULTS[var]['label']}: low/high/steps must be numbers.")
+                return None
+            ranges[var] = sweep_range(low, high, steps)
+        if not ranges:
+            QMessageBox.warning(self, "Nothing to Sweep", "Select at least one variable.")
+            return None
+        return ranges
+
+    # --------------------------
+    # Run (background)
+    # --------------------------
+    def on_run(self):
+        ranges = self._read_ranges()
+        if ranges is None:
+            return
+
+        base, model, provider = dict(self.base_session), self.model, self.model_provider
+
+        def job() -> SweepResult:
+            loaded = provider() if provider is not None else None
+            if model == "scout":
+                return run_sweep(base, ranges, "scout", payload=loaded)
+            return run_sweep(base, ranges, "core", bundle=loaded)
+
+        self._task = CallableTask(job)
+        self._task.setAutoDelete(False)
+        self._task.signals.finished.connect(self._on_result)
+        self._task.signals.failed.connect(self._on_error)
+        self.run_btn.setEnabled(False)
+        self.status_label.setText("Running sweep…")
+        self.pool.start(self._task)
+
+    def _on_error(self, message: str):
+        self.run_btn.setEnabled(True)
+        self.status_label.setText("")
+        QMessageBox.critical(self, "Sweep Error", f"Error running sweep:\n{message}")
+
+    def _on_result(self, result: SweepResult):
+        self.run_btn.setEnabled(True)
+        self.result = result
+
+        status = f"{result.n_points} scenarios scored in {result.elapsed_sec * 1000:.0f} ms"
+        if result.ignored_variables:
+            labels = ", ".join(SWEEP_DEFAULTS[v]["label"] for v in result.ignored_variables)
+            status += f"  ⚠️ not used by the {result.model} model: {labels}"
+        self.status_label.setText(status)
+
+        targets = sorted(result.predictions)
+        for box, default in ((self.left_target, DEFAULT_SURFACE_TARGETS[0]),
+                             (self.right_target, DEFAULT_SURFACE_TARGETS[1])):
+            current = box.currentText() or default
+            box.blockSignals(True)
+            box.clear()
+            box.addItems(targets)
+            idx = box.findText(current)
+            box.setCurrentIndex(idx if idx >= 0 else 0)
+            box.blockSignals(False)
+
+        self.redraw()
+
+    # --------------------------
+    # Surfaces
+    # --------------------------
+    def redraw(self, *_):
+        fig = self.canvas.figure
+        fig.clear()
+        result = self.result
+        x_var, y_var = self.x_combo.currentData(), self.y_combo.currentData()
+        if result is None or x_var is None or x_var not in result.variables:
+            self.canvas.draw_idle()
+            return
+        if y_var not in result.variables:
+            y_var = x_var
+
+        for i, box in enumerate((self.left_target, self.right_target), start=1):
+            target = box.currentText()
+            if target not in result.predictions:
+                continue
+            ax = fig.add_subplot(1, 2, i)
+            surface = result.surface(target, x_var, y_var)
+            x_axis = result.axes[result.variables.index(x_var)]
+            y_axis = result.axes[result.variables.index(y_var)]
+
+            label = target
+            if target.endswith("_time_sec"):
+                surface = surface / 60.0
+                label = target.replace("_sec", "") + " (min)"
+
+            mesh = ax.pcolormesh(x_axis, y_axis if y_var != x_var else [0], surface,
+                                 shading="nearest", cmap="viridis")
+            fig.colorbar(mesh, ax=ax, label=label)
+            ax.set_xlabel(SWEEP_DEFAULTS[x_var]["label"])
+            if y_var != x_var:
+                ax.set_ylabel(SWEEP_DEFAULTS[y_var]["label"])
+            ax.set_title(label)
+
+        self.canvas.draw_idle()
+
+
+def open_what_if_sweep(
+    parent_list: List[QWidget],
+    base_session: Dict[str, Any],
+    model: str,
+    model_provider: Optional[Callable[[], Any]] = None,
+) -> WhatIfSweepWindow:
+    """Open a sweep window and keep a reference in parent_list so it isn't GC'd."""
+    win = WhatIfSweepWindow(base_session, model, model_provider)
+    parent_list.append(win)
+    win.show()
+    win.raise_()
+    win.activateWindow()
+    return win
@@ -1,19 +1,23 @@
-from scripts_main.roast_data_input_session import roast_data_input_session
-from scripts_main.capture_roast_session import capture_roast_session
-from scripts_main.edit_coffee_inventory import edit_coffee_inventory
-from scripts_main.inference_core_input_session import core_input_session
-from scripts_main.inference_scout_input_session import scout_input_session
-from scripts_main.print_core_report import print_core_report
-from scripts_main.print_scout_report import print_scout_report
-from scripts_main.train_core import main as train_core
-from scripts_main.train_scout import main as train_scout
-from scripts_main.infer_core import infer_core
-from scripts_main.infer_scout import infer_scout
+# main.py – CLI entrypoint
+#
+# Flows are imported inside the option that needs them, so the menu appears
+# without waiting for pandas/catboost/sklearn. Check the startup cost with:
+#     python -m scripts_utility.startup_benchmark
+#
+# `python main.py --profile` runs predictions (options 3 and 5) locally and
+# prints where the time went: meta read, model load, frame build, casting
+# and predict per target.
+
+import argparse
+from contextlib import nullcontext
+
 from colorama import init
 init(autoreset=True)
 
+from scripts_utility.tracing import print_breakdown, tracing
+
 
-def main():
+def main(profile: bool = False):
     while True:
         print("1. Add Roast Data")
         print("2. Add/Remove Coffee from Inventory")
@@ -24,31 +28,66 @@ def main():
         print(r"(Core Model will require lots of data before accurate inference can be made.)")
         print(r"(Run both models until you are sure.)")
         print(r"(Editing bad data will have to be done on data\roast_data.csv)")
-        print("7. Exit")
+        print("7. Build Today's Roast Plan (every inventory lot)")
+        print("8. Exit")
 
         choice = input("Select an option: ")
 
         if choice == "1":
+            from scripts_main.roast_data_input_session import roast_data_input_session
+            from scripts_main.capture_roast_session import capture_roast_session
             session_data = roast_data_input_session()
             capture_roast_session(session_data)
         elif choice == "2":
+            from scripts_main.edit_coffee_inventory import edit_coffee_inventory
             edit_coffee_inventory()
         elif choice == "3":
+            from scripts_main.inference_scout_input_session import scout_input_session
+            from scripts_main.inference_client import infer_scout_remote
+            from scripts_main.print_scout_report import print_scout_report
             flat_inputs = scout_input_session()
-            ml_filled_fields, confidence  = infer_scout(flat_inputs)
+            # Use the warm inference daemon when it is running (not when profiling)
+            remote = None if profile else infer_scout_remote(flat_inputs)
+            if remote is not None:
+                ml_filled_fields, confidence = remote
+            else:
+                from scripts_main.infer_scout import infer_scout
+                with tracing() if profile else nullcontext() as tracer:
+                    ml_filled_fields, confidence = infer_scout(flat_inputs)
             print_scout_report(flat_inputs, confidence, ml_filled_fields)
+            if profile:
+                print_breakdown(tracer, "infer_scout")
         elif choice == "4":
+            from scripts_main.train_scout import main as train_scout
             train_scout()
         elif choice == "5":
+            from scripts_main.inference_core_input_session import core_input_session
+            from scripts_main.inference_client import infer_core_remote
+            from scripts_main.print_core_report import print_core_report
             flat_inputs = core_input_session()
-            ml_filled_fields, confidence = infer_core(flat_inputs)
+            remote = None if profile else infer_core_remote(flat_inputs)
+            if remote is not None:
+                ml_filled_fields, confidence = remote
+            else:
+                from scripts_main.infer_core import infer_core
+                with tracing() if profile else nullcontext() as tracer:
+                    ml_filled_fields, confidence = infer_core(flat_inputs)
             print_core_report(flat_inputs, confidence, ml_filled_fields)
+            if profile:
+                print_breakdown(tracer, "infer_core")
         elif choice == "6":
+            from scripts_main.train_core import main as train_core
             train_core()
         elif choice == "7":
+            from scripts_main.daily_plan import daily_plan_session
+            daily_plan_session()
+        elif choice == "8":
             break
         else:
             print("Invalid choice, try again.")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="RoastMaster CLI")
+    parser.add_argument("--profile", action="store_true",
+                        help="run predictions locally and print a per-phase timing breakdown")
+    main(parser.parse_args().profile)
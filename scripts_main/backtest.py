@@ -0,0 +1,286 @@
+# scripts_main/backtest.py
+"""
+Replay the roast log through Scout or Core as if each roast were still to come.
+
+Roasts are taken in roast_date order. Every `every` roasts the model is
+retrained on all earlier roasts only (expanding window), then predicts the
+next `every` roasts from just the fields the operator would have entered:
+the Scout anchors, or Core's required form fields (bean lot, conditions,
+stage temps and the stage 1/6/9 times). Errors are summed up by target,
+by lot and by season.
+
+Windows are independent, so they run in a process pool. Each window's
+predictions are cached in models/backtest/ under a hash of its training
+and test rows, so after a new roast only the last window is re-run.
+
+Usage (from the project root):
+    python -m scripts_main.backtest [--model core] [--every 20] [--min-train 30] [--target end_temp_f]
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts_utility.master_order import (
+    CORE_PREDICTABLES,
+    SCOUT_FEATURE_ORDER,
+    SCOUT_PREDICTABLES,
+)
+from scripts_utility.paths import DATA_FILE, MODELS_DIR
+from scripts_main.daily_plan import LOT_FIELDS, lot_label
+
+BACKTEST_DIR = MODELS_DIR / "backtest"
+
+# Bump when training or the operator inputs change, so cached windows are redone
+BACKTEST_VERSION = "4"
+
+DEFAULT_EVERY = 20
+DEFAULT_MIN_TRAIN = 30
+
+# What the Core form requires (plus the bean lot it fills from inventory)
+CORE_OPERATOR_FIELDS = (
+    LOT_FIELDS
+    + ["roast_date", "room_temp_f", "humidity_pct", "room_bean_temp_f",
+       "green_bean_moisture_pct", "batch_weight_lbs"]
+    + [f"stage_{i}_temp_f" for i in range(10)]
+    + ["stage_0_time_sec", "stage_1_time_sec", "stage_6_time_sec", "stage_9_time_sec"]
+)
+
+OPERATOR_FIELDS = {"scout": SCOUT_FEATURE_ORDER, "core": CORE_OPERATOR_FIELDS}
+PREDICTABLES = {"scout": SCOUT_PREDICTABLES, "core": CORE_PREDICTABLES}
+
+SEASONS = {12: "Winter", 1: "Winter", 2: "Winter", 3: "Spring", 4: "Spring", 5: "Spring",
+           6: "Summer", 7: "Summer", 8: "Summer", 9: "Fall", 10: "Fall", 11: "Fall"}
+
+Window = Tuple[np.ndarray, np.ndarray]
+
+
+def backtest_windows(roast_df: pd.DataFrame, every: int = DEFAULT_EVERY,
+                     min_train: int = DEFAULT_MIN_TRAIN) -> List[Window]:
+    """(train, test) row positions: test blocks of `every` roasts, each trained on all earlier roasts."""
+    if "roast_date" not in roast_df.columns:
+        return []
+    dates = pd.to_datetime(roast_df["roast_date"], errors="coerce")
+    dated = np.flatnonzero(dates.notna().to_numpy())
+    order = dated[np.argsort(dates.iloc[dated].to_numpy(), kind="stable")]
+    every = max(1, every)
+    return [
+        (order[:start], order[start:start + every])
+        for start in range(max(min_train, 1), len(order), every)
+    ]
+
+
+def _window_key(model: str, roast_df: pd.DataFrame, window: Window) -> str:
+    """Hash of everything a window's result depends on."""
+    from scripts_main.train_core_config import USE_PHASE_FEATURES, USE_PROFILE_FEATURE
+
+    h = hashlib.sha1(f"{BACKTEST_VERSION}|{model}|{USE_PHASE_FEATURES}|{USE_PROFILE_FEATURE}".encode())
+    for positions in window:
+        rows = roast_df.iloc[positions]
+        h.update(pd.util.hash_pandas_object(rows, index=False).to_numpy().tobytes())
+        h.update(b"|")
+    return h.hexdigest()[:20]
+
+
+def _operator_rows(model: str, test_df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Only the fields the operator would have entered, blanks as None."""
+    from datetime import datetime
+
+    rows = []
+    for record in test_df.reindex(columns=OPERATOR_FIELDS[model]).to_dict("records"):
+        row = {k: (None if isinstance(v, float) and np.isnan(v) else v) for k, v in record.items()}
+        if model == "core":
+            # Core's form hands over real datetimes
+            for key in ("roast_date", "purchase_date"):
+                parsed = pd.to_datetime(row.get(key), errors="coerce")
+                row[key] = None if pd.isna(parsed) else datetime.combine(parsed.date(), datetime.min.time())
+        rows.append(row)
+    return rows
+
+
+def run_window(model: str, train_df: pd.DataFrame, test_df: pd.DataFrame, thread_count: int = -1) -> pd.DataFrame:
+    """Train on train_df, predict test_df from operator inputs; predictions indexed like test_df."""
+    rows = _operator_rows(model, test_df)
+
+    # Windows already run one per CPU, so each trains in its own process (workers=1).
+    # Saved hyperparameters were searched on the whole log, i.e. on this window's
+    # future, so windows train with the defaults (use_hparams=False).
+    # Training and inference print per target; keep the backtest output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        if model == "scout":
+            from scripts_main.infer_scout import infer_scout_batch
+            from scripts_main.train_scout import train_scout
+
+            X = train_df.reindex(columns=SCOUT_FEATURE_ORDER)
+            y = train_df.reindex(columns=SCOUT_PREDICTABLES)
+            models, _ = train_scout(X, y, cv=False, thread_count=thread_count, workers=1, use_hparams=False)
+            results = infer_scout_batch(rows, payload=(models, list(X.columns)))
+        else:
+            from scripts_main.infer_core import core_bundle, infer_core_batch
+            from scripts_main.train_core import fit_core, preprocess
+
+            dates = pd.to_datetime(train_df["roast_date"], errors="coerce")
+            # Phase / profile features from this window's roasts only, nothing written to disk
+            fitted, meta = fit_core(preprocess(train_df), dates, cv_folds=0, thread_count=thread_count,
+                                   cached=False, workers=1, use_hparams=False)
+            results = infer_core_batch(rows, core_bundle(meta, fitted))
+
+    return pd.DataFrame([filled for filled, _ in results], index=test_df.index,
+                        columns=PREDICTABLES[model], dtype=float)
+
+
+def _run_cached(model: str, train_df: pd.DataFrame, test_df: pd.DataFrame, path: str, thread_count: int) -> pd.DataFrame:
+    preds = run_window(model, train_df, test_df, thread_count)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    preds.to_pickle(tmp)
+    os.replace(tmp, path)
+    return preds
+
+
+def replay(
+    roast_df: pd.DataFrame,
+    model: str = "core",
+    every: int = DEFAULT_EVERY,
+    min_train: int = DEFAULT_MIN_TRAIN,
+    workers: Optional[int] = None,
+    cache_dir=BACKTEST_DIR,
+) -> pd.DataFrame:
+    """
+    Predictions for every roast after the first `min_train` (same index as
+    roast_df, one column per target). Cached windows are read back; the
+    rest run in parallel.
+    """
+    windows = backtest_windows(roast_df, every, min_train)
+    results: Dict[int, pd.DataFrame] = {}
+    todo = []
+    for w, window in enumerate(windows):
+        path = os.path.join(cache_dir, f"{model}_{_window_key(model, roast_df, window)}.pkl")
+        if os.path.exists(path):
+            try:
+                cached = pd.read_pickle(path)
+                cached.index = roast_df.index[window[1]]
+                results[w] = cached
+                continue
+            except Exception:
+                pass
+        todo.append((w, window, path))
+
+    print(f"🔁 {len(windows)} windows, {len(windows) - len(todo)} cached, {len(todo)} to train")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(todo) or 1))
+    jobs = [(model, roast_df.iloc[train], roast_df.iloc[test], path) for _, (train, test), path in todo]
+    if workers > 1:
+        # spawn: safe to start from the GUI (threads) on every platform
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            futures = [pool.submit(_run_cached, *job, 1) for job in jobs]
+            for (w, _, _), future in zip(todo, futures):
+                results[w] = future.result()
+    else:
+        for (w, _, _), job in zip(todo, jobs):
+            results[w] = _run_cached(*job, -1)
+
+    if not results:
+        return pd.DataFrame(columns=PREDICTABLES[model], dtype=float)
+    return pd.concat([results[w] for w in sorted(results)])
+
+
+def backtest_errors(roast_df: pd.DataFrame, predictions: pd.DataFrame) -> pd.DataFrame:
+    """Long table: one row per (roast, target) with actual, predicted, abs_error, lot and season."""
+    rows = roast_df.loc[predictions.index]
+    actual = rows.reindex(columns=predictions.columns).apply(pd.to_numeric, errors="coerce")
+    dates = pd.to_datetime(rows["roast_date"], errors="coerce")
+    lots = [
+        {k: v for k, v in r.items() if pd.notna(v)}
+        for r in rows.reindex(columns=LOT_FIELDS).to_dict("records")
+    ]
+    info = pd.DataFrame({
+        "roast_date": dates.dt.strftime("%Y-%m-%d"),
+        "lot": [f"{lot_label(lot)} [{str(lot.get('purchase_date', ''))[:10]}]" for lot in lots],
+        "season": dates.dt.month.map(SEASONS),
+    }, index=predictions.index)
+
+    long = pd.DataFrame({
+        "target": np.repeat(predictions.columns.to_numpy(), len(predictions)),
+        "actual": actual.to_numpy().T.ravel(),
+        "predicted": predictions.to_numpy().T.ravel(),
+    }, index=np.tile(predictions.index.to_numpy(), len(predictions.columns)))
+    long["abs_error"] = (long["actual"] - long["predicted"]).abs()
+    long = long.join(info).dropna(subset=["abs_error"])
+    return long.rename_axis("row").reset_index()
+
+
+def summarize(errors: pd.DataFrame, by: str) -> pd.DataFrame:
+    """
+    MAE per target, or per lot/season as relative error: each target's
+    absolute error over its average spread (1.0 = no better than guessing
+    the average), averaged over targets.
+    """
+    if by == "target":
+        grouped = errors.groupby("target")
+        return pd.DataFrame({"roasts": grouped.size(), "mae": grouped["abs_error"].mean()}).sort_index()
+    spread = errors.groupby("target")["actual"].transform(lambda a: (a - a.mean()).abs().mean())
+    scaled = errors.assign(relative_error=errors["abs_error"] / spread.replace(0, np.nan))
+    grouped = scaled.groupby(by)
+    return pd.DataFrame({
+        "roasts": grouped["row"].nunique(),
+        "relative_error": grouped["relative_error"].mean(),
+    }).sort_values("roasts", ascending=False)
+
+# -------------------------------------------------------------------
+# CLI
+# -------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the roast log through Scout or Core, oldest roast first.")
+    parser.add_argument("--model", choices=["scout", "core"], default="core")
+    parser.add_argument("--every", type=int, default=DEFAULT_EVERY, help="retrain after this many roasts")
+    parser.add_argument("--min-train", type=int, default=DEFAULT_MIN_TRAIN, help="roasts in the first training window")
+    parser.add_argument("--workers", type=int, default=None, help="default: all CPUs")
+    parser.add_argument("--target", default=None, help="also show this target's MAE by lot and season")
+    parser.add_argument("--out", default=None, help="write per-roast errors to this CSV")
+    args = parser.parse_args()
+
+    if not os.path.exists(DATA_FILE):
+        print(f"❌ No roast log at {DATA_FILE}")
+        return
+    roast_df = pd.read_csv(DATA_FILE)
+
+    start = time.perf_counter()
+    predictions = replay(roast_df, args.model, args.every, args.min_train, args.workers)
+    if predictions.empty:
+        print(f"⚠️ Need more than {args.min_train} dated roasts to backtest.")
+        return
+    errors = backtest_errors(roast_df, predictions)
+    print(f"✅ Replayed {len(predictions)} roasts through {args.model.title()} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    pd.set_option("display.width", 160)
+    print("\n🎯 MAE by target:")
+    print(summarize(errors, "target").to_string(float_format=lambda v: f"{v:.3f}"))
+    for by in ("season", "lot"):
+        print(f"\n📊 Relative error by {by} (1.0 = no better than guessing the average):")
+        print(summarize(errors, by).to_string(float_format=lambda v: f"{v:.2f}"))
+
+    if args.target:
+        one = errors[errors["target"] == args.target]
+        for by in ("season", "lot"):
+            print(f"\n{args.target} MAE by {by}:")
+            print(one.groupby(by)["abs_error"].agg(["size", "mean"]).to_string(float_format=lambda v: f"{v:.3f}"))
+
+    if args.out:
+        errors.to_csv(args.out, index=False)
+        print(f"\n💾 Per-roast errors saved to {args.out}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
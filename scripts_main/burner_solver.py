@@ -0,0 +1,185 @@
+# scripts_main/burner_solver.py
+"""
+Inverse solver for Core: recommend stage burner settings that hit target
+stage times.
+
+Runs a cross-entropy search over the free stage_i_burner_pct inputs
+(0–100). Each iteration samples a population of burner plans, scores the
+whole population with one predict call per target-time model, and refits
+the sampling distribution to the best plans. Stops at the time budget.
+
+Stage 1/6/9 times are inputs to Core (anchors), not predictions, so target
+times for those stages are applied directly as inputs; the search targets
+the predicted stage times (2, 3, 4, 5, 7, 8).
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from scripts_utility.master_order import CORE_FEATURE_ORDER
+from scripts_main.infer_core import (
+    preprocess,
+    build_core_frame,
+    predict_core_frame,
+    fill_core_predictions,
+    load_core_bundle,
+)
+
+BURNER_MIN = 0.0
+BURNER_MAX = 100.0
+
+# Search knobs
+DEFAULT_TIME_BUDGET_SEC = 2.0
+POPULATION_SIZE = 256
+ELITE_FRACTION = 0.1
+INITIAL_SIGMA = 20.0
+MIN_SIGMA = 0.5
+SMOOTHING = 0.7          # weight of the new elite mean/std vs. the previous one
+MAX_ITERATIONS = 200
+
+
+@dataclass
+class BurnerPlan:
+    burners: Dict[str, float]                     # solved stage_i_burner_pct values
+    target_times: Dict[str, float]                # stage_i_time_sec -> target seconds
+    predicted_times: Dict[str, float]             # stage_i_time_sec -> predicted seconds
+    mean_abs_error_sec: float
+    predicted_session: Dict[str, Any]             # full session incl. predicted curve
+    ml_filled_fields: Dict[str, Any]
+    confidence: Dict[str, float]
+    iterations: int = 0
+    evaluations: int = 0
+    elapsed_sec: float = 0.0
+    anchored_targets: List[str] = field(default_factory=list)  # targets applied as inputs
+
+
+def _is_blank(v: Any) -> bool:
+    return v is None or (isinstance(v, float) and np.isnan(v))
+
+
+def solve_burners(
+    base: Dict[str, Any],
+    target_times: Dict[str, float],
+    bundle: Optional[Dict[str, Any]] = None,
+    time_budget_sec: float = DEFAULT_TIME_BUDGET_SEC,
+    population_size: int = POPULATION_SIZE,
+    seed: int = 0,
+) -> BurnerPlan:
+    """
+    Search the burners the operator left blank so Core's predicted stage
+    times match `target_times` ({"stage_i_time_sec": seconds}).
+    Burners already set in `base` are kept fixed.
+    """
+    start = time.perf_counter()
+    if bundle is None:
+        bundle = load_core_bundle()
+    if bundle is None:
+        raise RuntimeError("No Core metadata found — have you trained models yet?")
+
+    meta = bundle["meta"]
+    feature_order = meta.get("feature_order", [])
+    models = bundle["models"]
+
+    flat = {key: base.get(key) for key in CORE_FEATURE_ORDER}
+
+    # Anchor targets are inputs; everything else must have a model to aim at
+    anchored = [t for t in target_times if t not in models and t in feature_order]
+    for t in anchored:
+        flat[t] = float(target_times[t])
+    aimed = {t: float(v) for t, v in target_times.items() if t in models}
+    if not aimed:
+        raise ValueError("None of the target times are predicted by Core; set targets for stages 2, 3, 4, 5, 7 or 8.")
+
+    # Targets are unknowns for the model, not inputs
+    for t in aimed:
+        flat[t] = None
+
+    free = [
+        f"stage_{i}_burner_pct" for i in range(10)
+        if f"stage_{i}_burner_pct" in feature_order and _is_blank(flat.get(f"stage_{i}_burner_pct"))
+    ]
+    if not free:
+        raise ValueError("Every burner is already set; clear the burners you want recommended.")
+
+    row = preprocess(dict(flat))
+    base_df = build_core_frame([row], feature_order)
+
+    # Start from what Core would predict for the burners (mid-range if it can't)
+    initial, _ = predict_core_frame({"models": {b: models[b] for b in free if b in models}}, base_df)
+    mu = np.array([float(initial[b][0]) if b in initial else 50.0 for b in free])
+    mu = np.clip(mu, BURNER_MIN, BURNER_MAX)
+    sigma = np.full(len(free), INITIAL_SIGMA)
+
+    target_names = list(aimed)
+    target_vec = np.array([aimed[t] for t in target_names])
+    time_models = {"models": {t: models[t] for t in target_names}}
+
+    population = base_df.loc[base_df.index.repeat(population_size)].reset_index(drop=True)
+    n_elite = max(2, int(population_size * ELITE_FRACTION))
+    rng = np.random.default_rng(seed)
+
+    best_x = mu.copy()
+    best_loss = np.inf
+    iterations = 0
+    evaluations = 0
+
+    while iterations < MAX_ITERATIONS:
+        candidates = np.clip(rng.normal(mu, sigma, size=(population_size, len(free))), BURNER_MIN, BURNER_MAX)
+        candidates[0] = best_x if np.isfinite(best_loss) else mu  # keep the incumbent
+        for j, col in enumerate(free):
+            population[col] = candidates[:, j]
+
+        preds, failed = predict_core_frame(time_models, population)
+        if failed:
+            raise RuntimeError(f"Core failed to predict {', '.join(failed)}")
+        predicted = np.column_stack([preds[t] for t in target_names])
+        loss = np.abs(predicted - target_vec).mean(axis=1)
+
+        iterations += 1
+        evaluations += population_size
+
+        order = np.argsort(loss)
+        if loss[order[0]] < best_loss:
+            best_loss = float(loss[order[0]])
+            best_x = candidates[order[0]].copy()
+
+        elite = candidates[order[:n_elite]]
+        mu = SMOOTHING * elite.mean(axis=0) + (1 - SMOOTHING) * mu
+        sigma = SMOOTHING * elite.std(axis=0) + (1 - SMOOTHING) * sigma
+
+        if time.perf_counter() - start >= time_budget_sec or sigma.max() < MIN_SIGMA:
+            break
+
+    # Full prediction for the winning plan (the predicted curve)
+    burners = {col: float(v) for col, v in zip(free, best_x)}
+    final_inputs = dict(row)
+    final_inputs.update(burners)
+    final_df = build_core_frame([final_inputs], feature_order)
+    final_preds, _ = predict_core_frame(bundle, final_df)
+    ml_filled_fields, confidence = fill_core_predictions(
+        final_inputs,
+        {col: values[0] for col, values in final_preds.items()},
+        bundle["confidence"],
+    )
+    ml_filled_fields.update(burners)
+
+    predicted_session = dict(base)
+    predicted_session.update(final_inputs)
+    predicted_times = {t: float(predicted_session[t]) for t in target_names}
+
+    return BurnerPlan(
+        burners=burners,
+        target_times=dict(target_times),
+        predicted_times=predicted_times,
+        mean_abs_error_sec=float(np.mean([abs(predicted_times[t] - aimed[t]) for t in target_names])),
+        predicted_session=predicted_session,
+        ml_filled_fields=ml_filled_fields,
+        confidence=confidence,
+        iterations=iterations,
+        evaluations=evaluations,
+        elapsed_sec=time.perf_counter() - start,
+        anchored_targets=anchored,
+    )
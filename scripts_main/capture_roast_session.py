@@ -70,4 +70,29 @@ def capture_roast_session(
             writer.writerow(safe_record)
 
         print(f"💾 Session appended to {csv_file} as line {line_count + 1}")
+        refresh_after_save()
         return
+
+
+def refresh_after_save() -> None:
+    """
+    Bring the derived store (fuel, phases) and the roast-log indexes up to
+    date with a roast just appended, so the next report only reads them.
+    A failure here never undoes the save.
+    """
+    try:
+        from scripts_utility.roast_log import load_roast_log
+        from scripts_main.fuel_analytics import roast_fuel
+        from scripts_main.roast_phases import roast_phases
+        from scripts_main.similar_roasts import get_similar_index
+        from scripts_main.shape_index import get_shape_index
+
+        roast_df, version = load_roast_log()
+        if roast_df is None or roast_df.empty:
+            return
+        roast_fuel(roast_df)
+        roast_phases(roast_df)
+        get_similar_index(roast_df, version)
+        get_shape_index(roast_df, version)
+    except Exception as e:
+        print(f"⚠️ Could not update the derived roast data: {e}")
@@ -0,0 +1,372 @@
+# scripts_main/daily_plan.py
+"""
+Morning roast plan: precompute Scout and Core predictions for every
+inventory lot at today's conditions.
+
+Room temp, humidity and bean temp are entered once. Every lot is paired
+with the usual batch weights, and the whole set is scored with one Scout
+batch call and one Core batch call (through the inference daemon when it
+is running). The plan is cached in models/daily_plan.json, so the input
+forms can show a lot's predictions as soon as it is selected.
+
+Usage (from the project root):
+    python -m scripts_main.daily_plan [--room-temp 68 --humidity 45 --bean-temp 66] [--weights 150,200]
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from scripts_utility.paths import DATA_FILE, MODELS_DIR, CORE_MODELS_DIR, SCOUT_MODEL_PATH
+from scripts_utility.roast_defaults import DEFAULT_ENVIRONMENT, default_session
+
+DAILY_PLAN_PATH = MODELS_DIR / "daily_plan.json"
+CORE_META_PATH = CORE_MODELS_DIR / "ml_catboost_meta.json"
+
+# Fields entered once per morning
+CONDITION_KEYS = ["room_temp_f", "humidity_pct", "room_bean_temp_f"]
+
+# Inventory fields copied into each session (and used to identify a lot)
+LOT_FIELDS = ["supplier", "country", "region", "altitude_meters", "variety", "process_method", "purchase_date"]
+LOT_KEY_FIELDS = ["id", "supplier", "country", "region", "variety", "process_method", "purchase_date"]
+
+DEFAULT_BATCH_WEIGHT_COUNT = 3
+
+
+def _is_blank(v: Any) -> bool:
+    return v is None or v == "" or (isinstance(v, float) and v != v)
+
+
+def _clean(v: Any) -> Any:
+    """NaN → None and numpy scalars → Python, so entries round-trip through JSON."""
+    if hasattr(v, "item"):
+        v = v.item()
+    return None if _is_blank(v) else v
+
+
+def _file_stamp(path) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def model_stamps() -> Dict[str, Optional[List[int]]]:
+    """Stamps of the model files a plan was scored with (a rebuild invalidates it)."""
+    return {"scout": _file_stamp(SCOUT_MODEL_PATH), "core": _file_stamp(CORE_META_PATH)}
+
+
+def lot_key(lot: Dict[str, Any]) -> str:
+    """Stable key for an inventory row (same key from the CSV and from the GUI combos)."""
+    parts = []
+    for field in LOT_KEY_FIELDS:
+        v = _clean(lot.get(field))
+        if isinstance(v, float) and v.is_integer():
+            v = int(v)
+        parts.append("" if v is None else str(v).strip().lower())
+    return "|".join(parts)
+
+
+def lot_label(lot: Dict[str, Any]) -> str:
+    desc = f"{lot.get('supplier') or '?'} - {lot.get('country') or '?'} {lot.get('region') or ''}".strip()
+    extras = [str(lot[k]) for k in ("variety", "process_method") if lot.get(k)]
+    if extras:
+        desc += f" ({', '.join(extras)})"
+    return desc
+
+
+def usual_batch_weights(roast_path=DATA_FILE, n: int = DEFAULT_BATCH_WEIGHT_COUNT) -> List[float]:
+    """The n most common batch weights in the roast log (default weight if there is no history)."""
+    import pandas as pd
+
+    fallback = [DEFAULT_ENVIRONMENT["batch_weight_lbs"]]
+    if not os.path.exists(roast_path):
+        return fallback
+    try:
+        weights = pd.read_csv(roast_path, usecols=["batch_weight_lbs"])["batch_weight_lbs"]
+    except (ValueError, OSError, pd.errors.EmptyDataError):
+        return fallback
+    weights = pd.to_numeric(weights, errors="coerce").dropna().round()
+    if weights.empty:
+        return fallback
+    return sorted(float(w) for w in weights.value_counts().index[:n])
+
+# -------------------------------------------------------------------
+# Build
+# -------------------------------------------------------------------
+
+def _parse_date(value: Any) -> Optional[datetime]:
+    if _is_blank(value):
+        return None
+    try:
+        return datetime.strptime(str(value).strip().split(" ")[0], "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def lot_session(lot: Dict[str, Any], conditions: Dict[str, float], batch_weight: float) -> Dict[str, Any]:
+    """Usual profile + inventory metadata + today's conditions for one lot/weight."""
+    session = default_session(batch_weight_lbs=float(batch_weight))
+    for field in LOT_FIELDS:
+        v = _clean(lot.get(field))
+        if v is not None:
+            session[field] = v
+    session.update({k: float(v) for k, v in conditions.items() if v is not None})
+    return session
+
+
+# (flat row, ml_filled_fields, confidence) per session
+Scored = Tuple[Dict[str, Any], Dict[str, Any], Dict[str, float]]
+
+
+def score_scout_sessions(sessions: List[Dict[str, Any]], payload: Optional[Tuple[dict, list]] = None) -> Optional[List[Scored]]:
+    """One Scout batch call for all sessions (daemon first); None if there is no model."""
+    from scripts_utility.master_order import SCOUT_FEATURE_ORDER
+    from scripts_main.inference_client import infer_scout_batch_remote
+
+    rows = [{key: s.get(key) for key in SCOUT_FEATURE_ORDER} for s in sessions]
+    results = infer_scout_batch_remote(rows)
+    if results is None:
+        if payload is None and not os.path.exists(SCOUT_MODEL_PATH):
+            print("⚠️ No Scout model found — skipping Scout predictions.")
+            return None
+        from scripts_main.infer_scout import infer_scout_batch
+        results = infer_scout_batch(rows, payload=payload)
+    return [(row, ml_filled_fields, confidence) for row, (ml_filled_fields, confidence) in zip(rows, results)]
+
+
+def score_core_sessions(
+    sessions: List[Dict[str, Any]],
+    roast_day: datetime,
+    bundle: Optional[Dict[str, Any]] = None,
+) -> Optional[List[Scored]]:
+    """One Core batch call for all sessions (daemon first); None if there is no model."""
+    from scripts_utility.master_order import CORE_FEATURE_ORDER
+    from scripts_main.inference_client import infer_core_batch_remote
+
+    rows = []
+    for s in sessions:
+        row = {key: s.get(key) for key in CORE_FEATURE_ORDER}
+        # Core derives day-of-year and bean age from datetimes
+        row["roast_date"] = roast_day
+        purchased = _parse_date(s.get("purchase_date"))
+        if purchased is not None:
+            row["purchase_date"] = purchased
+        rows.append(row)
+
+    results = infer_core_batch_remote(rows)
+    if results is None:
+        if bundle is None and not os.path.exists(CORE_META_PATH):
+            print("⚠️ No Core model found — skipping Core predictions.")
+            return None
+        from scripts_main.infer_core import infer_core_batch
+        results = infer_core_batch(rows, bundle=bundle)
+    return [(row, ml_filled_fields, confidence) for row, (ml_filled_fields, confidence) in zip(rows, results)]
+
+
+def merge_prediction(session: Dict[str, Any], scored: Scored) -> Dict[str, Any]:
+    """Session + model outputs as {predicted_session, ml_filled_fields, confidence} (JSON-safe)."""
+    row, ml_filled_fields, confidence = scored
+    predicted_session = dict(session)
+    predicted_session.update(row)
+    predicted_session.update(ml_filled_fields)
+    return {
+        "predicted_session": {k: _clean(v) for k, v in predicted_session.items()},
+        "ml_filled_fields": {k: _clean(v) for k, v in ml_filled_fields.items()},
+        "confidence": {k: _clean(v) for k, v in confidence.items()},
+    }
+
+
+def build_daily_plan(
+    conditions: Dict[str, float],
+    batch_weights: Optional[Sequence[float]] = None,
+    lots: Optional[List[Dict[str, Any]]] = None,
+    plan_date: Optional[date] = None,
+    save: bool = True,
+    payload: Optional[Tuple[dict, list]] = None,
+    bundle: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Score every inventory lot × batch weight at `conditions`
+    ({room_temp_f, humidity_pct, room_bean_temp_f}) and cache the plan.
+    Pass a preloaded Scout `payload` / Core `bundle` to skip reading models from disk.
+    """
+    start = time.perf_counter()
+    plan_date = plan_date or date.today()
+    if lots is None:
+        from scripts_main.edit_coffee_inventory import load_inventory
+        lots = [row.to_dict() for _, row in load_inventory().iterrows()]
+    if not batch_weights:
+        batch_weights = usual_batch_weights()
+    batch_weights = [float(w) for w in batch_weights]
+    conditions = {k: _clean(conditions.get(k)) for k in CONDITION_KEYS}
+
+    pairs = [(lot, w) for lot in lots for w in batch_weights]
+    sessions = [lot_session(lot, conditions, w) for lot, w in pairs]
+
+    stamps = model_stamps()
+    roast_day = datetime.combine(plan_date, datetime.min.time())
+    scout_scored = score_scout_sessions(sessions, payload) if sessions else None
+    core_scored = score_core_sessions(sessions, roast_day, bundle) if sessions else None
+
+    entries = []
+    for i, ((lot, weight), session) in enumerate(zip(pairs, sessions)):
+        entries.append({
+            "lot_key": lot_key(lot),
+            "lot": {k: _clean(lot.get(k)) for k in ["id"] + LOT_FIELDS},
+            "label": lot_label(lot),
+            "batch_weight_lbs": weight,
+            "scout": merge_prediction(session, scout_scored[i]) if scout_scored else None,
+            "core": merge_prediction(session, core_scored[i]) if core_scored else None,
+        })
+
+    plan = {
+        "plan_date": plan_date.isoformat(),
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "conditions": conditions,
+        "batch_weights": batch_weights,
+        "model_stamps": stamps,
+        "elapsed_sec": round(time.perf_counter() - start, 3),
+        "entries": entries,
+    }
+    if save:
+        save_daily_plan(plan)
+    return plan
+
+# -------------------------------------------------------------------
+# Cache
+# -------------------------------------------------------------------
+
+# (file stamp, plan) so repeated lookups from the forms skip the JSON parse
+_loaded: Tuple[Optional[List[int]], Optional[Dict[str, Any]]] = (None, None)
+
+
+def save_daily_plan(plan: Dict[str, Any], path=DAILY_PLAN_PATH) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(plan, f, indent=1, default=str)
+    os.replace(tmp, path)
+
+
+def load_daily_plan(path=DAILY_PLAN_PATH, today: Optional[date] = None) -> Optional[Dict[str, Any]]:
+    """
+    Today's cached plan, or None if there is none, it was built on
+    another day, or the models were rebuilt since.
+    """
+    global _loaded
+    stamp = _file_stamp(path)
+    if stamp is None:
+        return None
+    if stamp != _loaded[0]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                _loaded = (stamp, json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read {path}: {e}")
+            return None
+
+    plan = _loaded[1]
+    if plan.get("plan_date") != (today or date.today()).isoformat():
+        return None
+    if plan.get("model_stamps") != model_stamps():
+        return None
+    return plan
+
+
+def lookup_plan_entry(
+    plan: Optional[Dict[str, Any]],
+    lot: Optional[Dict[str, Any]],
+    batch_weight: Optional[float] = None,
+) -> Optional[Dict[str, Any]]:
+    """Plan entry for a lot; the batch weight nearest `batch_weight` when several were scored."""
+    if not plan or not isinstance(lot, dict):
+        return None
+    key = lot_key(lot)
+    matches = [e for e in plan.get("entries", []) if e.get("lot_key") == key]
+    if not matches:
+        return None
+    if batch_weight is None:
+        return matches[0]
+    return min(matches, key=lambda e: abs(float(e["batch_weight_lbs"]) - float(batch_weight)))
+
+# -------------------------------------------------------------------
+# CLI
+# -------------------------------------------------------------------
+
+def _summary(prediction: Optional[Dict[str, Any]]) -> str:
+    from scripts_utility.capture import seconds_to_mmss
+
+    if not prediction:
+        return "—"
+    s = prediction["predicted_session"]
+
+    def num(key: str, unit: str) -> str:
+        return f"{float(s[key]):.0f}{unit}" if s.get(key) is not None else "n/a"
+
+    return (
+        f"TP {seconds_to_mmss(s.get('turning_point_time_sec'))}"
+        f"  S8 {seconds_to_mmss(s.get('stage_8_time_sec'))}"
+        f"  S9 burner {num('stage_9_burner_pct', '%')}"
+        f"  end {num('end_temp_f', '°F')}"
+    )
+
+
+def print_daily_plan(plan: Dict[str, Any]) -> None:
+    c = plan["conditions"]
+    print(f"\n📋 Roast plan for {plan['plan_date']} — room {c.get('room_temp_f')}°F, "
+          f"humidity {c.get('humidity_pct')}%, beans {c.get('room_bean_temp_f')}°F")
+    if not plan["entries"]:
+        print("📂 Inventory is empty — nothing to plan.\n")
+        return
+    for entry in plan["entries"]:
+        print(f"\n☕ {entry['label']} @ {entry['batch_weight_lbs']:.0f} lbs")
+        print(f"   Scout: {_summary(entry['scout'])}")
+        print(f"   Core:  {_summary(entry['core'])}")
+    print(f"\n✅ {len(plan['entries'])} plans scored in {plan['elapsed_sec']:.2f}s, saved to {DAILY_PLAN_PATH}\n")
+
+
+def daily_plan_session() -> None:
+    """Interactive flow for main.py: enter today's conditions once, build and print the plan."""
+    from scripts_utility.capture import get_optional_validated_input
+
+    print("\n🌅 Today's conditions (Enter to keep the default)")
+    conditions = {}
+    for key, label, lo, hi in (
+        ("room_temp_f", "Room Temp (°F)", 0, 130),
+        ("humidity_pct", "Humidity (%)", 0, 100),
+        ("room_bean_temp_f", "Starting Bean Temp (°F)", 0, 130),
+    ):
+        value = get_optional_validated_input(f"{label} [{DEFAULT_ENVIRONMENT[key]:g}]: ", float, lo, hi)
+        conditions[key] = DEFAULT_ENVIRONMENT[key] if value is None else value
+
+    weights = usual_batch_weights()
+    raw = input(f"Batch weights in lbs, comma-separated [{', '.join(f'{w:g}' for w in weights)}]: ").strip()
+    if raw:
+        try:
+            weights = [float(w) for w in raw.split(",") if w.strip()]
+        except ValueError:
+            print("⚠️ Could not read those weights; using the usual ones.")
+
+    print_daily_plan(build_daily_plan(conditions, weights))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute today's Scout/Core predictions for every inventory lot.")
+    parser.add_argument("--room-temp", type=float, default=DEFAULT_ENVIRONMENT["room_temp_f"])
+    parser.add_argument("--humidity", type=float, default=DEFAULT_ENVIRONMENT["humidity_pct"])
+    parser.add_argument("--bean-temp", type=float, default=DEFAULT_ENVIRONMENT["room_bean_temp_f"])
+    parser.add_argument("--weights", type=str, default="", help="comma-separated batch weights (default: most common in the roast log)")
+    args = parser.parse_args()
+
+    weights = [float(w) for w in args.weights.split(",") if w.strip()] or None
+    conditions = {"room_temp_f": args.room_temp, "humidity_pct": args.humidity, "room_bean_temp_f": args.bean_temp}
+    print_daily_plan(build_daily_plan(conditions, weights))
+
+
+if __name__ == "__main__":
+    main()
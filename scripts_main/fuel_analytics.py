@@ -0,0 +1,192 @@
+# scripts_main/fuel_analytics.py
+"""
+Fuel estimates from burner settings.
+
+Stage i's burner % runs from stage i to stage i+1, so a roast's fuel is
+
+    Σ_{i=0..8} stage_i_burner_pct / 100 × (stage_{i+1}_time_sec − stage_i_time_sec)
+
+expressed in full-burner minutes (1.0 = one minute at 100 %). The whole
+roast log is computed in one vectorized pass and cached in the derived
+store (data/roast_derived.csv), which is brought up to date when a roast
+is saved; reports only read it. The same function scores predicted
+sessions and scheduler plans.
+
+Usage (from the project root):
+    python -m scripts_main.fuel_analytics [--btu-per-hour 1200000]
+"""
+
+import argparse
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from scripts_utility.paths import DATA_FILE
+
+FUEL_GROUP = "fuel"
+FUEL_COLUMNS = ["fuel_burner_min", "fuel_burner_min_per_lb"]
+
+TIME_COLUMNS = [f"stage_{i}_time_sec" for i in range(10)]
+BURNER_COLUMNS = [f"stage_{i}_burner_pct" for i in range(10)]
+FUEL_INPUT_COLUMNS = TIME_COLUMNS + BURNER_COLUMNS + ["batch_weight_lbs"]
+
+
+def burner_time_integral(times: np.ndarray, burners: np.ndarray) -> np.ndarray:
+    """
+    Full-burner minutes per row from (n, 10) stage times and burner %.
+    Rows with any missing stage time or burner (stages 0–8) are NaN.
+    """
+    times = np.asarray(times, dtype=float)
+    burners = np.asarray(burners, dtype=float)
+    durations = np.diff(times, axis=1)                       # stage i → i+1
+    return (burners[:, :-1] / 100.0 * durations).sum(axis=1) / 60.0
+
+
+def fuel_arrays(rows: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """(fuel_burner_min, fuel_burner_min_per_lb) for a DataFrame of roasts or sessions."""
+    import pandas as pd
+
+    df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(rows)
+    df = df.reindex(columns=FUEL_INPUT_COLUMNS)
+    numeric = df.apply(pd.to_numeric, errors="coerce")
+    fuel = burner_time_integral(numeric[TIME_COLUMNS].to_numpy(), numeric[BURNER_COLUMNS].to_numpy())
+    weight = numeric["batch_weight_lbs"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_lb = np.where(weight > 0, fuel / weight, np.nan)
+    return fuel, per_lb
+
+
+def compute_fuel(df):
+    """Derived-store compute function: FUEL_COLUMNS for each row of df."""
+    import pandas as pd
+
+    fuel, per_lb = fuel_arrays(df)
+    return pd.DataFrame({"fuel_burner_min": fuel, "fuel_burner_min_per_lb": per_lb}, index=df.index)
+
+
+def session_fuel(session: Dict[str, Any], fill_from_history: bool = True) -> Optional[float]:
+    """
+    Full-burner minutes for one (predicted) session, or None if a stage is
+    missing. Burners no model predicts (e.g. a stage 0 setting that never
+    changes) are taken from the roast log median when fill_from_history is set.
+    """
+    times = [_to_float(session.get(c)) for c in TIME_COLUMNS]
+    burners = [_to_float(session.get(c)) for c in BURNER_COLUMNS]
+    if fill_from_history and any(np.isnan(burners[:-1])):
+        medians = _history_stats()[1]
+        burners = [medians.get(c, b) if np.isnan(b) else b for c, b in zip(BURNER_COLUMNS, burners)]
+    fuel = float(burner_time_integral([times], [burners])[0])
+    return None if np.isnan(fuel) else fuel
+
+
+def _to_float(v: Any) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+# -------------------------------------------------------------------
+# Roast log (cached in the derived store)
+# -------------------------------------------------------------------
+
+def roast_fuel(roast_df=None, save: bool = True):
+    """
+    FUEL_COLUMNS for every roast in the log, computing only new/edited
+    roasts; save=False leaves the derived store untouched.
+    """
+    import pandas as pd
+    from scripts_utility.derived_store import ensure_derived
+
+    if roast_df is None:
+        roast_df = pd.read_csv(DATA_FILE) if os.path.exists(DATA_FILE) else pd.DataFrame()
+    return ensure_derived(roast_df, FUEL_GROUP, FUEL_INPUT_COLUMNS, FUEL_COLUMNS, compute_fuel, save=save)
+
+
+# roast log stamp -> (median full-burner minutes per lb, median burner % per stage)
+_history: Tuple[Optional[Tuple[int, int]], Optional[float], Dict[str, float]] = (None, None, {})
+
+
+def _history_stats() -> Tuple[Optional[float], Dict[str, float]]:
+    """Roast log medians, recomputed only when the log changes. Read-only (reports call this)."""
+    global _history
+    import pandas as pd
+    from scripts_utility.roast_log import load_roast_log
+
+    roast_df, stamp = load_roast_log()
+    if roast_df is None:
+        return None, {}
+    if stamp != _history[0]:
+        try:
+            per_lb = roast_fuel(roast_df, save=False)["fuel_burner_min_per_lb"].dropna()
+            burners = roast_df.reindex(columns=BURNER_COLUMNS).apply(pd.to_numeric, errors="coerce").median()
+            _history = (
+                stamp,
+                float(per_lb.median()) if not per_lb.empty else None,
+                {c: float(v) for c, v in burners.items() if not np.isnan(v)},
+            )
+        except Exception as e:
+            print(f"⚠️ Could not compute historical fuel use: {e}")
+            return None, {}
+    return _history[1], _history[2]
+
+
+def history_fuel_per_lb() -> Optional[float]:
+    """Median full-burner minutes per lb across the roast log."""
+    return _history_stats()[0]
+
+
+def fuel_summary(session: Dict[str, Any]) -> Optional[str]:
+    """'Estimated Fuel' line for reports, compared with the roast log median per lb."""
+    fuel = session_fuel(session)
+    if fuel is None:
+        return None
+    text = f"{fuel:.1f} full-burner min"
+    weight = _to_float(session.get("batch_weight_lbs"))
+    if weight > 0:
+        per_lb = fuel / weight
+        text += f" ({per_lb:.3f}/lb"
+        median = history_fuel_per_lb()
+        if median:
+            text += f", history median {median:.3f}/lb, {100.0 * (per_lb / median - 1):+.0f}%"
+        text += ")"
+    return text
+
+# -------------------------------------------------------------------
+# CLI
+# -------------------------------------------------------------------
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Estimate fuel use for every roast in the log.")
+    parser.add_argument("--btu-per-hour", type=float, default=None,
+                        help="burner rating at 100%%, to convert full-burner minutes into BTU")
+    parser.add_argument("--top", type=int, default=5, help="show the N heaviest roasts")
+    args = parser.parse_args()
+
+    if not os.path.exists(DATA_FILE):
+        print(f"❌ No roast log at {DATA_FILE}")
+        return
+    roast_df = pd.read_csv(DATA_FILE)
+    fuel = roast_fuel(roast_df)
+    known = fuel["fuel_burner_min"].notna()
+
+    print(f"\n🔥 Fuel for {int(known.sum())} of {len(roast_df)} roasts (others are missing a stage time or burner)")
+    if not known.any():
+        return
+    print(f"   Median: {fuel.loc[known, 'fuel_burner_min'].median():.1f} full-burner min per batch, "
+          f"{fuel.loc[known, 'fuel_burner_min_per_lb'].median():.3f} per lb")
+    if args.btu_per_hour:
+        total_btu = fuel.loc[known, "fuel_burner_min"].sum() / 60.0 * args.btu_per_hour
+        print(f"   Total: {total_btu:,.0f} BTU")
+
+    cols: List[str] = [c for c in ("roast_date", "country", "batch_weight_lbs") if c in roast_df.columns]
+    top = roast_df.loc[known, cols].join(fuel.loc[known]).nlargest(args.top, "fuel_burner_min")
+    print(f"\nHeaviest {len(top)} roasts:")
+    print(top.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+# scripts_main/hparam_search.py
+"""
+Per-target hyperparameter search for Scout and Core.
+
+Candidate CatBoost settings (depth, learning rate, L2 regularization) are
+scored on each target's validation block — its newest roasts — by
+successive halving:
+
+  rung 0: every candidate trains up to max_iterations / ETA**2 trees
+  rung 1: the best 1/ETA per target continue with max_iterations / ETA
+  rung 2: the best of those with the full max_iterations
+
+Each trial early-stops, so the score is the candidate's best validation
+MAE at that tree budget. All targets' trials of a rung share one process
+pool. The search stops handing out trials once the wall-clock budget is
+spent, keeping the best candidate each target has reached so far.
+
+Every trial result is cached in models/hparam_trials.json under a hash of
+the target's rows, the settings and the tree budget, so a repeated search
+on unchanged data only runs trials it has not seen. Once a target's rows
+change, its older trials are dropped from the cache. The winners are saved
+to models/hparams.json (train_core_config.HPARAMS_PATH), which normal
+Scout and Core retrains pick up.
+
+Usage (from the project root):
+    python -m scripts_main.hparam_search --model core --budget 10
+    python -m scripts_main.hparam_search --model both --budget 30 --workers 4
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts_main.light_models import CATBOOST_MIN_ROWS
+from scripts_main.model_evaluation import EARLY_STOPPING_ROUNDS, MIN_ITERATIONS, validation_split
+from scripts_main.train_core_config import HPARAMS_PATH
+from scripts_utility.paths import MODELS_DIR
+
+TRIALS_PATH = MODELS_DIR / "hparam_trials.json"
+TRIALS_VERSION = "2"
+
+SEARCH_SPACE = {
+    "depth": [4, 6, 8],
+    "learning_rate": [0.03, 0.05, 0.1, 0.2],
+    "l2_leaf_reg": [1, 3, 10],
+}
+DEFAULT_CONFIGS = 12   # candidates sampled from SEARCH_SPACE (plus the current defaults)
+DEFAULT_BUDGET_MIN = 10.0
+ETA = 3                # keep the best 1/ETA of each target's candidates per rung
+RUNGS = 3
+
+Config = Dict[str, Any]
+Trial = Tuple[str, Config, int]  # (target, config, tree budget)
+
+
+# ----------------------------
+# Candidates and rungs
+# ----------------------------
+def sample_configs(defaults: Config, n: int = DEFAULT_CONFIGS, seed: int = 42) -> List[Config]:
+    """The default settings first, then n others drawn from SEARCH_SPACE."""
+    keys = list(SEARCH_SPACE)
+    grid = [dict(zip(keys, values)) for values in itertools.product(*SEARCH_SPACE.values())]
+    base = {k: defaults.get(k, 3 if k == "l2_leaf_reg" else None) for k in keys}  # CatBoost's l2 default is 3
+    others = [c for c in grid if c != base]
+    picks = np.random.default_rng(seed).permutation(len(others))[:n]
+    return [base] + [others[i] for i in sorted(picks)]
+
+
+def rung_iterations(max_iterations: int, rungs: int = RUNGS) -> List[int]:
+    """Tree budget per rung, growing by ETA up to max_iterations."""
+    return [max(MIN_ITERATIONS, int(max_iterations / ETA ** (rungs - 1 - r))) for r in range(rungs)]
+
+
+def _config_key(config: Config) -> str:
+    return json.dumps(config, sort_keys=True)
+
+
+# ----------------------------
+# Trials
+# ----------------------------
+def _fit_trial(
+    params: Dict[str, Any],
+    X: pd.DataFrame,
+    y: pd.Series,
+    train: np.ndarray,
+    val: np.ndarray,
+) -> Tuple[float, int]:
+    """(validation MAE, best tree count) for one candidate at one tree budget."""
+    from catboost import CatBoostRegressor
+
+    y_val = y.iloc[val].to_numpy()
+    if y.iloc[train].nunique() <= 1:
+        return float(np.abs(y_val - y.iloc[train].mean()).mean()), MIN_ITERATIONS
+    model = CatBoostRegressor(**params, early_stopping_rounds=EARLY_STOPPING_ROUNDS, use_best_model=True)
+    model.fit(X.iloc[train], y.iloc[train], eval_set=(X.iloc[val], y.iloc[val]))
+    pred = model.predict(X.iloc[val])
+    mae = float(np.abs(y_val - pred).mean())
+    return mae, max(MIN_ITERATIONS, int(model.get_best_iteration()) + 1)
+
+
+def _data_hash(model: str, X: pd.DataFrame, y: pd.Series, params: Dict[str, Any]) -> str:
+    """Hash of a target's rows and the fixed CatBoost arguments."""
+    fixed = {k: v for k, v in params.items() if k not in ("thread_count", "verbose")}
+    h = hashlib.sha1(f"{TRIALS_VERSION}|{model}|{json.dumps(fixed, sort_keys=True, default=str)}".encode())
+    h.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    h.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:20]
+
+
+def _trial_key(model: str, data_hash: str, target: str, config: Config, iterations: int) -> str:
+    return f"{TRIALS_VERSION}|{model}|{target}|{data_hash}|{_config_key(config)}|{iterations}"
+
+
+def _write_json(path, data: Any, **kwargs) -> None:
+    """Write via a temp file so a crash or a second search never leaves half a file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, **kwargs)
+    os.replace(tmp, path)
+
+
+def load_trials() -> Dict[str, List[float]]:
+    """{trial key: [validation MAE, best tree count]}; {} if there is no cache yet."""
+    try:
+        with open(TRIALS_PATH) as f:
+            trials = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # Keys from an older TRIALS_VERSION can never match again
+    return {k: v for k, v in trials.items() if k.startswith(f"{TRIALS_VERSION}|")}
+
+
+def save_trials(trials: Dict[str, List[float]]) -> None:
+    _write_json(TRIALS_PATH, trials)
+
+
+def prune_trials(trials: Dict[str, List[float]], model: str, data_hashes: Dict[str, str]) -> int:
+    """Drop `model` trials of the given targets whose rows have changed since; returns how many."""
+    stale = []
+    for key in trials:
+        _, key_model, target, data_hash, _ = key.split("|", 4)
+        if key_model == model and target in data_hashes and data_hash != data_hashes[target]:
+            stale.append(key)
+    for key in stale:
+        del trials[key]
+    return len(stale)
+
+
+def _run_trials(
+    params: List[Dict[str, Any]],
+    jobs: List[Tuple],
+    workers: int,
+    deadline: float,
+) -> List[Optional[Tuple[float, int]]]:
+    """_fit_trial for each job until the deadline; None for jobs that never ran."""
+    results: List[Optional[Tuple[float, int]]] = [None] * len(jobs)
+    if workers <= 1:
+        for i, (p, job) in enumerate(zip(params, jobs)):
+            if time.monotonic() >= deadline:
+                break
+            results[i] = _fit_trial(p, *job)
+        return results
+
+    # spawn: safe to start from the GUI (threads) on every platform
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        futures = {
+            pool.submit(_fit_trial, {**p, "thread_count": 1}, *job): i
+            for i, (p, job) in enumerate(zip(params, jobs))
+        }
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            for f in done:
+                results[futures[f]] = f.result()
+            if time.monotonic() >= deadline:
+                # Trials already running finish; queued ones are dropped
+                for f in pending:
+                    f.cancel()
+                break
+    return results
+
+
+# ----------------------------
+# Successive halving
+# ----------------------------
+def search(
+    model: str,
+    datasets: Dict[str, Tuple[pd.DataFrame, pd.Series, Optional[pd.Series]]],
+    params: Dict[str, Any],
+    budget_s: float,
+    n_configs: int = DEFAULT_CONFIGS,
+    max_iterations: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    {target: {"params": winning config + "iterations", "val_mae", "default_mae",
+    "trials"}} for every target with a validation block. `params` are the
+    trainer's CatBoostRegressor arguments; candidates override depth,
+    learning_rate and l2_leaf_reg.
+    """
+    deadline = time.monotonic() + budget_s
+    max_iterations = max_iterations or 2 * params["iterations"]
+    budgets = rung_iterations(max_iterations)
+    configs = sample_configs(params, n_configs)
+    cache = load_trials()
+
+    prepared = {}
+    for target, (X, y, dates) in datasets.items():
+        split = validation_split(len(y), dates)
+        if split is None:
+            print(f"⚠️ {target}: too few rows for a validation block, keeps the defaults")
+            continue
+        X, y = X.reset_index(drop=True), y.reset_index(drop=True)
+        prepared[target] = (X, y, *split, _data_hash(model, X, y, params))
+
+    pruned = prune_trials(cache, model, {target: p[4] for target, p in prepared.items()})
+    if pruned:
+        print(f"🧹 Dropped {pruned} cached trials from before the data changed")
+
+    alive = {target: list(configs) for target in prepared}
+    scores: Dict[str, Dict[Tuple[str, int], Tuple[float, int]]] = {t: {} for t in prepared}
+    workers = max(1, workers or os.cpu_count() or 1)
+
+    for rung, iterations in enumerate(budgets):
+        trials: List[Trial] = [(t, c, iterations) for t, cs in alive.items() for c in cs]
+        todo = []
+        for target, config, its in trials:
+            key = _trial_key(model, prepared[target][4], target, config, its)
+            if key in cache:
+                scores[target][(_config_key(config), its)] = tuple(cache[key])
+            else:
+                todo.append((target, config, its, key))
+
+        print(f"🔎 Rung {rung + 1}/{len(budgets)}: {len(trials)} trials up to {iterations} trees "
+              f"({len(trials) - len(todo)} cached)")
+        results = _run_trials(
+            [{**params, **config, "iterations": its} for _, config, its, _ in todo],
+            [prepared[target][:4] for target, *_ in todo],
+            min(workers, max(1, len(todo))),
+            deadline,
+        )
+        for (target, config, its, key), result in zip(todo, results):
+            if result is not None:
+                cache[key] = list(result)
+                scores[target][(_config_key(config), its)] = result
+        save_trials(cache)
+
+        if any(r is None for r in results):
+            print("⏰ Budget spent — keeping the best settings found so far")
+            break
+
+        # Successive halving: only the best 1/ETA of each target's candidates
+        # continue, plus the defaults so the winner is compared at the same budget
+        for target, cs in alive.items():
+            ranked = sorted(cs, key=lambda c: scores[target][(_config_key(c), iterations)][0])
+            kept = ranked[:max(1, math.ceil((len(cs) - 1) / ETA))]
+            alive[target] = kept if configs[0] in kept else [configs[0]] + kept
+
+        if time.monotonic() >= deadline and rung < len(budgets) - 1:
+            print("⏰ Budget spent — keeping the best settings found so far")
+            break
+
+    best = {}
+    for target, target_scores in scores.items():
+        if not target_scores:
+            continue
+        # Highest tree budget reached wins over lower rungs, then lowest MAE
+        top = max(its for _, its in target_scores)
+        config_key, its = min(
+            (k for k in target_scores if k[1] == top), key=lambda k: target_scores[k][0]
+        )
+        default = target_scores.get((_config_key(configs[0]), top))
+        best[target] = {
+            "params": {**json.loads(config_key), "iterations": its},
+            "val_mae": target_scores[(config_key, its)][0],
+            "default_mae": default[0] if default else None,
+            "trials": len(target_scores),
+        }
+    return best
+
+
+def save_hparams(model: str, best: Dict[str, Dict[str, Any]]) -> None:
+    """Merge one model's winners into HPARAMS_PATH; other targets and models are kept."""
+    try:
+        with open(HPARAMS_PATH) as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        saved = {}
+    saved.setdefault(model, {}).update({target: result["params"] for target, result in best.items()})
+    _write_json(HPARAMS_PATH, saved, indent=2)
+
+
+def print_results(model: str, best: Dict[str, Dict[str, Any]]) -> None:
+    if not best:
+        print(f"⚠️ No {model} targets searched.")
+        return
+    width = max(len(t) for t in best)
+    print(f"\n🏁 {model.title()} settings (validation MAE on the newest roasts)")
+    print(f"   {'target'.ljust(width)}  depth     lr  l2  trees   val MAE   default  trials")
+    for target, r in best.items():
+        p = r["params"]
+        default = f"{r['default_mae']:.3f}" if r["default_mae"] is not None else "n/a"
+        print(f"   {target.ljust(width)}  {p['depth']:>5} {p['learning_rate']:>6} {p['l2_leaf_reg']:>3} "
+              f"{p['iterations']:>6} {r['val_mae']:>9.3f} {default:>9} {r['trials']:>7}")
+
+
+# ----------------------------
+# Training data, as the trainers build it
+# ----------------------------
+def load_datasets(model: str):
+    """(datasets, params) exactly as train_core / train_scout would train them."""
+    if model == "core":
+        from scripts_main.train_core import core_datasets, core_params, load_roast_data, preprocess
+
+        df = load_roast_data()
+        if df.empty:
+            return {}, {}
+        dates = pd.to_datetime(df["roast_date"], errors="coerce") if "roast_date" in df.columns else None
+        datasets, valid_features, _ = core_datasets(preprocess(df), dates)
+        return datasets, core_params(valid_features)
+
+    from scripts_main.train_scout import preprocess, scout_datasets, scout_params
+    from scripts_utility.master_order import SCOUT_FEATURE_ORDER, SCOUT_PREDICTABLES
+    from scripts_utility.paths import DATA_FILE
+
+    if not DATA_FILE.exists():
+        print(f"❌ {DATA_FILE} not found.")
+        return {}, {}
+    df = preprocess(pd.read_csv(DATA_FILE))
+    dates = pd.to_datetime(df["roast_date"], errors="coerce") if "roast_date" in df.columns else None
+    datasets, _ = scout_datasets(df[SCOUT_FEATURE_ORDER].copy(), df[SCOUT_PREDICTABLES].copy(), dates)
+    return datasets, scout_params(SCOUT_FEATURE_ORDER)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search CatBoost settings per target for Scout and/or Core.")
+    parser.add_argument("--model", choices=["scout", "core", "both"], default="both")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_MIN, help="wall-clock minutes for the whole search")
+    parser.add_argument("--configs", type=int, default=DEFAULT_CONFIGS, help="candidates per target besides the defaults")
+    parser.add_argument("--max-iterations", type=int, default=None, help="tree budget of the last rung (default: 2× the trainer's)")
+    parser.add_argument("--workers", type=int, default=None, help="default: all CPUs")
+    parser.add_argument("--targets", default=None, help="comma-separated targets to search (default: all)")
+    args = parser.parse_args()
+
+    models = ["scout", "core"] if args.model == "both" else [args.model]
+    wanted = set(args.targets.split(",")) if args.targets else None
+    deadline = time.monotonic() + args.budget * 60
+
+    for i, model in enumerate(models):
+        print(f"📦 Loading {model} training data...")
+        datasets, params = load_datasets(model)
+        # Smaller targets train a light model, not CatBoost (see light_models)
+        datasets = {t: d for t, d in datasets.items() if len(d[1]) >= CATBOOST_MIN_ROWS}
+        if wanted is not None:
+            datasets = {t: d for t, d in datasets.items() if t in wanted}
+        if not datasets:
+            print(f"⚠️ No {model} targets to search.")
+            continue
+        # Split what is left of the budget evenly over the remaining models
+        budget_s = (deadline - time.monotonic()) / (len(models) - i)
+        print(f"🎛 Searching {len(datasets)} {model} targets for {budget_s / 60:.1f} min...")
+        best = search(model, datasets, params, budget_s, args.configs, args.max_iterations, args.workers)
+        print_results(model, best)
+        if best:
+            save_hparams(model, best)
+            print(f"💾 Saved to {HPARAMS_PATH} — retrain {model.title()} to use them")
+
+
+if __name__ == "__main__":
+    main()
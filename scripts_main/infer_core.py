@@ -1,14 +1,19 @@
 # infer_core.py
 
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, List, Optional
 from scripts_utility.paths import CORE_MODEL_PATH
-from catboost import CatBoostRegressor
+from scripts_main.roast_phases import refresh_anchor_features
+from scripts_main.roast_profiles import PROFILE_COLUMN, profile_label
+from scripts_main.model_evaluation import cv_confidence
+from scripts_utility.tracing import span
 import pandas as pd
 import json
 import os
 from datetime import datetime
 
-CATEGORICAL_COLS = ["supplier", "country", "region", "variety", "process_method"]
+CATEGORICAL_COLS = ["supplier", "country", "region", "variety", "process_method", PROFILE_COLUMN]
+
+CORE_META_PATH = os.path.join(os.path.dirname(CORE_MODEL_PATH), "ml_catboost_meta.json")
 
 # -------------------------------------------------------------------
 # Preprocess for inference
@@ -32,53 +37,142 @@ def preprocess(values: Dict[str, Any]) -> Dict[str, Any]:
     return values
 
 # -------------------------------------------------------------------
-# Core inference
+# Model loading (done once per process, or once per daemon reload)
 # -------------------------------------------------------------------
-def infer_core(inputs: dict) -> Tuple[Dict[str, Any], Dict[str, float]]:
+def load_core_bundle() -> Optional[Dict[str, Any]]:
     """
-    Run CatBoost models on already-flattened inputs.
-    Fills in missing fields directly in `inputs`.
-    Returns (ml_filled_fields, confidence).
+    Read Core metadata and deserialize every trained target model.
+    Returns None when no metadata exists yet.
     """
-    # Preprocess first, just like training
-    inputs = preprocess(inputs)
+    if not os.path.exists(CORE_META_PATH):
+        return None
 
-    meta_path = os.path.join(os.path.dirname(CORE_MODEL_PATH), "ml_catboost_meta.json")
-    if not os.path.exists(meta_path):
-        print("❌ No metadata found — have you trained models yet?")
-        return {}, {}
+    with span("meta_read"):
+        with open(CORE_META_PATH) as f:
+            meta = json.load(f)
 
-    with open(meta_path) as f:
-        meta = json.load(f)
-
-    feature_order = meta.get("feature_order", [])
     model_paths = meta.get("models", {})
     trained_targets = meta.get("predictables", list(model_paths.keys()))
-    metrics = meta.get("metrics", {})
 
-    df = pd.DataFrame([inputs]).reindex(columns=feature_order)
-    df = df.loc[:, ~df.columns.duplicated()]
-
-    for col in CATEGORICAL_COLS:
-        if col in df.columns:
-            df[col] = df[col].astype(str).fillna("NaN")
-
-    predictions: Dict[str, Any] = {}
-    skipped_targets: list[str] = []
+    # Older metadata has CatBoost models only
+    model_kinds = meta.get("model_kinds", {})
 
+    models: Dict[str, Any] = {}
+    skipped_targets: List[str] = []
     for col in trained_targets:
         path = model_paths.get(col)
         if not path or not os.path.exists(path):
             skipped_targets.append(col)
             continue
-        model = CatBoostRegressor()
-        model.load_model(path)
+        with span("deserialize", target=col):
+            if model_kinds.get(col, "catboost") == "catboost":
+                # Imported only once a target actually has a CatBoost model
+                from catboost import CatBoostRegressor
+
+                model = CatBoostRegressor()
+                model.load_model(path)
+            else:
+                import joblib
+
+                model = joblib.load(path)
+        models[col] = model
+
+    return core_bundle(meta, models, trained_targets, skipped_targets)
+
+
+def core_uses_profile() -> bool:
+    """True when Core is (or will next be) trained with PROFILE_COLUMN as an input."""
+    from scripts_main.train_core_config import USE_PROFILE_FEATURE
+
+    if USE_PROFILE_FEATURE:
+        return True
+    try:
+        with open(CORE_META_PATH) as f:
+            return PROFILE_COLUMN in json.load(f).get("feature_order", [])
+    except (OSError, ValueError):
+        return False
+
+
+def core_bundle(
+    meta: Dict[str, Any],
+    models: Dict[str, Any],
+    trained_targets: Optional[List[str]] = None,
+    skipped_targets: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Bundle for in-memory models, e.g. train_core.fit_core's (models, meta)."""
+    return {
+        "meta": meta,
+        "confidence": core_confidences(meta),
+        "models": models,
+        "trained_targets": trained_targets if trained_targets is not None else list(models),
+        "skipped_targets": skipped_targets or [],
+    }
+
+# -------------------------------------------------------------------
+# Low-level batch helpers
+# -------------------------------------------------------------------
+def build_core_frame(rows: List[Dict[str, Any]], feature_order: List[str]) -> pd.DataFrame:
+    """Align preprocessed input rows to the trained feature order."""
+    with span("frame_build", rows=len(rows)):
+        df = pd.DataFrame(rows)
+        refresh_anchor_features(df, feature_order)
+        df = df.reindex(columns=feature_order)
+        df = df.loc[:, ~df.columns.duplicated()]
+
+    with span("categorical_cast"):
+        for col in CATEGORICAL_COLS:
+            if col in df.columns:
+                df[col] = df[col].astype(str).fillna("NaN")
+        if PROFILE_COLUMN in df.columns:
+            df[PROFILE_COLUMN] = df[PROFILE_COLUMN].map(profile_label)
+
+    return df
+
+
+def predict_core_frame(bundle: Dict[str, Any], df: pd.DataFrame) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Run every loaded Core model over all rows of `df` (one predict per target).
+    Returns ({target: array of predictions}, failed_targets).
+    """
+    predictions: Dict[str, Any] = {}
+    failed_targets: List[str] = []
+
+    for col, model in bundle["models"].items():
         try:
-            predictions[col] = model.predict(df)[0]
+            with span("predict", target=col):
+                predictions[col] = model.predict(df)
         except Exception as e:
             print(f"❌ Skipped {col}: {str(e).splitlines()[-1]}")
-            skipped_targets.append(col)
+            failed_targets.append(col)
+
+    return predictions, failed_targets
+
+
+def confidence_from_mae(mae: Optional[float]) -> float:
+    if mae is None:
+        return 0.5  # default mid confidence if no metric
+    # Scale confidence: lower MAE → higher confidence
+    # Clamp between 0.1 and 1.0
+    return max(0.1, min(1.0, 1.0 / (1.0 + mae)))
 
+
+def core_confidences(meta: Dict[str, Any]) -> Dict[str, float]:
+    """Per-target confidence from cross-validated error, or the single-split MAE of older models."""
+    metrics = meta.get("metrics", {})
+    metrics_cv = meta.get("metrics_cv", {})
+    confidence: Dict[str, float] = {}
+    for col in meta.get("predictables", []):
+        conf = cv_confidence(metrics_cv.get(col))
+        confidence[col] = conf if conf is not None else confidence_from_mae(metrics.get(col))
+    return confidence
+
+
+def fill_core_predictions(
+    inputs: Dict[str, Any],
+    predictions: Dict[str, Any],
+    confidences: Dict[str, float],
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Fill fields the operator left blank; returns (ml_filled_fields, confidence)."""
     ml_filled_fields: Dict[str, Any] = {}
     confidence: Dict[str, float] = {}
 
@@ -86,18 +180,94 @@ def infer_core(inputs: dict) -> Tuple[Dict[str, Any], Dict[str, float]]:
         if inputs.get(key) is None and val is not None:
             inputs[key] = val
             ml_filled_fields[key] = val
+            confidence[key] = confidences.get(key, 0.5)
 
-            mae = metrics.get(key)
-            if mae is None:
-                conf = 0.5  # default mid confidence if no metric
-            else:
-                # Scale confidence: lower MAE → higher confidence
-                # Clamp between 0.1 and 1.0
-                conf = max(0.1, min(1.0, 1.0 / (1.0 + mae)))
-            confidence[key] = conf
+    return ml_filled_fields, confidence
+
+# -------------------------------------------------------------------
+# Core inference
+# -------------------------------------------------------------------
+def infer_core(
+    inputs: dict,
+    bundle: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Run CatBoost models on already-flattened inputs.
+    Fills in missing fields directly in `inputs`.
+    Returns (ml_filled_fields, confidence).
+    Pass a preloaded `bundle` (see load_core_bundle) to skip reading models from disk.
+    Timed as an "infer_core" span with one span per phase (see scripts_utility/tracing).
+    """
+    with span("infer_core", rows=1):
+        return _infer_core(inputs, bundle)
+
+
+def _infer_core(
+    inputs: dict,
+    bundle: Optional[Dict[str, Any]],
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    # Preprocess first, just like training
+    with span("preprocess"):
+        inputs = preprocess(inputs)
+
+    if bundle is None:
+        bundle = load_core_bundle()
+    if bundle is None:
+        print("❌ No metadata found — have you trained models yet?")
+        return {}, {}
+
+    meta = bundle["meta"]
+    trained_targets = bundle["trained_targets"]
+
+    df = build_core_frame([inputs], meta.get("feature_order", []))
+    batch_predictions, failed_targets = predict_core_frame(bundle, df)
+    predictions = {col: preds[0] for col, preds in batch_predictions.items()}
+    skipped_targets = bundle["skipped_targets"] + failed_targets
+
+    ml_filled_fields, confidence = fill_core_predictions(inputs, predictions, bundle["confidence"])
 
     print(f"🔮 Ran inference with {len(trained_targets)} trained targets, filled {len(ml_filled_fields)} fields")
     if skipped_targets:
         print(f"⚠️ Skipped {len(skipped_targets)} targets with no model: {', '.join(skipped_targets)}")
 
     return ml_filled_fields, confidence
+
+
+def infer_core_batch(
+    inputs_list: List[dict],
+    bundle: Optional[Dict[str, Any]] = None,
+) -> List[Tuple[Dict[str, Any], Dict[str, float]]]:
+    """
+    Batch version of infer_core: one predict call per target across all rows.
+    Each input dict is filled in place; returns one (ml_filled_fields, confidence) per row.
+    """
+    with span("infer_core_batch", rows=len(inputs_list)):
+        return _infer_core_batch(inputs_list, bundle)
+
+
+def _infer_core_batch(
+    inputs_list: List[dict],
+    bundle: Optional[Dict[str, Any]],
+) -> List[Tuple[Dict[str, Any], Dict[str, float]]]:
+    with span("preprocess"):
+        rows = [preprocess(inputs) for inputs in inputs_list]
+
+    if bundle is None:
+        bundle = load_core_bundle()
+    if bundle is None:
+        print("❌ No metadata found — have you trained models yet?")
+        return [({}, {}) for _ in rows]
+    if not rows:
+        return []
+
+    meta = bundle["meta"]
+    df = build_core_frame(rows, meta.get("feature_order", []))
+    batch_predictions, _ = predict_core_frame(bundle, df)
+
+    results = []
+    for i, inputs in enumerate(rows):
+        predictions = {col: preds[i] for col, preds in batch_predictions.items()}
+        results.append(fill_core_predictions(inputs, predictions, bundle["confidence"]))
+
+    print(f"🔮 Ran batch inference on {len(rows)} rows with {len(bundle['trained_targets'])} trained targets")
+    return results
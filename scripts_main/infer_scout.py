@@ -6,75 +6,123 @@ Inference with the Scout model: lightweight predictions using minimal inputs.
 import joblib
 import pandas as pd
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
 
 from scripts_utility.master_order import SCOUT_FEATURE_ORDER, SCOUT_PREDICTABLES
 from scripts_utility.paths import SCOUT_MODEL_PATH
+from scripts_utility.tracing import span
 
 
 def load_payload(path: Path) -> Tuple[dict, list[str]]:
     """Load trained Scout models + feature schema from disk."""
-    payload = joblib.load(path)
+    with span("deserialize"):
+        payload = joblib.load(path)
     return payload["models"], payload["feature_columns"]
 
 
-def preprocess(flat_inputs: dict, feature_columns: list[str]) -> pd.DataFrame:
+def preprocess_rows(rows: list[dict], feature_columns: list[str]) -> pd.DataFrame:
     """
-    Convert flat input dict into a DataFrame aligned with training schema.
+    Convert a list of flat input dicts into a DataFrame aligned with training schema.
     Handles one-hot encoding of process_method and column reindexing.
     """
-    df = pd.DataFrame([flat_inputs])
+    with span("frame_build", rows=len(rows)):
+        df = pd.DataFrame(rows)
 
-    # Ensure all expected base features exist
-    for col in SCOUT_FEATURE_ORDER:
-        if col not in df.columns:
-            df[col] = pd.NA
+        # Ensure all expected base features exist
+        for col in SCOUT_FEATURE_ORDER:
+            if col not in df.columns:
+                df[col] = pd.NA
 
     # One-hot encode process_method
-    if "process_method" in df.columns:
-        dummies = pd.get_dummies(df["process_method"], prefix="proc", dummy_na=True)
-        df = pd.concat([df.drop(columns=["process_method"]), dummies], axis=1)
+    with span("categorical_cast"):
+        if "process_method" in df.columns:
+            dummies = pd.get_dummies(df["process_method"], prefix="proc", dummy_na=True)
+            df = pd.concat([df.drop(columns=["process_method"]), dummies], axis=1)
 
-    # Align to training feature columns
-    df = df.reindex(columns=feature_columns, fill_value=0)
+    with span("frame_build"):
+        # Align to training feature columns
+        df = df.reindex(columns=feature_columns, fill_value=0)
 
-    # Coerce numeric
-    for c in df.columns:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
+        # Coerce numeric
+        for c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce")
 
     return df
 
 
-def raw_infer(models: dict, X_new: pd.DataFrame, flat_inputs: dict) -> tuple[dict[str, float], dict[str, float]]:
+def preprocess(flat_inputs: dict, feature_columns: list[str]) -> pd.DataFrame:
+    """Single-row version of preprocess_rows."""
+    return preprocess_rows([flat_inputs], feature_columns)
+
+
+def raw_infer_batch(
+    models: dict,
+    X_new: pd.DataFrame,
+    rows: list[dict],
+) -> list[tuple[dict[str, float], dict[str, float]]]:
     """
-    Low-level inference: apply trained models directly to a prepared DataFrame.
-    Only predict fields that the user did not provide.
+    Batch inference: one predict call per target across all rows of X_new.
+    Only fills fields that each row's user did not provide.
     """
-    ml_filled_fields: dict[str, float] = {}
-    confidence: dict[str, float] = {}
+    results: list[tuple[dict[str, float], dict[str, float]]] = [({}, {}) for _ in rows]
 
     for target, model_info in models.items():
-        # Skip if user already provided this field
-        if flat_inputs.get(target) not in (None, "", "NaN"):
+        # Skip the model entirely if every row already provides this field
+        needs = [flat_inputs.get(target) in (None, "", "NaN") for flat_inputs in rows]
+        if not any(needs):
             continue
 
-        kind, model = model_info
-        if kind == "catboost":
-            pred = model.predict(X_new)[0]
-            confidence[target] = 1.0
-        elif kind == "mean":
-            pred = model
-            confidence[target] = 0.2
+        kind, model = model_info[:2]
+        if kind == "mean":
+            preds = [model] * len(rows)
+            conf = 0.2
         else:
-            continue
+            # "catboost", "ridge" or "knn" (see light_models); unpickling a
+            # payload only imports catboost when it holds a CatBoost model
+            with span("predict", target=target):
+                preds = model.predict(X_new)
+            # Cross-validated confidence (older payloads have none)
+            conf = model_info[2] if len(model_info) > 2 else 1.0
 
-        ml_filled_fields[target] = float(pred)
+        for i, need in enumerate(needs):
+            if need:
+                ml_filled_fields, confidence = results[i]
+                ml_filled_fields[target] = float(preds[i])
+                confidence[target] = conf
 
-    return ml_filled_fields, confidence
+    return results
 
 
-def infer_scout(flat_inputs: dict) -> tuple[dict[str, float], dict[str, float]]:
-    models, feature_columns = load_payload(SCOUT_MODEL_PATH)
-    X_new = preprocess(flat_inputs, feature_columns)
-    return raw_infer(models, X_new, flat_inputs)
+def raw_infer(models: dict, X_new: pd.DataFrame, flat_inputs: dict) -> tuple[dict[str, float], dict[str, float]]:
+    """
+    Low-level inference: apply trained models directly to a prepared DataFrame.
+    Only predict fields that the user did not provide.
+    """
+    return raw_infer_batch(models, X_new, [flat_inputs])[0]
+
 
+def infer_scout(
+    flat_inputs: dict,
+    payload: Optional[Tuple[dict, list[str]]] = None,
+) -> tuple[dict[str, float], dict[str, float]]:
+    """
+    Pass a preloaded `payload` (see load_payload) to skip reading the model from disk.
+    Timed as an "infer_scout" span with one span per phase (see scripts_utility/tracing).
+    """
+    with span("infer_scout", rows=1):
+        models, feature_columns = payload if payload is not None else load_payload(SCOUT_MODEL_PATH)
+        X_new = preprocess(flat_inputs, feature_columns)
+        return raw_infer(models, X_new, flat_inputs)
+
+
+def infer_scout_batch(
+    rows: list[dict],
+    payload: Optional[Tuple[dict, list[str]]] = None,
+) -> list[tuple[dict[str, float], dict[str, float]]]:
+    """Batch version of infer_scout: one (ml_filled_fields, confidence) per row."""
+    if not rows:
+        return []
+    with span("infer_scout_batch", rows=len(rows)):
+        models, feature_columns = payload if payload is not None else load_payload(SCOUT_MODEL_PATH)
+        X_new = preprocess_rows(rows, feature_columns)
+        return raw_infer_batch(models, X_new, rows)
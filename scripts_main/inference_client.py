@@ -0,0 +1,125 @@
+# scripts_main/inference_client.py
+"""
+Thin client for the optional inference daemon (scripts_main/inference_server.py).
+Only uses the standard library so the CLI/GUI can try the daemon without
+importing catboost or pandas. Every call returns None when no daemon is running,
+so callers can fall back to local inference.
+"""
+
+import json
+import os
+import socket
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+INFERENCE_HOST = os.environ.get("ROASTMASTER_INFERENCE_HOST", "127.0.0.1")
+INFERENCE_PORT = int(os.environ.get("ROASTMASTER_INFERENCE_PORT", "8765"))
+
+CONNECT_TIMEOUT_SEC = 0.25
+RESPONSE_TIMEOUT_SEC = 60.0
+
+# -------------------------------------------------------------------
+# JSON protocol helpers (shared with the server)
+#
+# One JSON object per line in each direction:
+#   request:  {"op": "infer_core", "inputs": {...}}
+#   response: {"ok": true, "result": ...} or {"ok": false, "error": "..."}
+# Datetimes travel as {"__datetime__": "<isoformat>"}.
+# -------------------------------------------------------------------
+
+def _encode_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return {"__datetime__": obj.isoformat()}
+    if hasattr(obj, "item"):  # numpy scalars
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _decode_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    return (json.dumps(message, default=_encode_default) + "\n").encode("utf-8")
+
+
+def decode_message(line: bytes) -> Dict[str, Any]:
+    return json.loads(line.decode("utf-8"), object_hook=_decode_hook)
+
+# -------------------------------------------------------------------
+# Requests
+# -------------------------------------------------------------------
+
+def request(op: str, inputs: Any = None) -> Optional[Any]:
+    """
+    Send one request to the daemon. Returns the result, or None if the
+    daemon is not running or reported an error.
+    """
+    try:
+        sock = socket.create_connection((INFERENCE_HOST, INFERENCE_PORT), timeout=CONNECT_TIMEOUT_SEC)
+    except OSError:
+        return None
+
+    try:
+        with sock:
+            sock.settimeout(RESPONSE_TIMEOUT_SEC)
+            sock.sendall(encode_message({"op": op, "inputs": inputs}))
+            with sock.makefile("rb") as f:
+                line = f.readline()
+        if not line:
+            return None
+        response = decode_message(line)
+    except (OSError, TypeError, ValueError) as e:
+        # Connection problems, inputs that aren't JSON-serializable, or a garbled reply
+        print(f"⚠️ Inference server request failed ({e}); running locally.")
+        return None
+
+    if not response.get("ok"):
+        print(f"⚠️ Inference server error: {response.get('error')}; running locally.")
+        return None
+    return response.get("result")
+
+
+def server_running() -> bool:
+    return request("ping") == "pong"
+
+
+def _apply_result(inputs: Dict[str, Any], result: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    # Mirror the local functions, which fill (and for Core, preprocess) inputs in place
+    inputs.clear()
+    inputs.update(result["inputs"])
+    return result["ml_filled_fields"], result["confidence"]
+
+
+def infer_core_remote(inputs: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], Dict[str, float]]]:
+    result = request("infer_core", inputs)
+    if result is None:
+        return None
+    return _apply_result(inputs, result)
+
+
+def infer_scout_remote(inputs: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], Dict[str, float]]]:
+    result = request("infer_scout", inputs)
+    if result is None:
+        return None
+    return _apply_result(inputs, result)
+
+
+def infer_core_batch_remote(
+    inputs_list: List[Dict[str, Any]],
+) -> Optional[List[Tuple[Dict[str, Any], Dict[str, float]]]]:
+    results = request("infer_core_batch", inputs_list)
+    if results is None:
+        return None
+    return [_apply_result(inputs, result) for inputs, result in zip(inputs_list, results)]
+
+
+def infer_scout_batch_remote(
+    inputs_list: List[Dict[str, Any]],
+) -> Optional[List[Tuple[Dict[str, Any], Dict[str, float]]]]:
+    results = request("infer_scout_batch", inputs_list)
+    if results is None:
+        return None
+    return [_apply_result(inputs, result) for inputs, result in zip(inputs_list, results)]
@@ -45,6 +45,12 @@ def core_input_session() -> Dict[str, Any]:
         or datetime.today()
     )
 
+    # Roast profile (optional, see scripts_main/roast_profiles.py), only if Core uses it
+    from scripts_main.infer_core import core_uses_profile
+
+    if core_uses_profile():
+        values["profile_id"] = input("Roast Profile (e.g. P3), optional: ").strip() or None
+
     # --- Required environment ---
     values.update({
         "room_temp_f": get_validated_input("Room Temp (°F): ", float),
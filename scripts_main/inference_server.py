@@ -0,0 +1,198 @@
+# scripts_main/inference_server.py
+"""
+Optional long-running inference daemon.
+
+Loads the Core and Scout models once, keeps them warm, and serves
+infer_core / infer_scout (single + batch) over a small newline-delimited
+JSON protocol on localhost. Models are hot-reloaded whenever
+ml_catboost_meta.json or scout_model.pkl change on disk.
+
+Run from the project root:
+    python -m scripts_main.inference_server [--host 127.0.0.1] [--port 8765] [--profile] [--slow-ms 100]
+
+--profile prints a per-phase timing line for every prediction; --slow-ms
+only reports predictions slower than that (see scripts_utility/tracing.py).
+"""
+
+import argparse
+import os
+import socketserver
+import threading
+from contextlib import nullcontext
+from typing import Any, Dict, Optional, Tuple
+
+from scripts_utility.paths import SCOUT_MODEL_PATH
+from scripts_main.infer_core import CORE_META_PATH, load_core_bundle, infer_core, infer_core_batch
+from scripts_main.infer_scout import load_payload, infer_scout, infer_scout_batch
+from scripts_utility.tracing import breakdown_line, log_slow_predictions, tracing
+from scripts_main.inference_client import (
+    INFERENCE_HOST,
+    INFERENCE_PORT,
+    encode_message,
+    decode_message,
+)
+
+
+def _file_stamp(path) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ModelCache:
+    """
+    Holds the loaded Core bundle and Scout payload.
+    Every access checks the file stamps and reloads when they changed.
+    Readers get a reference to the current models, so a reload never
+    disturbs predictions already in flight.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._core: Optional[Dict[str, Any]] = None
+        self._core_stamp: Optional[Tuple[int, int]] = None
+        self._scout: Optional[Tuple[dict, list]] = None
+        self._scout_stamp: Optional[Tuple[int, int]] = None
+
+    def core(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            stamp = _file_stamp(CORE_META_PATH)
+            if stamp != self._core_stamp:
+                try:
+                    self._core = load_core_bundle()
+                    self._core_stamp = stamp
+                    print(f"♻️ Loaded Core models ({len(self._core['models']) if self._core else 0} targets)")
+                except Exception as e:
+                    # Usually a retrain still writing files; keep the old models and retry next request
+                    print(f"⚠️ Could not reload Core models: {e}")
+            return self._core
+
+    def scout(self) -> Optional[Tuple[dict, list]]:
+        with self._lock:
+            stamp = _file_stamp(SCOUT_MODEL_PATH)
+            if stamp != self._scout_stamp:
+                if stamp is None:
+                    self._scout = None
+                    self._scout_stamp = None
+                else:
+                    try:
+                        self._scout = load_payload(SCOUT_MODEL_PATH)
+                        self._scout_stamp = stamp
+                        print(f"♻️ Loaded Scout models ({len(self._scout[0])} targets)")
+                    except Exception as e:
+                        print(f"⚠️ Could not reload Scout models: {e}")
+            return self._scout
+
+    def reload(self) -> None:
+        with self._lock:
+            self._core_stamp = None
+            self._scout_stamp = None
+        self.core()
+        self.scout()
+
+
+def handle_request(cache: ModelCache, op: str, inputs: Any) -> Any:
+    """Dispatch one decoded request; raises on bad input."""
+    if op == "ping":
+        return "pong"
+
+    if op == "reload":
+        cache.reload()
+        return "reloaded"
+
+    if op in ("infer_core", "infer_core_batch"):
+        bundle = cache.core()
+        if bundle is None:
+            raise RuntimeError("No Core metadata found — have you trained models yet?")
+        if op == "infer_core":
+            ml_filled_fields, confidence = infer_core(inputs, bundle=bundle)
+            return {"inputs": inputs, "ml_filled_fields": ml_filled_fields, "confidence": confidence}
+        results = infer_core_batch(inputs, bundle=bundle)
+        return [
+            {"inputs": row, "ml_filled_fields": filled, "confidence": conf}
+            for row, (filled, conf) in zip(inputs, results)
+        ]
+
+    if op in ("infer_scout", "infer_scout_batch"):
+        payload = cache.scout()
+        if payload is None:
+            raise RuntimeError("No Scout model found — have you trained it yet?")
+        if op == "infer_scout":
+            ml_filled_fields, confidence = infer_scout(inputs, payload=payload)
+            return {"inputs": inputs, "ml_filled_fields": ml_filled_fields, "confidence": confidence}
+        results = infer_scout_batch(inputs, payload=payload)
+        return [
+            {"inputs": row, "ml_filled_fields": filled, "confidence": conf}
+            for row, (filled, conf) in zip(inputs, results)
+        ]
+
+    raise ValueError(f"Unknown op: {op}")
+
+
+class InferenceRequestHandler(socketserver.StreamRequestHandler):
+    """Serves newline-delimited JSON requests until the client disconnects."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            op = None
+            with tracing() if self.server.profile else nullcontext() as tracer:
+                try:
+                    message = decode_message(line)
+                    op = message.get("op")
+                    result = handle_request(self.server.model_cache, op, message.get("inputs"))
+                    response = {"ok": True, "result": result}
+                except Exception as e:
+                    response = {"ok": False, "error": str(e)}
+            if tracer is not None and op and op.startswith("infer_"):
+                print(f"⏱ {breakdown_line(tracer, op)}")
+            self.wfile.write(encode_message(response))
+            self.wfile.flush()
+
+
+class InferenceServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int], profile: bool = False):
+        super().__init__(address, InferenceRequestHandler)
+        self.model_cache = ModelCache()
+        self.profile = profile
+
+
+def serve(
+    host: str = INFERENCE_HOST,
+    port: int = INFERENCE_PORT,
+    profile: bool = False,
+    slow_ms: Optional[float] = None,
+) -> None:
+    unsubscribe = log_slow_predictions(slow_ms) if slow_ms is not None else None
+    with InferenceServer((host, port), profile) as server:
+        print("🔥 Warming models...")
+        server.model_cache.reload()
+        print(f"🛰️ Inference server listening on {host}:{port} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("👋 Inference server stopped.")
+        finally:
+            if unsubscribe is not None:
+                unsubscribe()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RoastMaster inference daemon")
+    parser.add_argument("--host", default=INFERENCE_HOST)
+    parser.add_argument("--port", type=int, default=INFERENCE_PORT)
+    parser.add_argument("--profile", action="store_true", help="print a per-phase timing line for every prediction")
+    parser.add_argument("--slow-ms", type=float, default=None, help="report predictions slower than this many ms")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.profile, args.slow_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# scripts_main/light_models.py
+"""
+Lightweight models for targets with too few roasts for CatBoost.
+
+Each target of Scout and Core is trained with one model kind:
+  - "ridge":    ridge regression on the numeric inputs (anchors, conditions)
+  - "knn":      distance-weighted average of the nearest past roasts
+  - "catboost": only tried once a target has CATBOOST_MIN_ROWS rows
+The trainers pick the kind with the lowest cross-validated MAE per target
+(see model_evaluation.select_model_kinds). Ridge and kNN fit in
+milliseconds and only need scikit-learn, so a fresh install trains almost
+instantly and catboost is not imported until a target earns a CatBoost
+model.
+
+Numeric inputs are median-imputed and scaled; categorical inputs
+(process, origin) are left to CatBoost.
+"""
+
+from typing import Any, Dict
+
+# A target needs this many rows before CatBoost is even tried
+CATBOOST_MIN_ROWS = 30
+
+LIGHT_KINDS = ("ridge", "knn")
+RIDGE_ALPHA = 1.0
+KNN_NEIGHBORS = 5
+
+
+def _as_float(X):
+    """Numeric inputs as floats; None / blank strings from form rows become NaN."""
+    import numpy as np
+    import pandas as pd
+
+    return pd.DataFrame(X).apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+def make_light_model(kind: str, n_rows: int):
+    """Unfitted scikit-learn pipeline for `kind` ("ridge" or "knn")."""
+    from sklearn.compose import ColumnTransformer, make_column_selector
+    from sklearn.impute import SimpleImputer
+    from sklearn.linear_model import Ridge
+    from sklearn.neighbors import KNeighborsRegressor
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import FunctionTransformer, StandardScaler
+
+    if kind == "ridge":
+        estimator = Ridge(alpha=RIDGE_ALPHA)
+    elif kind == "knn":
+        estimator = KNeighborsRegressor(n_neighbors=max(1, min(KNN_NEIGHBORS, n_rows)), weights="distance")
+    else:
+        raise ValueError(f"Unknown light model kind: {kind}")
+
+    numeric = Pipeline([
+        ("float", FunctionTransformer(_as_float)),
+        ("impute", SimpleImputer(strategy="median", keep_empty_features=True)),
+        ("scale", StandardScaler()),
+    ])
+    # Columns are picked by dtype at fit time and kept by name afterwards
+    inputs = ColumnTransformer([("numeric", numeric, make_column_selector(dtype_include="number"))])
+    return Pipeline([("inputs", inputs), ("model", estimator)])
+
+
+def make_model(params: Dict[str, Any], n_rows: int):
+    """
+    Unfitted model for params["kind"] (default "catboost"); the other
+    params are CatBoostRegressor arguments and ignored by light kinds.
+    """
+    params = dict(params)
+    kind = params.pop("kind", "catboost")
+    if kind == "catboost":
+        from catboost import CatBoostRegressor
+
+        return CatBoostRegressor(**params)
+    return make_light_model(kind, n_rows)
+
+
+def default_kind(n_rows: int) -> str:
+    """Kind used when a target could not be cross-validated."""
+    return "catboost" if n_rows >= CATBOOST_MIN_ROWS else "ridge"
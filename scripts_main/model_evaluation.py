@@ -0,0 +1,305 @@
+# scripts_main/model_evaluation.py
+"""
+Cross-validated error for the Scout and Core training scripts.
+
+Every target is scored two ways:
+  - kfold:          shuffled K-fold, every roast is tested once
+  - rolling_origin: roasts in roast_date order, each fold trains on all
+                    earlier roasts and tests on the next block — how the
+                    model is actually used
+Per target the metadata keeps the mean and spread (std) of the fold MAEs,
+plus the MAE of always predicting the training mean, which turns the
+error into a scale-free confidence (see cv_confidence).
+
+The same folds score the light models (ridge, kNN — see light_models),
+and each target keeps whichever kind has the lowest error. For that
+choice every kind is scored untuned: CatBoost with the trainer's default
+settings (searched ones were picked on the newest roasts, which the folds
+also test on).
+
+CatBoost folds are the slow part, so they only run the primary scheme
+(rolling origin when there are dates) with at most CV_MAX_ITERATIONS
+trees, early-stopped on a validation block of each fold's own training
+rows, so no fold is tuned on the roasts it is scored on. The tree counts
+those folds stop at also size the saved model (see fold_iterations), so
+small targets train and load only the trees that help without a separate
+early-stopping pass. Fold fits for all targets go to one process pool,
+one CatBoost thread each.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts_main.light_models import CATBOOST_MIN_ROWS, LIGHT_KINDS, default_kind, make_model
+
+# Folds per scheme; targets with fewer than MIN_FOLD_ROWS test rows per fold use fewer
+EVAL_FOLDS = 5
+MIN_FOLD_ROWS = 2
+
+SCHEMES = ("rolling_origin", "kfold")
+
+# Early stopping: stop after this many trees without validation improvement.
+# The validation block is the newest VALIDATION_FRACTION of a fold's training
+# rows; folds with fewer than MIN_VALIDATION_ROWS there keep the full tree count.
+EARLY_STOPPING_ROUNDS = 50
+# Tree ceiling for CatBoost folds; a target whose folds reach it keeps the trainer's count
+CV_MAX_ITERATIONS = 300
+MIN_ITERATIONS = 20  # floor, so one noisy validation block can't strip a model bare
+VALIDATION_FRACTION = 0.2
+MIN_VALIDATION_ROWS = 5
+
+Split = Tuple[np.ndarray, np.ndarray]
+
+
+def kfold_splits(n: int, folds: int = EVAL_FOLDS, seed: int = 42) -> List[Split]:
+    """Shuffled K-fold (train, test) positions; [] if n is too small."""
+    folds = min(folds, n // MIN_FOLD_ROWS)
+    if folds < 2:
+        return []
+    order = np.random.default_rng(seed).permutation(n)
+    blocks = np.array_split(order, folds)
+    return [
+        (np.concatenate(blocks[:i] + blocks[i + 1:]), blocks[i])
+        for i in range(folds)
+    ]
+
+
+def rolling_origin_splits(dates: pd.Series, folds: int = EVAL_FOLDS) -> List[Split]:
+    """
+    Time-ordered (train, test) positions: rows sorted by date are cut into
+    folds + 1 blocks and fold i trains on blocks 0..i, tests on block i + 1.
+    Rows without a date are left out; [] if too few remain.
+    """
+    dates = pd.to_datetime(pd.Series(dates).reset_index(drop=True), errors="coerce")
+    dated = np.flatnonzero(dates.notna().to_numpy())
+    folds = min(folds, len(dated) // MIN_FOLD_ROWS - 1)
+    if folds < 1:
+        return []
+    order = dated[np.argsort(dates.iloc[dated].to_numpy(), kind="stable")]
+    blocks = np.array_split(order, folds + 1)
+    return [(np.concatenate(blocks[:i + 1]), blocks[i + 1]) for i in range(folds)]
+
+
+def validation_split(n: int, dates: Optional[pd.Series] = None, seed: int = 42) -> Optional[Split]:
+    """(train, validation) positions: the newest roasts by date, else a random block; None if too small."""
+    size = int(round(n * VALIDATION_FRACTION))
+    if size < MIN_VALIDATION_ROWS:
+        return None
+    order = np.random.default_rng(seed).permutation(n)
+    if dates is not None:
+        dates = pd.to_datetime(pd.Series(dates).reset_index(drop=True), errors="coerce")
+        if dates.notna().sum() >= size:
+            # Undated rows sort first, so they always stay in training
+            order = np.argsort(dates.fillna(pd.Timestamp.min).to_numpy(), kind="stable")
+    return np.sort(order[:-size]), np.sort(order[-size:])
+
+
+def _fit_fold(
+    params: Dict[str, Any],
+    X: pd.DataFrame,
+    y: pd.Series,
+    train: np.ndarray,
+    test: np.ndarray,
+    dates: Optional[pd.Series] = None,
+) -> Tuple[float, float, Optional[int]]:
+    """
+    (model MAE, training-mean MAE, early-stopped tree count or None) on one
+    fold; params["kind"] picks the model (see light_models). CatBoost
+    early-stops on a validation block of the fold's training rows (newest
+    by `dates`), never on `test`.
+    """
+    y_train, y_test = y.iloc[train], y.iloc[test]
+    best = None
+    if y_train.nunique() <= 1:
+        pred = np.full(len(test), y_train.mean())
+    else:
+        split = None
+        if params.get("kind", "catboost") == "catboost":
+            split = validation_split(len(train), dates.iloc[train] if dates is not None else None)
+        if split is not None and y.iloc[train[split[0]]].nunique() > 1:
+            fit, val = train[split[0]], train[split[1]]
+            model = make_model({**params, "early_stopping_rounds": EARLY_STOPPING_ROUNDS, "use_best_model": True}, len(fit))
+            model.fit(X.iloc[fit], y.iloc[fit], eval_set=(X.iloc[val], y.iloc[val]))
+            best = int(model.get_best_iteration()) + 1
+        else:
+            model = make_model(params, len(train))
+            model.fit(X.iloc[train], y_train)
+        pred = model.predict(X.iloc[test])
+    baseline = np.abs(y_test.to_numpy() - y_train.mean()).mean()
+    return float(np.abs(y_test.to_numpy() - pred).mean()), float(baseline), best
+
+
+def _summary(results: List[Tuple[float, float, Optional[int]]], rows: int) -> Dict[str, Any]:
+    mae = np.array([r[0] for r in results])
+    baseline = np.array([r[1] for r in results])
+    summary = {
+        "mae_mean": float(mae.mean()),
+        "mae_std": float(mae.std()),
+        "baseline_mae": float(baseline.mean()),
+        "folds": len(results),
+        "rows": rows,
+    }
+    stopped = [r[2] for r in results if r[2] is not None]
+    if stopped:
+        summary["best_iterations"] = int(np.median(stopped))
+    return summary
+
+
+def run_jobs(fn, params: List[Dict[str, Any]], jobs: List[Tuple], workers: Optional[int]) -> List[Any]:
+    """
+    fn(params[i], *jobs[i]) for every job, in a process pool of `workers`
+    (default: every CPU). workers=1 runs them in this process, e.g. when the
+    caller is itself one of many pool workers (backtest windows).
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    if workers <= 1:
+        return [fn(p, *job) for p, job in zip(params, jobs)]
+    # spawn: safe to start from the GUI (threads) on every platform
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        futures = [pool.submit(fn, {**p, "thread_count": 1}, *job) for p, job in zip(params, jobs)]
+        return [f.result() for f in futures]
+
+
+def fold_iterations(target_cv: Optional[Dict[str, Dict[str, Any]]], ceiling: int) -> Optional[int]:
+    """
+    Tree count for the final CatBoost model from its early-stopped CV folds
+    (median, primary scheme): at least MIN_ITERATIONS, at most `ceiling`.
+    None when the folds did not stop early or hit CV_MAX_ITERATIONS, i.e.
+    keep the trainer's count.
+    """
+    summary = primary_scheme(target_cv or {})
+    best = summary.get("best_iterations") if summary else None
+    if best is None or best >= CV_MAX_ITERATIONS:
+        return None
+    return int(min(ceiling, max(MIN_ITERATIONS, best)))
+
+
+def cross_validate(
+    datasets: Dict[str, Tuple[pd.DataFrame, pd.Series, Optional[pd.Series]]],
+    params: Dict[str, Any],
+    folds: int = EVAL_FOLDS,
+    workers: Optional[int] = None,
+    overrides: Optional[Dict[str, Dict[str, Any]]] = None,
+    primary_only: bool = False,
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    {target: {scheme: summary}} for datasets {target: (X, y, roast dates)}.
+    `params` are CatBoostRegressor arguments (cat_features included);
+    `overrides` are per-target params (e.g. tuned depth). The "iterations"
+    param is a ceiling: CatBoost folds early-stop inside their training rows
+    and their summaries keep the median tree count ("best_iterations").
+    primary_only runs rolling origin alone when there are dates.
+    Targets too small for a scheme are left out of it.
+    """
+    overrides = overrides or {}
+    jobs = []
+    for target, (X, y, dates) in datasets.items():
+        X = X.reset_index(drop=True)
+        y = y.reset_index(drop=True)
+        splits = {}
+        if dates is not None:
+            dates = pd.Series(dates).reset_index(drop=True)
+            splits["rolling_origin"] = rolling_origin_splits(dates, folds)
+        if not (primary_only and splits.get("rolling_origin")):
+            splits["kfold"] = kfold_splits(len(y), folds)
+        for scheme, scheme_splits in splits.items():
+            for train, test in scheme_splits:
+                jobs.append((target, scheme, X, y, train, test, dates))
+
+    job_params = [{**params, **overrides.get(target, {})} for target, *_ in jobs]
+    fold_results = run_jobs(_fit_fold, job_params, [job[2:] for job in jobs], workers)
+
+    grouped: Dict[Tuple[str, str], List[Tuple[float, float, Optional[int]]]] = {}
+    for (target, scheme, *_), result in zip(jobs, fold_results):
+        grouped.setdefault((target, scheme), []).append(result)
+
+    cv: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for (target, scheme), results in grouped.items():
+        cv.setdefault(target, {})[scheme] = _summary(results, len(datasets[target][1]))
+    return cv
+
+
+def cross_validate_kinds(
+    datasets: Dict[str, Tuple[pd.DataFrame, pd.Series, Optional[pd.Series]]],
+    params: Dict[str, Any],
+    folds: int = EVAL_FOLDS,
+    workers: Optional[int] = None,
+) -> Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]:
+    """
+    {kind: cross_validate result} for every light kind on all targets, and
+    for CatBoost (default `params`, no per-target tuning, at most
+    CV_MAX_ITERATIONS trees, primary scheme only) on targets with at least
+    CATBOOST_MIN_ROWS rows. Every kind sees the same folds. Light folds
+    take milliseconds, so they run in this process.
+    """
+    cv = {kind: cross_validate(datasets, {"kind": kind}, folds, workers=1) for kind in LIGHT_KINDS}
+    large = {t: d for t, d in datasets.items() if len(d[1]) >= CATBOOST_MIN_ROWS}
+    if large:
+        capped = {**params, "iterations": min(params.get("iterations", CV_MAX_ITERATIONS), CV_MAX_ITERATIONS)}
+        cv["catboost"] = cross_validate(large, capped, folds, workers, primary_only=True)
+    return cv
+
+
+def select_model_kinds(
+    datasets: Dict[str, Tuple[pd.DataFrame, pd.Series, Optional[pd.Series]]],
+    cv_by_kind: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]],
+) -> Dict[str, str]:
+    """
+    {target: kind} with the lowest cross-validated MAE (rolling origin when
+    there is one). Targets without CV results get light_models.default_kind.
+    Ties go to the earlier kind in cv_by_kind, i.e. the lighter model.
+    """
+    kinds = {}
+    for target, (_, y, _) in datasets.items():
+        scored = []
+        for kind, cv in cv_by_kind.items():
+            summary = primary_scheme(cv.get(target, {}))
+            if summary is not None:
+                scored.append((summary["mae_mean"], len(scored), kind))
+        kinds[target] = min(scored)[2] if scored else default_kind(len(y))
+    return kinds
+
+
+def primary_scheme(target_cv: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Rolling-origin summary when there is one, else K-fold."""
+    for scheme in SCHEMES:
+        if scheme in target_cv:
+            return target_cv[scheme]
+    return None
+
+
+def cv_confidence(target_cv: Optional[Dict[str, Dict[str, Any]]]) -> Optional[float]:
+    """
+    0.1–1.0 skill score: 1 - (fold MAE mean + its standard error) / MAE of
+    always predicting the training mean. None without CV results.
+    """
+    summary = primary_scheme(target_cv or {})
+    if summary is None:
+        return None
+    baseline = summary["baseline_mae"]
+    if not baseline > 0:
+        return 1.0 if summary["mae_mean"] == 0 else 0.1
+    upper = summary["mae_mean"] + summary["mae_std"] / np.sqrt(max(summary["folds"], 1))
+    skill = 1.0 - upper / baseline
+    return max(0.1, min(1.0, skill))
+
+
+def print_cv_table(cv: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+    """Per-target MAE mean ± std for each scheme."""
+    if not cv:
+        return
+    width = max(len(t) for t in cv)
+    print("\n📏 Cross-validated MAE (mean ± std over folds; baseline = predicting the mean)")
+    print(f"   {'target'.ljust(width)}  {'rolling origin':>22}  {'k-fold':>22}  {'baseline':>9}")
+    for target, schemes in cv.items():
+        cells = []
+        for scheme in SCHEMES:
+            s = schemes.get(scheme)
+            cells.append(f"{s['mae_mean']:.3f} ± {s['mae_std']:.3f} ({s['folds']})" if s else "n/a")
+        base = primary_scheme(schemes)
+        print(f"   {target.ljust(width)}  {cells[0]:>22}  {cells[1]:>22}  {base['baseline_mae'] if base else float('nan'):>9.3f}")
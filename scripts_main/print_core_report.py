@@ -1,5 +1,9 @@
 import statistics
 from scripts_utility.capture import seconds_to_mmss
+from scripts_main.fuel_analytics import fuel_summary
+from scripts_main.roast_phases import phase_summary
+from scripts_main.similar_roasts import print_similar_roasts
+from scripts_main.shape_index import print_similar_shapes
 
 def fmt_value(value, key=None, ml_filled_fields=None):
     if value is None:
@@ -152,6 +156,16 @@ def print_core_report(session_data, confidence, ml_filled_fields):
             value = round(float(value), 1)
         print(f"{label}: {fmt_value(value, key, ml_filled_fields)}")
 
+    # --- Fuel ---
+    fuel = fuel_summary({**session_data, **ml_filled_fields})
+    if fuel:
+        print(f"Estimated Fuel: {fuel}")
+
+    # --- Phases ---
+    phases = phase_summary({**session_data, **ml_filled_fields})
+    if phases:
+        print(f"Phases: {phases}")
+
     # --- Sensory Scores ---
     for key, label in [
         ("clarity", "Clarity"),
@@ -162,3 +176,10 @@ def print_core_report(session_data, confidence, ml_filled_fields):
         ("comments", "Comments"),
     ]:
         print(f"{label}: {fmt_value(get_value(key, session_data, ml_filled_fields), key, ml_filled_fields)}")
+
+    # --- Similar past roasts ---
+    try:
+        print_similar_roasts(session_data)
+        print_similar_shapes({**session_data, **ml_filled_fields})
+    except Exception as e:
+        print(f"⚠️ Similar roast lookup failed: {e}")
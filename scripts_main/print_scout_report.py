@@ -1,4 +1,8 @@
 from scripts_utility.capture import seconds_to_mmss
+from scripts_main.fuel_analytics import fuel_summary
+from scripts_main.roast_phases import phase_summary
+from scripts_main.similar_roasts import print_similar_roasts
+from scripts_main.shape_index import print_similar_shapes
 
 
 def fmt_value(value, key=None, ml_filled_fields=None):
@@ -55,3 +59,20 @@ def print_scout_report(session_data, confidence, ml_filled_fields):
                 f"Turning Point - Temp: {fmt_value(round(tp_temp,0) if isinstance(tp_temp,(int,float)) else tp_temp, 'turning_point_temp_f', ml_filled_fields)} "
                 f"- Time: {fmt_value(tp_time_str, 'turning_point_time_sec', ml_filled_fields)}"
             )
+
+    # --- Fuel ---
+    fuel = fuel_summary({**session_data, **ml_filled_fields})
+    if fuel:
+        print(f"\nEstimated Fuel: {fuel}")
+
+    # --- Phases ---
+    phases = phase_summary({**session_data, **ml_filled_fields})
+    if phases:
+        print(f"Phases: {phases}")
+
+    # --- Similar past roasts ---
+    try:
+        print_similar_roasts(session_data)
+        print_similar_shapes({**session_data, **ml_filled_fields})
+    except Exception as e:
+        print(f"⚠️ Similar roast lookup failed: {e}")
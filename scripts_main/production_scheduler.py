@@ -0,0 +1,485 @@
+# scripts_main/production_scheduler.py
+"""
+Production scheduler: order a day's batches to minimize roaster time.
+
+Each job is an (inventory lot, batch weight) pair. Jobs are scored with one
+batch Core (or Scout) call; identical jobs share a prediction. A job's
+roast time is its drop time (the stage 9 anchor, or the latest predicted
+stage if that runs past it). Between batches the drum has to go from the
+previous batch's predicted end temp to the next batch's charge temp, so
+the changeover cost depends on the order.
+
+The order is built with nearest-neighbour, then improved with 2-opt
+(segment reversal) and single-job relocation until no move helps or the
+time budget runs out. All move deltas for a pass are computed at once with
+numpy, so a few hundred jobs take well under a second.
+
+replan() re-sequences the remaining jobs from the actual drop time of an
+overrunning batch, reusing the cached predictions (no model calls).
+
+Usage (from the project root):
+    python -m scripts_main.production_scheduler --jobs 1:200x4,2:150x2 \\
+        [--start 06:00] [--room-temp 68 --humidity 45 --bean-temp 66] [--model core]
+"""
+
+import argparse
+import time
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from scripts_utility.roast_defaults import DEFAULT_ENVIRONMENT
+from scripts_main.fuel_analytics import session_fuel
+from scripts_main.daily_plan import (
+    CONDITION_KEYS,
+    lot_key,
+    lot_label,
+    lot_session,
+    merge_prediction,
+    score_core_sessions,
+    score_scout_sessions,
+)
+
+# Roaster behaviour between batches (rough shop numbers for the 540 lb drum)
+HEAT_RATE_F_PER_MIN = 10.0      # drum reheating toward the next charge temp
+COOL_RATE_F_PER_MIN = 15.0      # drum cooling toward the next charge temp
+TURNAROUND_SEC = 120.0          # drop, empty and load green beans, at the least
+
+DEFAULT_TIME_BUDGET_SEC = 2.0
+MAX_IMPROVEMENT_PASSES = 5000
+
+
+@dataclass
+class RoastJob:
+    lot: Dict[str, Any]                                          # inventory row
+    batch_weight_lbs: float
+    overrides: Dict[str, Any] = field(default_factory=dict)      # per-job profile changes (stage temps, anchors)
+    name: str = ""
+
+
+@dataclass
+class JobEstimate:
+    roast_sec: float                    # charge → drop
+    charge_temp_f: float                # stage 0 temp
+    end_temp_f: float                   # predicted drop temp
+    predicted_session: Dict[str, Any]
+    ml_filled_fields: Dict[str, Any]
+    fuel_burner_min: Optional[float] = None    # see fuel_analytics
+
+
+@dataclass
+class ScheduledBatch:
+    job: RoastJob
+    estimate: JobEstimate
+    start: datetime
+    finish: datetime
+    changeover_sec: float               # preheat / recovery before this batch
+
+
+@dataclass
+class ProductionSchedule:
+    batches: List[ScheduledBatch]
+    day_start: datetime
+    conditions: Dict[str, float]
+    model: str
+    completed: int = 0                  # batches already roasted (kept in front after replan)
+    elapsed_sec: float = 0.0
+
+    @property
+    def finish(self) -> datetime:
+        return self.batches[-1].finish if self.batches else self.day_start
+
+    @property
+    def total_hours(self) -> float:
+        return (self.finish - self.day_start).total_seconds() / 3600.0
+
+    @property
+    def roasting_hours(self) -> float:
+        return sum(b.estimate.roast_sec for b in self.batches) / 3600.0
+
+    @property
+    def changeover_hours(self) -> float:
+        return sum(b.changeover_sec for b in self.batches) / 3600.0
+
+    @property
+    def fuel_burner_min(self) -> Optional[float]:
+        """Predicted roasting fuel for all batches (None if any batch has no estimate)."""
+        fuel = [b.estimate.fuel_burner_min for b in self.batches]
+        return None if any(f is None for f in fuel) else float(sum(fuel))
+
+# -------------------------------------------------------------------
+# Job estimates (one batch model call for the whole queue)
+# -------------------------------------------------------------------
+
+def _job_key(job: RoastJob) -> Tuple[str, float, str]:
+    return lot_key(job.lot), float(job.batch_weight_lbs), repr(sorted(job.overrides.items()))
+
+
+def _estimate_from_session(predicted_session: Dict[str, Any], ml_filled_fields: Dict[str, Any]) -> JobEstimate:
+    times = [predicted_session.get(f"stage_{i}_time_sec") for i in range(10)]
+    times = [float(t) for t in times if t is not None]
+    end_temp = predicted_session.get("end_temp_f")
+    if end_temp is None:
+        end_temp = predicted_session.get("stage_9_temp_f")
+    return JobEstimate(
+        roast_sec=max(times) if times else 0.0,
+        charge_temp_f=float(predicted_session.get("stage_0_temp_f") or 0.0),
+        end_temp_f=float(end_temp or 0.0),
+        predicted_session=predicted_session,
+        ml_filled_fields=ml_filled_fields,
+        fuel_burner_min=session_fuel(predicted_session),
+    )
+
+
+def estimate_jobs(
+    jobs: Sequence[RoastJob],
+    conditions: Dict[str, float],
+    model: str = "core",
+    roast_day: Optional[date] = None,
+    payload: Optional[Tuple[dict, list]] = None,
+    bundle: Optional[Dict[str, Any]] = None,
+) -> List[JobEstimate]:
+    """Predict every job; identical (lot, weight, overrides) jobs are scored once."""
+    unique: Dict[Tuple[str, float, str], int] = {}
+    sessions: List[Dict[str, Any]] = []
+    for job in jobs:
+        key = _job_key(job)
+        if key not in unique:
+            unique[key] = len(sessions)
+            session = lot_session(job.lot, conditions, job.batch_weight_lbs)
+            session.update(job.overrides)
+            sessions.append(session)
+
+    if model == "core":
+        day = datetime.combine(roast_day or date.today(), datetime.min.time())
+        scored = score_core_sessions(sessions, day, bundle)
+    elif model == "scout":
+        scored = score_scout_sessions(sessions, payload)
+    else:
+        raise ValueError(f"Unknown model: {model}")
+    if scored is None:
+        raise RuntimeError(f"No {model} model found — have you trained models yet?")
+
+    estimates = []
+    for session, result in zip(sessions, scored):
+        merged = merge_prediction(session, result)
+        estimates.append(_estimate_from_session(merged["predicted_session"], merged["ml_filled_fields"]))
+    return [estimates[unique[_job_key(job)]] for job in jobs]
+
+# -------------------------------------------------------------------
+# Changeover costs
+# -------------------------------------------------------------------
+
+def temp_change_sec(from_temp_f: np.ndarray, to_temp_f: np.ndarray) -> np.ndarray:
+    """Seconds for the drum to heat or cool between temperatures."""
+    diff = np.asarray(to_temp_f, dtype=float) - np.asarray(from_temp_f, dtype=float)
+    return np.where(diff > 0, diff / HEAT_RATE_F_PER_MIN, -diff / COOL_RATE_F_PER_MIN) * 60.0
+
+
+def changeover_matrix(estimates: Sequence[JobEstimate]) -> np.ndarray:
+    """cost[i, j] = seconds between dropping job i and charging job j."""
+    end = np.array([e.end_temp_f for e in estimates])
+    charge = np.array([e.charge_temp_f for e in estimates])
+    return np.maximum(TURNAROUND_SEC, temp_change_sec(end[:, None], charge[None, :]))
+
+
+def start_costs(estimates: Sequence[JobEstimate], roaster_temp_f: float, warm: bool) -> np.ndarray:
+    """Seconds from the roaster's current temp to each job's charge temp (cold preheat or warm recovery)."""
+    charge = np.array([e.charge_temp_f for e in estimates])
+    cost = temp_change_sec(np.full(len(charge), roaster_temp_f), charge)
+    return np.maximum(TURNAROUND_SEC, cost) if warm else cost
+
+# -------------------------------------------------------------------
+# Sequencing
+# -------------------------------------------------------------------
+
+def path_cost(order: np.ndarray, cost: np.ndarray, start: np.ndarray) -> float:
+    if len(order) == 0:
+        return 0.0
+    return float(start[order[0]] + cost[order[:-1], order[1:]].sum())
+
+
+def nearest_neighbour(cost: np.ndarray, start: np.ndarray) -> np.ndarray:
+    n = len(start)
+    order = np.empty(n, dtype=int)
+    visited = np.zeros(n, dtype=bool)
+    current = int(np.argmin(start))
+    for k in range(n):
+        order[k] = current
+        visited[current] = True
+        if k == n - 1:
+            break
+        row = np.where(visited, np.inf, cost[current])
+        current = int(np.argmin(row))
+    return order
+
+
+def _best_two_opt(order: np.ndarray, cost: np.ndarray, start: np.ndarray) -> Tuple[float, int, int]:
+    """Best segment reversal (i..j) for an asymmetric path; returns (delta, i, j)."""
+    n = len(order)
+    fwd = cost[order[:-1], order[1:]]
+    bwd = cost[order[1:], order[:-1]]
+    pf = np.concatenate(([0.0], np.cumsum(fwd)))
+    pb = np.concatenate(([0.0], np.cumsum(bwd)))
+
+    i, j = np.triu_indices(n, k=1)
+    internal = (pb[j] - pb[i]) - (pf[j] - pf[i])
+
+    prev = order[np.maximum(i - 1, 0)]
+    entry_old = np.where(i == 0, start[order[i]], cost[prev, order[i]])
+    entry_new = np.where(i == 0, start[order[j]], cost[prev, order[j]])
+
+    nxt = order[np.minimum(j + 1, n - 1)]
+    has_next = j < n - 1
+    exit_old = np.where(has_next, cost[order[j], nxt], 0.0)
+    exit_new = np.where(has_next, cost[order[i], nxt], 0.0)
+
+    delta = internal + (entry_new - entry_old) + (exit_new - exit_old)
+    k = int(np.argmin(delta))
+    return float(delta[k]), int(i[k]), int(j[k])
+
+
+def _best_relocation(order: np.ndarray, cost: np.ndarray, start: np.ndarray) -> Tuple[float, int, int]:
+    """Best single-job move; returns (delta, from position, insert position in the shortened order)."""
+    n = len(order)
+    best = (0.0, -1, -1)
+    for a in range(n):
+        job = order[a]
+        rest = np.delete(order, a)
+
+        # Removing job a
+        before = start[job] if a == 0 else cost[order[a - 1], job]
+        after = cost[job, order[a + 1]] if a < n - 1 else 0.0
+        if a == 0:
+            bridge = start[order[1]]
+        elif a < n - 1:
+            bridge = cost[order[a - 1], order[a + 1]]
+        else:
+            bridge = 0.0
+        removal = bridge - before - after
+
+        # Inserting it before rest[p] (p == len(rest): at the end)
+        m = len(rest)
+        p = np.arange(m + 1)
+        prev_cost_in = np.where(p == 0, start[job], cost[rest[np.maximum(p - 1, 0)], job])
+        out_cost = np.where(p < m, cost[job, rest[np.minimum(p, m - 1)]], 0.0)
+        replaced = np.where(
+            p == 0,
+            start[rest[0]],
+            np.where(p < m, cost[rest[np.maximum(p - 1, 0)], rest[np.minimum(p, m - 1)]], 0.0),
+        )
+        insertion = prev_cost_in + out_cost - replaced
+
+        q = int(np.argmin(insertion))
+        delta = float(removal + insertion[q])
+        if delta < best[0]:
+            best = (delta, a, q)
+    return best
+
+
+def improve_order(
+    order: np.ndarray,
+    cost: np.ndarray,
+    start: np.ndarray,
+    time_budget_sec: float = DEFAULT_TIME_BUDGET_SEC,
+) -> np.ndarray:
+    """Apply the best 2-opt / relocation move until none helps or the budget runs out."""
+    deadline = time.perf_counter() + time_budget_sec
+    order = order.copy()
+    if len(order) < 2:
+        return order
+
+    for _ in range(MAX_IMPROVEMENT_PASSES):
+        delta, i, j = _best_two_opt(order, cost, start)
+        if delta < -1e-9:
+            order[i:j + 1] = order[i:j + 1][::-1]
+        else:
+            delta, a, q = _best_relocation(order, cost, start)
+            if delta >= -1e-9:
+                break
+            rest = np.delete(order, a)
+            order = np.insert(rest, q, order[a])
+        if time.perf_counter() >= deadline:
+            break
+    return order
+
+# -------------------------------------------------------------------
+# Timeline
+# -------------------------------------------------------------------
+
+def _timeline(
+    jobs: Sequence[RoastJob],
+    estimates: Sequence[JobEstimate],
+    order: Sequence[int],
+    cost: np.ndarray,
+    start: np.ndarray,
+    begin: datetime,
+) -> List[ScheduledBatch]:
+    batches: List[ScheduledBatch] = []
+    clock = begin
+    prev = None
+    for idx in order:
+        changeover = float(start[idx] if prev is None else cost[prev, idx])
+        charge_at = clock + timedelta(seconds=changeover)
+        finish = charge_at + timedelta(seconds=estimates[idx].roast_sec)
+        batches.append(ScheduledBatch(jobs[idx], estimates[idx], charge_at, finish, changeover))
+        clock = finish
+        prev = idx
+    return batches
+
+
+def _sequence(
+    estimates: Sequence[JobEstimate],
+    roaster_temp_f: float,
+    warm: bool,
+    time_budget_sec: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    cost = changeover_matrix(estimates)
+    start = start_costs(estimates, roaster_temp_f, warm)
+    order = improve_order(nearest_neighbour(cost, start), cost, start, time_budget_sec)
+    return order, cost, start
+
+
+def schedule_jobs(
+    jobs: Sequence[RoastJob],
+    conditions: Dict[str, float],
+    day_start: Optional[datetime] = None,
+    model: str = "core",
+    time_budget_sec: float = DEFAULT_TIME_BUDGET_SEC,
+    payload: Optional[Tuple[dict, list]] = None,
+    bundle: Optional[Dict[str, Any]] = None,
+) -> ProductionSchedule:
+    """
+    Predict and order `jobs`. The roaster starts cold (room temp) at
+    `day_start`; the first changeover is the preheat.
+    """
+    t0 = time.perf_counter()
+    day_start = day_start or datetime.now().replace(second=0, microsecond=0)
+    conditions = {k: conditions.get(k) for k in CONDITION_KEYS}
+    if not jobs:
+        return ProductionSchedule([], day_start, conditions, model)
+
+    estimates = estimate_jobs(jobs, conditions, model, day_start.date(), payload, bundle)
+    room_temp = conditions.get("room_temp_f")
+    room_temp = DEFAULT_ENVIRONMENT["room_temp_f"] if room_temp is None else float(room_temp)
+    order, cost, start = _sequence(estimates, room_temp, warm=False, time_budget_sec=time_budget_sec)
+
+    return ProductionSchedule(
+        batches=_timeline(jobs, estimates, order, cost, start, day_start),
+        day_start=day_start,
+        conditions=conditions,
+        model=model,
+        elapsed_sec=time.perf_counter() - t0,
+    )
+
+
+def replan(
+    schedule: ProductionSchedule,
+    completed: int,
+    dropped_at: datetime,
+    roaster_temp_f: Optional[float] = None,
+    time_budget_sec: float = DEFAULT_TIME_BUDGET_SEC,
+) -> ProductionSchedule:
+    """
+    Re-sequence after batch `completed` (count of batches done) dropped at
+    `dropped_at`. The drum starts from `roaster_temp_f` (default: that
+    batch's predicted end temp). Predictions are reused, not recomputed.
+    """
+    t0 = time.perf_counter()
+    if not 0 < completed <= len(schedule.batches):
+        raise ValueError(f"completed must be between 1 and {len(schedule.batches)}")
+
+    done = list(schedule.batches[:completed])
+    done[-1] = replace(done[-1], finish=dropped_at)
+    remaining = schedule.batches[completed:]
+    if not remaining:
+        return replace(schedule, batches=done, completed=completed, elapsed_sec=time.perf_counter() - t0)
+
+    jobs = [b.job for b in remaining]
+    estimates = [b.estimate for b in remaining]
+    if roaster_temp_f is None:
+        roaster_temp_f = done[-1].estimate.end_temp_f
+    order, cost, start = _sequence(estimates, roaster_temp_f, warm=True, time_budget_sec=time_budget_sec)
+
+    return replace(
+        schedule,
+        batches=done + _timeline(jobs, estimates, order, cost, start, dropped_at),
+        completed=completed,
+        elapsed_sec=time.perf_counter() - t0,
+    )
+
+# -------------------------------------------------------------------
+# CLI
+# -------------------------------------------------------------------
+
+def _mmss(seconds: float) -> str:
+    total = int(round(seconds))
+    return f"{total // 60:02d}:{total % 60:02d}"
+
+
+def print_schedule(schedule: ProductionSchedule) -> None:
+    print(f"\n🗓️ Production schedule ({schedule.model}) — {len(schedule.batches)} batches, "
+          f"start {schedule.day_start:%H:%M}")
+    for n, b in enumerate(schedule.batches, start=1):
+        done = "✔" if n <= schedule.completed else " "
+        label = b.job.name or lot_label(b.job.lot)
+        print(f"{done}{n:3d}. {b.start:%H:%M}–{b.finish:%H:%M}  {label} @ {b.job.batch_weight_lbs:g} lbs"
+              f"  roast {_mmss(b.estimate.roast_sec)}, changeover {_mmss(b.changeover_sec)},"
+              f" charge {b.estimate.charge_temp_f:.0f}°F → end {b.estimate.end_temp_f:.0f}°F")
+    print(f"\n⏱️ Finish {schedule.finish:%H:%M} — {schedule.total_hours:.2f} h total "
+          f"({schedule.roasting_hours:.2f} h roasting, {schedule.changeover_hours:.2f} h preheat/changeover)")
+    if schedule.fuel_burner_min is not None:
+        print(f"🔥 Roasting fuel {schedule.fuel_burner_min:.0f} full-burner min (excludes preheat/changeover)")
+    print(f"✅ Planned in {schedule.elapsed_sec:.2f}s\n")
+
+
+def parse_job_spec(spec: str, inventory: Dict[int, Dict[str, Any]]) -> List[RoastJob]:
+    """'1:200x4,2:150' → jobs for inventory ids (weight defaults to 200 lbs, count to 1)."""
+    jobs: List[RoastJob] = []
+    for part in (p.strip() for p in spec.split(",") if p.strip()):
+        lot_id, _, rest = part.partition(":")
+        weight, _, count = (rest or f"{DEFAULT_ENVIRONMENT['batch_weight_lbs']:g}").partition("x")
+        lot = inventory.get(int(lot_id))
+        if lot is None:
+            raise ValueError(f"No inventory coffee with id {lot_id}")
+        jobs.extend(RoastJob(lot, float(weight)) for _ in range(int(count or 1)))
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Order a day's batches to minimize roaster time.")
+    parser.add_argument("--jobs", required=True, help="inventory id:weight x count, e.g. 1:200x4,2:150x2")
+    parser.add_argument("--start", default=None, help="HH:MM the roaster is switched on (default: now)")
+    parser.add_argument("--room-temp", type=float, default=DEFAULT_ENVIRONMENT["room_temp_f"])
+    parser.add_argument("--humidity", type=float, default=DEFAULT_ENVIRONMENT["humidity_pct"])
+    parser.add_argument("--bean-temp", type=float, default=DEFAULT_ENVIRONMENT["room_bean_temp_f"])
+    parser.add_argument("--model", choices=["core", "scout"], default="core")
+    parser.add_argument("--budget", type=float, default=DEFAULT_TIME_BUDGET_SEC, help="sequencing time budget (s)")
+    args = parser.parse_args()
+
+    from scripts_main.edit_coffee_inventory import load_inventory
+    inventory = {int(row["id"]): row.to_dict() for _, row in load_inventory().iterrows()}
+    try:
+        jobs = parse_job_spec(args.jobs, inventory)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    day_start = None
+    if args.start:
+        hh, mm = (int(x) for x in args.start.split(":"))
+        day_start = datetime.combine(date.today(), datetime.min.time()).replace(hour=hh, minute=mm)
+
+    conditions = {"room_temp_f": args.room_temp, "humidity_pct": args.humidity, "room_bean_temp_f": args.bean_temp}
+    try:
+        schedule = schedule_jobs(jobs, conditions, day_start, args.model, args.budget)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return
+    print_schedule(schedule)
+
+
+if __name__ == "__main__":
+    main()
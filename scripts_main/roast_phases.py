@@ -0,0 +1,281 @@
+# scripts_main/roast_phases.py
+"""
+Rate of rise and roast phases from the stage points.
+
+The bean curve runs from the turning point through stages 1–9 (stage 0 is
+the charge temp, not a bean reading). From it, for all roasts at once:
+
+  - RoR (°F/min) into each stage, plus mean, peak and final RoR
+  - drying end (DRYING_END_F) and first crack (FIRST_CRACK_F), read off
+    the smooth stage curve (scripts_utility.curve_model)
+  - drying / Maillard / development time and development-time ratio (DTR)
+
+Roast-log results are cached in the derived store keyed by roast id.
+
+Full phases need every stage time, which Core predicts, so they are not
+used as features. Instead ANCHOR_FEATURE_COLUMNS are computed from the
+anchor stages (1, 6, 9), which are inputs at prediction time; train_core
+adds them when USE_PHASE_FEATURES is set in train_core_config.
+"""
+
+import argparse
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from scripts_utility.curve_model import CurveModel
+from scripts_utility.paths import DATA_FILE
+
+DRYING_END_F = 300.0
+FIRST_CRACK_F = 385.0
+
+PHASE_GROUP = "phases"
+# Bump when the computation changes so cached roasts are recomputed
+PHASE_VERSION = "pchip"
+
+RAMP_STAGES = list(range(1, 10))
+ANCHOR_STAGES = [1, 6, 9]
+
+STAGE_ROR_COLUMNS = [f"ror_stage_{i}_f_per_min" for i in RAMP_STAGES]
+PHASE_COLUMNS = [
+    "drying_end_sec",
+    "first_crack_sec",
+    "drying_time_sec",
+    "maillard_time_sec",
+    "development_time_sec",
+    "development_ratio",
+    "ror_mean_f_per_min",
+    "ror_peak_f_per_min",
+    "ror_final_f_per_min",
+] + STAGE_ROR_COLUMNS
+
+ANCHOR_FEATURE_COLUMNS = [
+    "anchor_ror_1_6_f_per_min",
+    "anchor_ror_6_9_f_per_min",
+    "anchor_first_crack_sec",
+    "anchor_development_ratio",
+]
+
+PHASE_INPUT_COLUMNS = (
+    ["turning_point_time_sec", "turning_point_temp_f"]
+    + [f"stage_{i}_time_sec" for i in RAMP_STAGES]
+    + [f"stage_{i}_temp_f" for i in RAMP_STAGES]
+)
+
+# -------------------------------------------------------------------
+# Vectorized core
+# -------------------------------------------------------------------
+
+def time_at_temp(times: np.ndarray, temps: np.ndarray, target_f: float) -> np.ndarray:
+    """
+    First time each row's curve ((n, k) points, see CurveModel) rises
+    through target_f; NaN where it never does. Rows already above the
+    target at their first point return that point's time.
+    """
+    result = CurveModel.fit(times, temps).time_at_temp(target_f)
+    rows = np.arange(len(times))
+    first = np.argmax(~(np.isnan(times) | np.isnan(temps)), axis=1)
+    starts_above = temps[rows, first] >= target_f
+    return np.where(np.isnan(result) & starts_above, times[rows, first], result)
+
+
+def segment_ror(times: np.ndarray, temps: np.ndarray) -> np.ndarray:
+    """°F/min between consecutive points, shape (n, k-1)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ror = np.diff(temps, axis=1) / np.diff(times, axis=1) * 60.0
+    return np.where(np.isfinite(ror), ror, np.nan)
+
+
+def phase_arrays(times: np.ndarray, temps: np.ndarray, tp_time: np.ndarray, tp_temp: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    PHASE_COLUMNS from (n, 9) stage 1–9 times/temps and the turning point
+    (n,). The turning point is the first curve point when it is recorded.
+    """
+    tp_ok = (tp_time > 0) & (tp_temp > 0)
+    curve_t = np.column_stack([np.where(tp_ok, tp_time, np.nan), times])
+    curve_y = np.column_stack([np.where(tp_ok, tp_temp, np.nan), temps])
+
+    ror = segment_ror(curve_t, curve_y)           # into stages 1..9
+    drop = times[:, -1]
+    dry = time_at_temp(curve_t, curve_y, DRYING_END_F)
+    fc = time_at_temp(curve_t, curve_y, FIRST_CRACK_F)
+
+    start_t = np.where(tp_ok, tp_time, times[:, 0])
+    start_y = np.where(tp_ok, tp_temp, temps[:, 0])
+    with np.errstate(divide="ignore", invalid="ignore", all="ignore"):
+        mean_ror = (temps[:, -1] - start_y) / (drop - start_t) * 60.0
+        ratio = (drop - fc) / drop
+        peak = np.where(np.isnan(ror).all(axis=1), np.nan, np.nanmax(np.where(np.isnan(ror), -np.inf, ror), axis=1))
+
+    out = {
+        "drying_end_sec": dry,
+        "first_crack_sec": fc,
+        "drying_time_sec": dry,
+        "maillard_time_sec": fc - dry,
+        "development_time_sec": drop - fc,
+        "development_ratio": ratio,
+        "ror_mean_f_per_min": mean_ror,
+        "ror_peak_f_per_min": peak,
+        "ror_final_f_per_min": ror[:, -1],
+    }
+    for j, col in enumerate(STAGE_ROR_COLUMNS):
+        out[col] = ror[:, j]
+    return out
+
+
+def anchor_feature_arrays(times: np.ndarray, temps: np.ndarray) -> Dict[str, np.ndarray]:
+    """ANCHOR_FEATURE_COLUMNS from (n, 3) stage 1/6/9 times and temps (inputs at prediction time)."""
+    ror = segment_ror(times, temps)
+    fc = time_at_temp(times, temps, FIRST_CRACK_F)
+    drop = times[:, -1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = (drop - fc) / drop
+    return {
+        "anchor_ror_1_6_f_per_min": ror[:, 0],
+        "anchor_ror_6_9_f_per_min": ror[:, 1],
+        "anchor_first_crack_sec": fc,
+        "anchor_development_ratio": ratio,
+    }
+
+# -------------------------------------------------------------------
+# DataFrames / sessions
+# -------------------------------------------------------------------
+
+def _numeric(df, columns: List[str]) -> np.ndarray:
+    import pandas as pd
+    return df.reindex(columns=columns).apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+
+
+def compute_phases(df):
+    """Derived-store compute function: PHASE_COLUMNS + ANCHOR_FEATURE_COLUMNS per row of df."""
+    import pandas as pd
+
+    times = _numeric(df, [f"stage_{i}_time_sec" for i in RAMP_STAGES])
+    temps = _numeric(df, [f"stage_{i}_temp_f" for i in RAMP_STAGES])
+    tp = _numeric(df, ["turning_point_time_sec", "turning_point_temp_f"])
+    out = phase_arrays(times, temps, tp[:, 0], tp[:, 1])
+
+    anchor_idx = [RAMP_STAGES.index(i) for i in ANCHOR_STAGES]
+    out.update(anchor_feature_arrays(times[:, anchor_idx], temps[:, anchor_idx]))
+    return pd.DataFrame(out, index=df.index)
+
+
+def roast_phases(roast_df=None):
+    """Phase metrics + anchor features for every roast, computing only new/edited roasts."""
+    import pandas as pd
+    from scripts_utility.derived_store import ensure_derived
+
+    if roast_df is None:
+        roast_df = pd.read_csv(DATA_FILE) if os.path.exists(DATA_FILE) else pd.DataFrame()
+    return ensure_derived(
+        roast_df, PHASE_GROUP, PHASE_INPUT_COLUMNS,
+        PHASE_COLUMNS + ANCHOR_FEATURE_COLUMNS, compute_phases, version=PHASE_VERSION,
+    )
+
+
+def _to_float(v: Any) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def session_phases(session: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """PHASE_COLUMNS for one (predicted) session; None where undefined."""
+    times = np.array([[_to_float(session.get(f"stage_{i}_time_sec")) for i in RAMP_STAGES]])
+    temps = np.array([[_to_float(session.get(f"stage_{i}_temp_f")) for i in RAMP_STAGES]])
+    tp_time = np.array([_to_float(session.get("turning_point_time_sec"))])
+    tp_temp = np.array([_to_float(session.get("turning_point_temp_f"))])
+    out = phase_arrays(times, temps, tp_time, tp_temp)
+    return {k: (None if np.isnan(v[0]) else float(v[0])) for k, v in out.items()}
+
+
+def anchor_features(values: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """ANCHOR_FEATURE_COLUMNS for one input row (Core inference)."""
+    times = np.array([[_to_float(values.get(f"stage_{i}_time_sec")) for i in ANCHOR_STAGES]])
+    temps = np.array([[_to_float(values.get(f"stage_{i}_temp_f")) for i in ANCHOR_STAGES]])
+    out = anchor_feature_arrays(times, temps)
+    return {k: (None if np.isnan(v[0]) else float(v[0])) for k, v in out.items()}
+
+
+def refresh_anchor_features(df, columns: Optional[List[str]] = None) -> None:
+    """
+    (Re)compute anchor features in place on a Core input frame, e.g. after
+    its anchor stage times/temps were changed. `columns` defaults to the
+    anchor features already in df; nothing happens if an anchor stage is absent.
+    """
+    columns = [c for c in ANCHOR_FEATURE_COLUMNS if c in (df.columns if columns is None else columns)]
+    time_cols = [f"stage_{i}_time_sec" for i in ANCHOR_STAGES]
+    temp_cols = [f"stage_{i}_temp_f" for i in ANCHOR_STAGES]
+    if not columns or any(c not in df.columns for c in time_cols + temp_cols):
+        return
+    out = anchor_feature_arrays(_numeric(df, time_cols), _numeric(df, temp_cols))
+    for col in columns:
+        df[col] = out[col]
+
+
+def phase_summary(session: Dict[str, Any]) -> Optional[str]:
+    """One-line phase summary for reports."""
+    p = session_phases(session)
+
+    def mmss(sec: Optional[float]) -> str:
+        if sec is None:
+            return "n/a"
+        total = int(round(abs(sec)))
+        return f"{'-' if sec < 0 else ''}{total // 60:02d}:{total % 60:02d}"
+
+    if p["ror_mean_f_per_min"] is None and p["development_time_sec"] is None:
+        return None
+    parts = [
+        f"Drying {mmss(p['drying_time_sec'])}",
+        f"Maillard {mmss(p['maillard_time_sec'])}",
+        f"Development {mmss(p['development_time_sec'])}",
+    ]
+    if p["development_ratio"] is not None:
+        parts.append(f"DTR {100.0 * p['development_ratio']:.0f}%")
+    ror = [f"{label} {p[key]:.1f}" for label, key in (
+        ("mean", "ror_mean_f_per_min"), ("peak", "ror_peak_f_per_min"), ("final", "ror_final_f_per_min"),
+    ) if p[key] is not None]
+    if ror:
+        parts.append("RoR " + ", ".join(ror) + " °F/min")
+    return " | ".join(parts)
+
+# -------------------------------------------------------------------
+# CLI
+# -------------------------------------------------------------------
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Rate of rise and roast phases for every roast in the log.")
+    parser.add_argument("--top", type=int, default=10, help="show the N most recent roasts")
+    args = parser.parse_args()
+
+    if not os.path.exists(DATA_FILE):
+        print(f"❌ No roast log at {DATA_FILE}")
+        return
+    roast_df = pd.read_csv(DATA_FILE)
+    phases = roast_phases(roast_df)
+    known = phases["development_ratio"].notna()
+
+    print(f"\n📈 Phases for {int(known.sum())} of {len(roast_df)} roasts "
+          f"(others never reach {FIRST_CRACK_F:g}°F or are missing a stage)")
+    if not known.any():
+        return
+    med = phases.loc[known].median()
+    print(f"   Median: drying {med['drying_time_sec']:.0f}s, Maillard {med['maillard_time_sec']:.0f}s, "
+          f"development {med['development_time_sec']:.0f}s (DTR {100.0 * med['development_ratio']:.0f}%), "
+          f"mean RoR {med['ror_mean_f_per_min']:.1f} °F/min")
+
+    cols: List[str] = [c for c in ("roast_date", "country", "batch_weight_lbs") if c in roast_df.columns]
+    shown = ["drying_time_sec", "maillard_time_sec", "development_time_sec", "development_ratio",
+             "ror_peak_f_per_min", "ror_final_f_per_min"]
+    recent = roast_df[cols].join(phases[shown]).tail(args.top)
+    print(f"\nLast {len(recent)} roasts:")
+    print(recent.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    print()
+
+
+if __name__ == "__main__":
+    main()
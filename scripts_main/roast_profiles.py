@@ -0,0 +1,330 @@
+# scripts_main/roast_profiles.py
+"""
+Recurring roast profiles ("recipes") found by clustering the roast log.
+
+Each roast is described by its curve shape (scripts_main.shape_index, in
+°F) followed by its stage 0–9 burner settings (weighted by
+BURNER_WEIGHT_F_PER_PCT, missing settings filled with the log median).
+MiniBatchKMeans groups those vectors, and the centers are saved to
+models/roast_profiles.npz.
+
+Labels are kept in data/roast_derived.csv ("profiles" group). Roasts that
+are new or edited since the last run are assigned to the nearest center,
+which then moves toward them (running mean), so a saved roast costs one
+distance pass over the k centers rather than a re-cluster. A full
+re-cluster (--recluster) matches the new centers to the old ones so that
+profile ids stay the same where the profiles did.
+
+Usage (from the project root):
+    python -m scripts_main.roast_profiles [--recluster] [--k 6]
+"""
+
+import argparse
+import os
+from typing import Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from scripts_utility.paths import DATA_FILE, MODELS_DIR
+from scripts_main.fuel_analytics import BURNER_COLUMNS
+from scripts_main.shape_index import STAGE_TEMP_COLS, STAGE_TIME_COLS, shape_vectors, stage_arrays
+
+PROFILE_MODEL_PATH = MODELS_DIR / "roast_profiles.npz"
+PROFILE_GROUP = "profiles"
+PROFILE_COLUMN = "profile_id"
+PROFILE_INPUT_COLUMNS = STAGE_TIME_COLS + STAGE_TEMP_COLS + BURNER_COLUMNS
+
+# A 1 % burner difference at one stage counts like being this many °F off at one curve point
+BURNER_WEIGHT_F_PER_PCT = 2.0
+
+# Fewer roasts than this are not clustered
+MIN_ROASTS = 10
+
+# Candidate profile counts when --k is not given, scored by silhouette on a sample
+MAX_PROFILES = 8
+MIN_PROFILE_SIZE = 5
+SILHOUETTE_SAMPLE = 2000
+
+
+def profile_label(value: Any) -> str:
+    """'P3' for profile 3 (or 'P3' itself); 'NaN' when unknown — Core's categorical value."""
+    text = str(value).strip().upper() if value is not None else ""
+    if text.startswith("P"):
+        text = text[1:]
+    try:
+        return f"P{int(float(text))}"
+    except (TypeError, ValueError, OverflowError):
+        return "NaN"
+
+
+class ProfileModel:
+    """Profile centers with their ids, roast counts and the burner fill used to build them."""
+
+    def __init__(
+        self,
+        centers: np.ndarray,
+        ids: np.ndarray,
+        counts: np.ndarray,
+        burner_fill: np.ndarray,
+        generation: int = 1,
+    ):
+        self.centers = centers          # (k, SHAPE_POINTS + 1 + 10)
+        self.ids = ids                  # (k,) profile ids, 1-based
+        self.counts = counts            # (k,) roasts assigned so far
+        self.burner_fill = burner_fill  # (10,) median burner % per stage
+        self.generation = generation    # bumped by every full re-cluster
+        self.changed = False
+
+    @staticmethod
+    def vectors(df: pd.DataFrame, burner_fill: np.ndarray) -> tuple:
+        """(vectors, ok): shape vector + weighted burners per roast; ok marks rows with a usable curve."""
+        shapes, ok = shape_vectors(*stage_arrays(df))
+        burners = df.reindex(columns=BURNER_COLUMNS).apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+        burners = np.where(np.isnan(burners), burner_fill, burners)
+        return np.hstack([shapes, BURNER_WEIGHT_F_PER_PCT * burners]), ok
+
+    @classmethod
+    def fit(cls, roast_df: pd.DataFrame, k: Optional[int] = None,
+            previous: Optional["ProfileModel"] = None) -> Optional["ProfileModel"]:
+        """Cluster the whole log; None if it has fewer than MIN_ROASTS usable curves."""
+        from sklearn.cluster import MiniBatchKMeans
+
+        burner_fill = roast_df.reindex(columns=BURNER_COLUMNS).apply(pd.to_numeric, errors="coerce").median()
+        burner_fill = np.nan_to_num(burner_fill.to_numpy(dtype=float))
+        vectors, ok = cls.vectors(roast_df, burner_fill)
+        vectors = vectors[ok]
+        if len(vectors) < MIN_ROASTS:
+            return None
+
+        if k is None:
+            k = _choose_k(vectors)
+        k = max(1, min(int(k), len(vectors)))
+        km = MiniBatchKMeans(n_clusters=k, batch_size=1024, n_init=3, random_state=0).fit(vectors)
+        counts = np.bincount(km.labels_, minlength=k).astype(float)
+
+        ids = np.arange(1, k + 1)
+        generation = 1
+        if previous is not None:
+            ids = _match_ids(km.cluster_centers_, previous)
+            generation = previous.generation + 1
+        model = cls(km.cluster_centers_, ids, counts, burner_fill, generation)
+        model.changed = True
+        return model
+
+    def nearest(self, vectors: np.ndarray) -> np.ndarray:
+        """Index of the closest center for each row (squared distances via one matrix product)."""
+        d2 = (
+            (vectors ** 2).sum(axis=1)[:, None]
+            - 2.0 * vectors @ self.centers.T
+            + (self.centers ** 2).sum(axis=1)[None, :]
+        )
+        return d2.argmin(axis=1)
+
+    def assign(self, df: pd.DataFrame, update: bool = True) -> pd.DataFrame:
+        """
+        PROFILE_COLUMN for each row (NaN without a usable curve). With update,
+        each assigned roast pulls its center toward it by 1 / (roasts in profile).
+        """
+        vectors, ok = self.vectors(df, self.burner_fill)
+        out = pd.DataFrame({PROFILE_COLUMN: np.nan}, index=df.index)
+        if not ok.any():
+            return out
+        vectors = vectors[ok]
+        nearest = self.nearest(vectors)
+        out.loc[ok, PROFILE_COLUMN] = self.ids[nearest]
+
+        if update:
+            for c in np.unique(nearest):
+                members = vectors[nearest == c]
+                self.counts[c] += len(members)
+                self.centers[c] += (members - self.centers[c]).sum(axis=0) / self.counts[c]
+            self.changed = True
+        return out
+
+    # --------------------------
+    # Persistence
+    # --------------------------
+    def save(self, path=PROFILE_MODEL_PATH) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp.npz"
+        np.savez(
+            tmp,
+            centers=self.centers, ids=self.ids, counts=self.counts,
+            burner_fill=self.burner_fill, generation=np.array(self.generation),
+        )
+        os.replace(tmp, path)
+        self.changed = False
+
+    @classmethod
+    def load(cls, path=PROFILE_MODEL_PATH) -> Optional["ProfileModel"]:
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                return cls(
+                    data["centers"].copy(), data["ids"], data["counts"].astype(float),
+                    data["burner_fill"], int(data["generation"]),
+                )
+        except (OSError, KeyError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable {path}: {e}")
+            return None
+
+
+def _choose_k(vectors: np.ndarray) -> int:
+    """Profile count with the best silhouette score on a sample of the log."""
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.metrics import silhouette_score
+
+    largest = min(MAX_PROFILES, len(vectors) // MIN_PROFILE_SIZE)
+    if largest < 2:
+        return 1
+    rng = np.random.default_rng(0)
+    sample = vectors if len(vectors) <= SILHOUETTE_SAMPLE else vectors[rng.choice(len(vectors), SILHOUETTE_SAMPLE, replace=False)]
+
+    best_k, best_score = 1, -1.0
+    for k in range(2, largest + 1):
+        labels = MiniBatchKMeans(n_clusters=k, batch_size=1024, n_init=3, random_state=0).fit_predict(sample)
+        if len(np.unique(labels)) < 2:
+            continue
+        score = silhouette_score(sample, labels)
+        if score > best_score:
+            best_k, best_score = k, score
+    return best_k
+
+
+def _match_ids(centers: np.ndarray, previous: ProfileModel) -> np.ndarray:
+    """
+    Give each new center the id of the old center it replaces, closest pairs
+    first (greedy; k is small); the rest get new ids.
+    """
+    ids = np.zeros(len(centers), dtype=int)
+    if previous.centers.shape[1] == centers.shape[1] and len(previous.centers):
+        cost = ((centers[:, None, :] - previous.centers[None, :, :]) ** 2).sum(axis=2)
+        for _ in range(min(cost.shape)):
+            new_i, old_i = np.unravel_index(np.argmin(cost), cost.shape)
+            ids[new_i] = previous.ids[old_i]
+            cost[new_i, :] = np.inf
+            cost[:, old_i] = np.inf
+    next_id = int(max(previous.ids.max(initial=0), ids.max(initial=0))) + 1
+    for i in np.flatnonzero(ids == 0):
+        ids[i] = next_id
+        next_id += 1
+    return ids
+
+# -------------------------------------------------------------------
+# Labels for the roast log
+# -------------------------------------------------------------------
+
+def roast_profiles(roast_df=None, recluster: bool = False, k: Optional[int] = None,
+                   path=PROFILE_MODEL_PATH) -> pd.DataFrame:
+    """
+    PROFILE_COLUMN for every roast in the log (same index). The first run
+    (or recluster=True) clusters the whole log; later runs only assign
+    roasts that are new or edited since.
+    """
+    from scripts_utility.derived_store import ensure_derived
+
+    if roast_df is None:
+        roast_df = pd.read_csv(DATA_FILE) if os.path.exists(DATA_FILE) else pd.DataFrame()
+
+    model = ProfileModel.load(path)
+    fitted_now = False
+    if model is None or recluster:
+        refit = ProfileModel.fit(roast_df, k, previous=model)
+        if refit is None:
+            return pd.DataFrame({PROFILE_COLUMN: np.nan}, index=roast_df.index)
+        model, fitted_now = refit, True
+
+    # Roasts the fit has already seen only need a label; later ones also move their center
+    def compute(rows: pd.DataFrame) -> pd.DataFrame:
+        return model.assign(rows, update=not fitted_now)
+
+    labels = ensure_derived(
+        roast_df, PROFILE_GROUP, PROFILE_INPUT_COLUMNS, [PROFILE_COLUMN], compute,
+        version=f"g{model.generation}",
+    )
+    if model.changed:
+        model.save(path)
+    return labels
+
+
+def fit_profiles(roast_df: pd.DataFrame, k: Optional[int] = None) -> pd.DataFrame:
+    """
+    PROFILE_COLUMN from a fresh clustering of roast_df alone (e.g. one
+    backtest window's training roasts). Nothing is read from or written
+    to the saved model or the derived store.
+    """
+    model = ProfileModel.fit(roast_df, k)
+    if model is None:
+        return pd.DataFrame({PROFILE_COLUMN: np.nan}, index=roast_df.index)
+    return model.assign(roast_df, update=False)
+
+
+def profile_labels(values: pd.Series) -> pd.Series:
+    """Profile ids as Core's categorical strings ('P3', 'NaN' when unknown)."""
+    return values.map(profile_label)
+
+
+def profile_recipes(roast_df: pd.DataFrame, labels: pd.DataFrame) -> pd.DataFrame:
+    """Per profile: roast count, then median stage temps, times, burners and rating."""
+    cols = PROFILE_INPUT_COLUMNS + [c for c in ("overall_rating",) if c in roast_df.columns]
+    numeric = roast_df.reindex(columns=cols).apply(pd.to_numeric, errors="coerce")
+    numeric[PROFILE_COLUMN] = labels[PROFILE_COLUMN]
+    grouped = numeric.dropna(subset=[PROFILE_COLUMN]).groupby(PROFILE_COLUMN)
+    recipes = grouped.median()
+    recipes.insert(0, "roasts", grouped.size())
+    recipes.index = recipes.index.astype(int)
+    return recipes.sort_values("roasts", ascending=False)
+
+
+def _mmss(seconds: float) -> str:
+    if pd.isna(seconds):
+        return "--:--"
+    return f"{int(seconds) // 60:02d}:{int(seconds) % 60:02d}"
+
+
+def print_recipes(recipes: pd.DataFrame) -> None:
+    """One block per profile: stage-by-stage median temp @ time and burner %."""
+    for pid, r in recipes.iterrows():
+        rating = r.get("overall_rating")
+        rating_txt = "" if rating is None or pd.isna(rating) else f", median rating {rating:.3g}"
+        print(f"\n  P{pid} — {int(r['roasts'])} roasts{rating_txt}")
+        stages: List[str] = []
+        for i in range(10):
+            temp, secs, burner = r[f"stage_{i}_temp_f"], r[f"stage_{i}_time_sec"], r[f"stage_{i}_burner_pct"]
+            burner_txt = "" if pd.isna(burner) else f" {burner:.0f}%"
+            temp_txt = "n/a" if pd.isna(temp) else f"{temp:.0f}°F"
+            stages.append(f"S{i} {temp_txt} @ {_mmss(secs)}{burner_txt}")
+        for start in range(0, 10, 5):
+            print("     " + " | ".join(stages[start:start + 5]))
+
+# -------------------------------------------------------------------
+# CLI
+# -------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Group the roast log into recurring roast profiles.")
+    parser.add_argument("--recluster", action="store_true", help="re-cluster the whole log instead of updating")
+    parser.add_argument("--k", type=int, default=None, help="number of profiles (default: best silhouette)")
+    args = parser.parse_args()
+
+    if not os.path.exists(DATA_FILE):
+        print(f"❌ No roast log at {DATA_FILE}")
+        return
+    roast_df = pd.read_csv(DATA_FILE)
+    labels = roast_profiles(roast_df, recluster=args.recluster or args.k is not None, k=args.k)
+    known = labels[PROFILE_COLUMN].notna()
+    if not known.any():
+        print(f"⚠️ Need at least {MIN_ROASTS} roasts with a full stage curve to find profiles.")
+        return
+
+    recipes = profile_recipes(roast_df, labels)
+    print(f"\n🧭 {len(recipes)} roast profiles over {int(known.sum())} of {len(roast_df)} roasts "
+          f"(labels in data/roast_derived.csv, column '{PROFILE_COLUMN}')")
+    print_recipes(recipes)
+    print()
+
+
+if __name__ == "__main__":
+    main()
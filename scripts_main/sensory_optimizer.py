@@ -0,0 +1,423 @@
+# scripts_main/sensory_optimizer.py
+"""
+Roast toward a taste profile.
+
+Given today's conditions and a desired sensory vector (any of clarity,
+acidity, body, sweetness, overall_rating on the 1–10 scale), search stage
+temperatures, burners and stage times for the plans whose Core-predicted
+sensory scores are closest to the target.
+
+Each worker process runs its own cross-entropy search (different seed)
+for the time budget, counted from when the worker starts searching (so
+starting the pool never eats into it). Workers get the caller's models —
+only the sensory targets', pickled with the task — so a bundle passed to
+optimize_sensory is honored on every path. Candidates are quantized
+(1 °F, 1 %, 5 s) and
+memoized, so a plan that is sampled again is never re-scored; new
+candidates are scored in one batch per sensory model. The best unique
+plans from all workers are merged into a top-k list.
+
+Usage (from the project root):
+    python -m scripts_main.sensory_optimizer --acidity 8 --sweetness 7 \\
+        [--room-temp 68 --humidity 45 ...] [--budget 10] [--workers 4] [--top-k 5]
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from scripts_utility.master_order import CORE_FEATURE_ORDER
+from scripts_utility.roast_defaults import DEFAULT_ENVIRONMENT, default_session
+from scripts_main.infer_core import (
+    preprocess,
+    build_core_frame,
+    predict_core_frame,
+    fill_core_predictions,
+    load_core_bundle,
+)
+from scripts_main.roast_phases import refresh_anchor_features
+
+SENSORY_TARGETS = ["clarity", "acidity", "body", "sweetness", "overall_rating"]
+
+# Search space around the base plan
+TEMP_SPAN_F = 15.0
+TIME_SPAN_SEC = 60.0
+BURNER_RANGE = (0.0, 100.0)
+
+# Quantization steps (also the memoization grid)
+TEMP_STEP_F = 1.0
+BURNER_STEP_PCT = 1.0
+TIME_STEP_SEC = 5.0
+
+DEFAULT_TIME_BUDGET_SEC = 10.0
+POPULATION_SIZE = 512
+ELITE_FRACTION = 0.05
+SMOOTHING = 0.7
+DEFAULT_TOP_K = 5
+
+
+@dataclass
+class SensoryPlan:
+    settings: Dict[str, float]            # searched stage temps / burners / times
+    predicted_sensory: Dict[str, float]
+    distance: float                       # mean |predicted - desired| over the desired targets
+    predicted_session: Dict[str, Any]     # base + settings + every other Core prediction
+
+
+@dataclass
+class SensoryOptimizationResult:
+    plans: List[SensoryPlan]
+    desired: Dict[str, float]
+    evaluations: int                      # candidates sampled
+    unique_evaluations: int               # candidates actually scored (memo misses)
+    workers: int
+    elapsed_sec: float
+
+# -------------------------------------------------------------------
+# Search space
+# -------------------------------------------------------------------
+
+@dataclass
+class SearchSpace:
+    names: List[str]
+    low: np.ndarray
+    high: np.ndarray
+    step: np.ndarray
+    center: np.ndarray
+    temp_idx: np.ndarray      # stage temps 1–9 (kept ascending)
+    time_idx: np.ndarray      # stage times 1–9 (kept ascending)
+
+    def repair(self, X: np.ndarray) -> np.ndarray:
+        """Clip to bounds, keep temps/times ascending by stage, snap to the grid."""
+        X = np.clip(X, self.low, self.high)
+        if len(self.temp_idx) > 1:
+            X[:, self.temp_idx] = np.sort(X[:, self.temp_idx], axis=1)
+        if len(self.time_idx) > 1:
+            X[:, self.time_idx] = np.sort(X[:, self.time_idx], axis=1)
+        return np.round(X / self.step) * self.step
+
+
+def _center_times(base: Dict[str, Any]) -> Dict[int, float]:
+    """Stage times for the base plan: given times, linear between the known ones."""
+    known = {0: 0.0}
+    for i in range(1, 10):
+        v = base.get(f"stage_{i}_time_sec")
+        if v is not None:
+            known[i] = float(v)
+    stages = sorted(known)
+    return {i: float(np.interp(i, stages, [known[s] for s in stages])) for i in range(10)}
+
+
+def build_search_space(base: Dict[str, Any], feature_order: List[str]) -> SearchSpace:
+    names, low, high, step, center = [], [], [], [], []
+
+    def add(name, lo, hi, st, c):
+        names.append(name)
+        low.append(lo)
+        high.append(hi)
+        step.append(st)
+        center.append(min(hi, max(lo, c)))
+
+    for i in range(1, 10):
+        key = f"stage_{i}_temp_f"
+        if key in feature_order and base.get(key) is not None:
+            t = float(base[key])
+            add(key, t - TEMP_SPAN_F, t + TEMP_SPAN_F, TEMP_STEP_F, t)
+    for i in range(10):
+        key = f"stage_{i}_burner_pct"
+        if key in feature_order:
+            c = base.get(key)
+            add(key, BURNER_RANGE[0], BURNER_RANGE[1], BURNER_STEP_PCT, 50.0 if c is None else float(c))
+    times = _center_times(base)
+    for i in range(1, 10):
+        key = f"stage_{i}_time_sec"
+        if key in feature_order:
+            add(key, max(TIME_STEP_SEC, times[i] - TIME_SPAN_SEC), times[i] + TIME_SPAN_SEC, TIME_STEP_SEC, times[i])
+
+    return SearchSpace(
+        names=names,
+        low=np.array(low),
+        high=np.array(high),
+        step=np.array(step),
+        center=np.array(center),
+        temp_idx=np.array([j for j, n in enumerate(names) if n.endswith("_temp_f")], dtype=int),
+        time_idx=np.array([j for j, n in enumerate(names) if n.endswith("_time_sec")], dtype=int),
+    )
+
+# -------------------------------------------------------------------
+# Worker side (one search per process)
+# -------------------------------------------------------------------
+
+def _search(
+    bundle: Dict[str, Any],
+    base_row: Dict[str, Any],
+    space: SearchSpace,
+    desired: Dict[str, float],
+    time_budget_sec: float,
+    seed: int,
+    population_size: int,
+    top_k: int,
+) -> Tuple[List[Tuple[float, np.ndarray, Dict[str, float]]], int, int]:
+    """Cross-entropy search for time_budget_sec from now. Returns (top-k, sampled, scored)."""
+    deadline = time.time() + time_budget_sec
+    feature_order = bundle["meta"].get("feature_order", [])
+    targets = list(desired)
+    desired_vec = np.array([desired[t] for t in targets])
+    sensory_models = {"models": {t: bundle["models"][t] for t in targets}}
+
+    base_df = build_core_frame([base_row], feature_order)
+    rng = np.random.default_rng(seed)
+    mu = space.center.astype(float)
+    sigma = (space.high - space.low) / 4.0
+    n_elite = max(2, int(population_size * ELITE_FRACTION))
+
+    memo: Dict[bytes, Tuple[float, np.ndarray]] = {}
+    sampled = 0
+
+    while True:
+        X = space.repair(rng.normal(mu, sigma, size=(population_size, len(mu))))
+        sampled += len(X)
+        keys = [(np.round(x / space.step)).astype(np.int32).tobytes() for x in X]
+
+        # Score only candidates never seen before (deduplicated within the batch too)
+        new_pos: Dict[bytes, int] = {}
+        for j, k in enumerate(keys):
+            if k not in memo and k not in new_pos:
+                new_pos[k] = j
+        if new_pos:
+            rows = np.array(list(new_pos.values()))
+            batch = base_df.loc[base_df.index.repeat(len(rows))].reset_index(drop=True)
+            for col, name in enumerate(space.names):
+                batch[name] = X[rows, col]
+            refresh_anchor_features(batch)
+            preds, failed = predict_core_frame(sensory_models, batch)
+            if failed:
+                raise RuntimeError(f"Core failed to predict {', '.join(failed)}")
+            P = np.column_stack([preds[t] for t in targets])
+            dist = np.abs(P - desired_vec).mean(axis=1)
+            for (k, _), d, p in zip(new_pos.items(), dist, P):
+                memo[k] = (float(d), p)
+
+        loss = np.array([memo[k][0] for k in keys])
+        elite = X[np.argsort(loss)[:n_elite]]
+        mu = SMOOTHING * elite.mean(axis=0) + (1 - SMOOTHING) * mu
+        sigma = SMOOTHING * elite.std(axis=0) + (1 - SMOOTHING) * sigma
+        sigma = np.maximum(sigma, space.step / 2)  # keep exploring the grid
+
+        if time.time() >= deadline:
+            break
+
+    best = sorted(memo.items(), key=lambda kv: kv[1][0])[:top_k]
+    top = [
+        (d, np.frombuffer(k, dtype=np.int32) * space.step, dict(zip(targets, map(float, p))))
+        for k, (d, p) in best
+    ]
+    return top, sampled, len(memo)
+
+
+class _SingleThreaded:
+    """CatBoost model that predicts on one thread (fitted models can't change thread_count)."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict(self, X):
+        return self.model.predict(X, thread_count=1)
+
+
+def _search_in_worker(bundle: Dict[str, Any], *args) -> Tuple[List[Tuple[float, np.ndarray, Dict[str, float]]], int, int]:
+    """_search in a pool process, with one CatBoost thread (every CPU already runs a worker)."""
+    models = {
+        t: _SingleThreaded(m) if type(m).__module__.startswith("catboost") else m
+        for t, m in bundle["models"].items()
+    }
+    return _search({**bundle, "models": models}, *args)
+
+
+# -------------------------------------------------------------------
+# Process pool (kept warm between calls; workers hold no models)
+# -------------------------------------------------------------------
+
+_EXECUTOR: Optional[ProcessPoolExecutor] = None
+_EXECUTOR_WORKERS: Optional[int] = None
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    global _EXECUTOR, _EXECUTOR_WORKERS
+    if _EXECUTOR is None or _EXECUTOR_WORKERS != workers:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(cancel_futures=True)
+        # spawn: safe to start from the GUI (threads) on every platform
+        _EXECUTOR = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+        _EXECUTOR_WORKERS = workers
+    return _EXECUTOR
+
+# -------------------------------------------------------------------
+# Public API
+# -------------------------------------------------------------------
+
+def optimize_sensory(
+    base: Dict[str, Any],
+    desired: Dict[str, float],
+    time_budget_sec: float = DEFAULT_TIME_BUDGET_SEC,
+    top_k: int = DEFAULT_TOP_K,
+    workers: Optional[int] = None,
+    bundle: Optional[Dict[str, Any]] = None,
+    population_size: int = POPULATION_SIZE,
+    seed: int = 0,
+) -> SensoryOptimizationResult:
+    """
+    Search for the top-k plans whose predicted sensory scores are closest to
+    `desired`. workers=None uses every CPU; workers=1 searches in this process.
+    `bundle` (default: load_core_bundle()) is used by every worker.
+    time_budget_sec is each worker's search time; starting workers and
+    scoring the winners come on top.
+    """
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+
+    if bundle is None:
+        bundle = load_core_bundle()
+    if bundle is None:
+        raise RuntimeError("No Core metadata found — have you trained models yet?")
+
+    desired = {k: float(v) for k, v in desired.items() if v is not None}
+    unknown = [k for k in desired if k not in SENSORY_TARGETS]
+    if unknown:
+        raise ValueError(f"Not sensory targets: {', '.join(unknown)}")
+    untrained = [k for k in desired if k not in bundle["models"]]
+    if untrained:
+        trained = [t for t in SENSORY_TARGETS if t in bundle["models"]] or ["none"]
+        raise ValueError(
+            f"No Core model for {', '.join(untrained)} (trained sensory targets: {', '.join(trained)}). "
+            "Log more roasts with cupping scores and rebuild Core."
+        )
+    if not desired:
+        raise ValueError("Give at least one desired sensory score.")
+
+    flat = {key: base.get(key) for key in CORE_FEATURE_ORDER}
+    for t in SENSORY_TARGETS:
+        flat[t] = None  # outcomes, not inputs
+    base_row = preprocess(dict(flat))
+    space = build_search_space(base_row, bundle["meta"].get("feature_order", []))
+
+    args = (base_row, space, desired, time_budget_sec)
+    if workers <= 1:
+        results = [_search(bundle, *args, seed, population_size, top_k)]
+    else:
+        # Workers only need the feature order and the sensory models
+        sensory_bundle = {
+            "meta": {"feature_order": bundle["meta"].get("feature_order", [])},
+            "models": {t: bundle["models"][t] for t in desired},
+        }
+        executor = _get_executor(workers)
+        futures = [
+            executor.submit(_search_in_worker, sensory_bundle, *args, seed + w, population_size, top_k)
+            for w in range(workers)
+        ]
+        results = [f.result() for f in futures]
+
+    # Merge worker top-k lists, dropping duplicates found by several workers
+    merged: Dict[bytes, Tuple[float, np.ndarray, Dict[str, float]]] = {}
+    for top, _, _ in results:
+        for d, x, preds in top:
+            merged.setdefault(np.round(x / space.step).astype(np.int32).tobytes(), (d, x, preds))
+    best = sorted(merged.values(), key=lambda item: item[0])[:top_k]
+
+    # Full Core prediction for the winners (one batch) → predicted curves
+    plan_rows = []
+    for _, x, _ in best:
+        row = dict(base_row)
+        row.update({name: float(v) for name, v in zip(space.names, x)})
+        plan_rows.append(row)
+    plans: List[SensoryPlan] = []
+    if plan_rows:
+        df = build_core_frame(plan_rows, bundle["meta"].get("feature_order", []))
+        full, _ = predict_core_frame(bundle, df)
+        for i, ((d, x, preds), row) in enumerate(zip(best, plan_rows)):
+            fill_core_predictions(row, {col: v[i] for col, v in full.items()}, bundle["confidence"])
+            session = dict(base)
+            session.update(row)
+            plans.append(SensoryPlan(
+                settings={name: float(v) for name, v in zip(space.names, x)},
+                predicted_sensory=preds,
+                distance=d,
+                predicted_session=session,
+            ))
+
+    return SensoryOptimizationResult(
+        plans=plans,
+        desired=desired,
+        evaluations=sum(r[1] for r in results),
+        unique_evaluations=sum(r[2] for r in results),
+        workers=workers,
+        elapsed_sec=time.perf_counter() - start,
+    )
+
+# -------------------------------------------------------------------
+# CLI
+# -------------------------------------------------------------------
+
+def _fmt_mmss(sec: float) -> str:
+    total = int(round(sec))
+    return f"{total // 60:02d}:{total % 60:02d}"
+
+
+def print_sensory_result(result: SensoryOptimizationResult) -> None:
+    desired = ", ".join(f"{k} {v:g}" for k, v in result.desired.items())
+    print(f"\n☕ Target profile: {desired}")
+    print(f"   {result.evaluations} plans sampled, {result.unique_evaluations} scored "
+          f"on {result.workers} worker(s) in {result.elapsed_sec:.1f} s\n")
+    for rank, plan in enumerate(result.plans, start=1):
+        scores = ", ".join(f"{k} {v:.1f}" for k, v in plan.predicted_sensory.items())
+        print(f"#{rank}  distance {plan.distance:.2f}  →  {scores}")
+        for i in range(10):
+            temp = plan.settings.get(f"stage_{i}_temp_f", plan.predicted_session.get(f"stage_{i}_temp_f"))
+            burner = plan.settings.get(f"stage_{i}_burner_pct")
+            t = plan.settings.get(f"stage_{i}_time_sec", plan.predicted_session.get(f"stage_{i}_time_sec"))
+            temp_txt = f"{temp:.0f}°F" if temp is not None else "n/a"
+            burner_txt = f"{burner:.0f}%" if burner is not None else "n/a"
+            time_txt = _fmt_mmss(t) if t is not None else "n/a"
+            print(f"    Stage {i}: {temp_txt:>6}  burner {burner_txt:>4}  at {time_txt}")
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search roast plans for a target sensory profile")
+    for target in SENSORY_TARGETS:
+        parser.add_argument(f"--{target.replace('_', '-')}", type=float, dest=target)
+    parser.add_argument("--room-temp", type=float, default=DEFAULT_ENVIRONMENT["room_temp_f"])
+    parser.add_argument("--humidity", type=float, default=DEFAULT_ENVIRONMENT["humidity_pct"])
+    parser.add_argument("--bean-temp", type=float, default=DEFAULT_ENVIRONMENT["room_bean_temp_f"])
+    parser.add_argument("--moisture", type=float, default=DEFAULT_ENVIRONMENT["green_bean_moisture_pct"])
+    parser.add_argument("--batch-weight", type=float, default=DEFAULT_ENVIRONMENT["batch_weight_lbs"])
+    parser.add_argument("--budget", type=float, default=DEFAULT_TIME_BUDGET_SEC, help="seconds")
+    parser.add_argument("--workers", type=int, default=None, help="default: all CPUs")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K)
+    args = parser.parse_args()
+
+    desired = {t: getattr(args, t) for t in SENSORY_TARGETS if getattr(args, t) is not None}
+    base = default_session(
+        room_temp_f=args.room_temp,
+        humidity_pct=args.humidity,
+        room_bean_temp_f=args.bean_temp,
+        green_bean_moisture_pct=args.moisture,
+        batch_weight_lbs=args.batch_weight,
+    )
+
+    try:
+        result = optimize_sensory(base, desired, args.budget, args.top_k, args.workers)
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+    print_sensory_result(result)
+
+
+if __name__ == "__main__":
+    main()
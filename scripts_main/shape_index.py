@@ -0,0 +1,324 @@
+# scripts_main/shape_index.py
+"""
+Past roasts whose curve has a similar shape.
+
+Each roast's stage 0–9 curve (smooth, see scripts_utility.curve_model) is
+resampled at SHAPE_POINTS evenly spaced fractions of its length, plus its
+length itself, giving one fixed-length vector per roast. PCA (SVD) keeps
+the few directions that explain almost all the variation, a KD-tree over
+those coordinates finds candidates, and candidates are re-ranked by the
+full vector distance (RMS °F).
+
+The index is saved to models/shape_index.npz with the roast log version it
+was built from. Roasts saved since then are kept in a small pending block
+that is searched by brute force (like scripts_main.similar_roasts); the
+KD-tree is rebuilt on the saved PCA basis only once that block grows past
+REBUILD_FRACTION of the index. A log that was edited, not just appended
+to, is rebuilt from scratch. Report sections search without saving.
+
+Usage (from the project root):
+    python -m scripts_main.shape_index [--rebuild] [--roast ROW] [-k 5]
+"""
+
+import argparse
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts_utility.curve_model import CurveModel
+from scripts_utility.derived_store import row_hashes
+from scripts_utility.paths import DATA_FILE, MODELS_DIR
+from scripts_utility.roast_log import RoastLogVersion, load_roast_log
+from scripts_main.similar_roasts import (
+    DEFAULT_K,
+    MATCH_COLUMNS,
+    MIN_PENDING,
+    REBUILD_FRACTION,
+    print_match_table,
+)
+
+SHAPE_INDEX_PATH = MODELS_DIR / "shape_index.npz"
+
+SHAPE_POINTS = 24
+STAGE_TIME_COLS = [f"stage_{i}_time_sec" for i in range(10)]
+STAGE_TEMP_COLS = [f"stage_{i}_temp_f" for i in range(10)]
+
+# A roast one minute longer counts like being this many °F off at one sample point
+LENGTH_WEIGHT_F_PER_MIN = 10.0
+
+# Keep PCA components up to this share of variance (and at most MAX_COMPONENTS)
+EXPLAINED_VARIANCE = 0.995
+MAX_COMPONENTS = 10
+
+# KD-tree candidates per requested match, re-ranked on the full vectors
+RERANK_FACTOR = 4
+
+
+def shape_vectors(times: np.ndarray, temps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (vectors, ok) from (n, 10) stage times (sec) and temps. Vectors are
+    (n, SHAPE_POINTS + 1); ok marks rows with a usable curve.
+    """
+    curves = CurveModel.fit(times, temps)
+    grid = np.linspace(0.0, 1.0, SHAPE_POINTS)
+    start, end = curves.start[:, None], curves.end[:, None]
+    sampled = curves.temp_at_time(start + (end - start) * grid)
+    length = (curves.end - curves.start) / 60.0 * LENGTH_WEIGHT_F_PER_MIN
+    vectors = np.column_stack([sampled, length])
+    ok = (curves.counts >= 2) & np.isfinite(vectors).all(axis=1)
+    return vectors, ok
+
+
+def stage_arrays(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """(n, 10) stage times (sec) and temps as floats; blanks become NaN."""
+    times = df.reindex(columns=STAGE_TIME_COLS).apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    temps = df.reindex(columns=STAGE_TEMP_COLS).apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    return times, temps
+
+
+def _row_keys(df: pd.DataFrame) -> np.ndarray:
+    """Per-row hash of the stage columns, to spot rows edited since indexing."""
+    return row_hashes(df, STAGE_TIME_COLS + STAGE_TEMP_COLS).to_numpy(dtype=str)
+
+
+class ShapeIndex:
+    """PCA coordinates + KD-tree over the indexed shape vectors, plus a pending block of newer roasts."""
+
+    def __init__(
+        self,
+        version: Optional[RoastLogVersion],
+        keys: np.ndarray,
+        rows: np.ndarray,
+        vectors: np.ndarray,
+        mean: np.ndarray,
+        components: np.ndarray,
+    ):
+        self.version = version
+        self.keys = keys              # (n_log_rows,) stage-column hashes
+        self.rows = rows              # (m,) roast log positions of indexed roasts
+        self.vectors = vectors        # (m, SHAPE_POINTS + 1) float32
+        self.mean = mean
+        self.components = components  # (c, SHAPE_POINTS + 1)
+        self._build_tree()
+
+    def _build_tree(self) -> None:
+        """KD-tree over every vector so far; the pending block is then empty."""
+        from sklearn.neighbors import KDTree
+
+        self.n_tree = len(self.vectors)
+        self.coords = self.project(self.vectors)
+        self.tree = KDTree(self.coords) if len(self.coords) else None
+
+    @property
+    def n_pending(self) -> int:
+        return len(self.vectors) - self.n_tree
+
+    def needs_rebuild(self) -> bool:
+        return self.n_pending > max(MIN_PENDING, REBUILD_FRACTION * self.n_tree)
+
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        return (vectors - self.mean) @ self.components.T
+
+    @classmethod
+    def build(cls, roast_df: pd.DataFrame, version: Optional[RoastLogVersion] = None) -> "ShapeIndex":
+        vectors, ok = shape_vectors(*stage_arrays(roast_df))
+        rows = np.flatnonzero(ok)
+        vectors = vectors[ok]
+        n_features = SHAPE_POINTS + 1
+
+        if len(vectors) >= 2:
+            mean = vectors.mean(axis=0)
+            _, s, vt = np.linalg.svd(vectors - mean, full_matrices=False)
+            share = np.cumsum(s ** 2) / max(float((s ** 2).sum()), 1e-12)
+            n_comp = int(min(MAX_COMPONENTS, np.searchsorted(share, EXPLAINED_VARIANCE) + 1, len(vt)))
+            components = vt[:n_comp]
+        else:
+            mean = vectors.mean(axis=0) if len(vectors) else np.zeros(n_features)
+            components = np.eye(n_features)[:MAX_COMPONENTS]
+        return cls(version, _row_keys(roast_df), rows, vectors.astype(np.float32), mean, components)
+
+    def extend(self, new_rows: pd.DataFrame, version: Optional[RoastLogVersion]) -> None:
+        """
+        Add roasts appended to the log to the pending block; the KD-tree (on
+        the existing PCA basis) is rebuilt only once needs_rebuild().
+        """
+        vectors, ok = shape_vectors(*stage_arrays(new_rows))
+        self.rows = np.concatenate([self.rows, len(self.keys) + np.flatnonzero(ok)])
+        self.vectors = np.vstack([self.vectors, vectors[ok].astype(np.float32)])
+        self.keys = np.concatenate([self.keys, _row_keys(new_rows)])
+        self.version = version
+        if self.needs_rebuild():
+            self._build_tree()
+
+    def query_vector(self, vector: np.ndarray, k: int = DEFAULT_K) -> Tuple[np.ndarray, np.ndarray]:
+        """(roast log positions, RMS °F distances) of the k closest shapes, nearest first."""
+        cand = np.empty(0, dtype=np.intp)
+        if self.tree is not None:
+            n_cand = min(self.n_tree, max(k, k * RERANK_FACTOR))
+            cand = self.tree.query(self.project(vector[None, :]), k=n_cand)[1][0]
+        # Pending roasts are all candidates
+        cand = np.concatenate([cand, np.arange(self.n_tree, len(self.vectors))])
+        dist = np.sqrt(((self.vectors[cand] - vector) ** 2).mean(axis=1))
+        order = np.argsort(dist, kind="stable")[:k]
+        return self.rows[cand[order]], dist[order]
+
+    def query(self, session: Dict[str, Any], k: int = DEFAULT_K) -> Tuple[np.ndarray, np.ndarray]:
+        """Closest shapes to a (predicted) session's stage curve; empty if it has no curve."""
+        times = np.array([[_to_float(session.get(c)) for c in STAGE_TIME_COLS]])
+        temps = np.array([[_to_float(session.get(c)) for c in STAGE_TEMP_COLS]])
+        vectors, ok = shape_vectors(times, temps)
+        if not ok[0]:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        return self.query_vector(vectors[0], k)
+
+    # --------------------------
+    # Persistence
+    # --------------------------
+    def save(self, path=SHAPE_INDEX_PATH) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp.npz"
+        np.savez(
+            tmp,
+            version=np.array(self.version if self.version is not None else (-1, -1), dtype=np.int64),
+            keys=self.keys, rows=self.rows, vectors=self.vectors,
+            mean=self.mean, components=self.components,
+            shape_points=np.array(SHAPE_POINTS),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=SHAPE_INDEX_PATH) -> Optional["ShapeIndex"]:
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                if int(data["shape_points"]) != SHAPE_POINTS:
+                    return None
+                version = tuple(int(v) for v in data["version"])
+                return cls(
+                    None if version == (-1, -1) else version,
+                    data["keys"], data["rows"], data["vectors"], data["mean"], data["components"],
+                )
+        except (OSError, KeyError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable {path}: {e}")
+            return None
+
+
+def _to_float(v: Any) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+# -------------------------------------------------------------------
+# Cached / persisted per roast log version
+# -------------------------------------------------------------------
+
+_INDEX: Optional[ShapeIndex] = None
+# The GUI searches from a pool thread
+_INDEX_LOCK = threading.Lock()
+
+
+def get_shape_index(
+    roast_df: pd.DataFrame,
+    version: Optional[RoastLogVersion],
+    path=SHAPE_INDEX_PATH,
+    rebuild: bool = False,
+    save: bool = True,
+) -> ShapeIndex:
+    """
+    ShapeIndex for this roast log version: from memory, then from `path`,
+    extended with appended roasts, or rebuilt if the log changed. With
+    save, a changed index is written back to `path`.
+    """
+    global _INDEX
+    if version is None:
+        return ShapeIndex.build(roast_df)
+
+    with _INDEX_LOCK:
+        index = None if rebuild else (_INDEX if _INDEX is not None else ShapeIndex.load(path))
+        if index is not None and index.version == version and len(index.keys) == len(roast_df):
+            _INDEX = index
+            return index
+
+        n = len(index.keys) if index is not None else 0
+        if index is not None and len(roast_df) >= n and np.array_equal(_row_keys(roast_df.iloc[:n]), index.keys):
+            index.extend(roast_df.iloc[n:], version)
+        else:
+            index = ShapeIndex.build(roast_df, version)
+        if save:
+            index.save(path)
+        _INDEX = index
+        return index
+
+
+def find_similar_shapes(
+    session: Dict[str, Any],
+    k: int = DEFAULT_K,
+    roast_df: Optional[pd.DataFrame] = None,
+    version: Optional[RoastLogVersion] = None,
+    save: bool = True,
+) -> pd.DataFrame:
+    """
+    The k past roasts whose curve is closest in shape to `session`'s:
+    MATCH_COLUMNS plus similarity_distance (RMS °F), indexed by roast_df
+    row label. Reads the roast log when roast_df is not given; save=False
+    leaves models/shape_index.npz untouched.
+    """
+    if roast_df is None:
+        roast_df, version = load_roast_log()
+    if roast_df is None or len(roast_df) == 0:
+        return pd.DataFrame(columns=MATCH_COLUMNS + ["similarity_distance"])
+
+    rows, dist = get_shape_index(roast_df, version, save=save).query(session, k)
+    matches = roast_df.iloc[rows].reindex(columns=MATCH_COLUMNS)
+    matches["similarity_distance"] = dist
+    return matches
+
+
+def print_similar_shapes(session: Dict[str, Any], k: int = DEFAULT_K) -> None:
+    """CLI report section listing past roasts with the most similar curve."""
+    matches = find_similar_shapes(session, k, save=False)
+    print_match_table("Past Roasts With the Most Similar Curve (distance in RMS °F)", matches)
+
+# -------------------------------------------------------------------
+# CLI
+# -------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Find past roasts whose curve has a similar shape.")
+    parser.add_argument("--rebuild", action="store_true", help=f"rebuild {SHAPE_INDEX_PATH.name} from scratch")
+    parser.add_argument("--roast", type=int, default=None,
+                        help="roast log row (0 = first) to match; defaults to the most recent roast")
+    parser.add_argument("-k", type=int, default=DEFAULT_K, help="number of roasts to show")
+    args = parser.parse_args()
+
+    roast_df, version = load_roast_log()
+    if roast_df is None or roast_df.empty:
+        print(f"❌ No roast log at {DATA_FILE}")
+        return
+
+    start = time.perf_counter()
+    index = get_shape_index(roast_df, version, rebuild=args.rebuild)
+    print(f"📐 Shape index: {len(index.rows)} of {len(roast_df)} roasts, "
+          f"{index.components.shape[0]} components ({time.perf_counter() - start:.2f}s)")
+
+    row = len(roast_df) - 1 if args.roast is None else args.roast
+    if not 0 <= row < len(roast_df):
+        print(f"❌ Row {row} is out of range")
+        return
+    start = time.perf_counter()
+    matches = find_similar_shapes(roast_df.iloc[row].to_dict(), args.k + 1, roast_df, version)
+    matches = matches[matches.index != roast_df.index[row]].head(args.k)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"Roast {row} ({str(roast_df.iloc[row].get('roast_date', ''))[:10]}) — query {elapsed_ms:.1f} ms")
+    print_match_table("Most Similar Curves (distance in RMS °F)", matches)
+    print()
+
+
+if __name__ == "__main__":
+    main()
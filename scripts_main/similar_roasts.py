@@ -0,0 +1,268 @@
+# scripts_main/similar_roasts.py
+"""
+Past roasts most similar to a planned one.
+
+Roasts are compared on room and bean conditions (SIMILARITY_NUMERIC,
+standardized) plus process method (one-hot), using a KD-tree. Roasts
+saved after the tree was built are appended to a small pending block
+that is searched by brute force, and the tree is rebuilt only once that
+block grows past REBUILD_FRACTION of the log — so saving a roast never
+forces a full rebuild on the next report.
+
+Usage (from the project root):
+    python -m scripts_main.similar_roasts --room-temp 68 --humidity 45 --batch 200 [--process washed]
+"""
+
+import argparse
+import os
+import warnings
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from scripts_utility.derived_store import row_hashes
+from scripts_utility.paths import DATA_FILE
+from scripts_utility.roast_log import RoastLogVersion, load_roast_log
+
+SIMILARITY_NUMERIC = [
+    "room_temp_f",
+    "humidity_pct",
+    "room_bean_temp_f",
+    "green_bean_moisture_pct",
+    "batch_weight_lbs",
+    "altitude_meters",
+]
+SIMILARITY_CATEGORY = "process_method"
+
+# Core's form calls the starting bean temp by another name
+SESSION_ALIASES = {"room_bean_temp_f": "bean_temp_start_f"}
+
+# A process mismatch adds sqrt(2) * PROCESS_WEIGHT standard deviations of distance
+PROCESS_WEIGHT = 1.0
+
+DEFAULT_K = 5
+
+# Rebuild the tree once this share of the log (and at least MIN_PENDING rows) is pending
+REBUILD_FRACTION = 0.1
+MIN_PENDING = 64
+
+# Shown in reports, in this order
+MATCH_COLUMNS = [
+    "roast_date", "country", "process_method", "batch_weight_lbs",
+    "room_temp_f", "humidity_pct", "green_bean_moisture_pct",
+    "end_temp_f", "stage_9_time_sec", "overall_rating",
+]
+
+
+def _normalize_process(values) -> np.ndarray:
+    vals = pd.Series(values, dtype=object).astype(str).str.strip().str.lower()
+    return vals.where(~vals.isin(["", "nan", "none"]), "").to_numpy()
+
+
+class SimilarRoastIndex:
+    """KD-tree over the roast log's standardized conditions plus a pending block of newer roasts."""
+
+    def __init__(self, roast_df: pd.DataFrame):
+        from sklearn.neighbors import KDTree
+
+        numeric = self._numeric(roast_df)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+            mean = np.nanmean(numeric, axis=0) if len(numeric) else np.zeros(numeric.shape[1])
+            std = np.nanstd(numeric, axis=0) if len(numeric) else np.ones(numeric.shape[1])
+        self.mean = np.nan_to_num(mean)
+        self.scale = np.where(np.isfinite(std) & (std > 0), std, 1.0)
+
+        process = _normalize_process(self._column(roast_df, SIMILARITY_CATEGORY))
+        self.processes = sorted(set(process) - {""})
+
+        self.keys = self._keys(roast_df)
+        self.n_tree = len(roast_df)
+        self.tree = KDTree(self._encode(numeric, process)) if self.n_tree else None
+        self.pending = np.empty((0, len(SIMILARITY_NUMERIC) + len(self.processes)))
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.keys)
+
+    @staticmethod
+    def _column(df: pd.DataFrame, col: str) -> pd.Series:
+        return df[col] if col in df.columns else pd.Series(np.nan, index=df.index)
+
+    @staticmethod
+    def _keys(df: pd.DataFrame) -> np.ndarray:
+        """Per-row hash of the compared columns, to spot rows edited since indexing."""
+        return row_hashes(df, SIMILARITY_NUMERIC + [SIMILARITY_CATEGORY]).to_numpy()
+
+    @staticmethod
+    def _numeric(df: pd.DataFrame) -> np.ndarray:
+        return df.reindex(columns=SIMILARITY_NUMERIC).apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+
+    def _encode(self, numeric: np.ndarray, process: np.ndarray) -> np.ndarray:
+        """Standardized numeric features (missing → log mean) followed by weighted one-hot process."""
+        z = np.nan_to_num((numeric - self.mean) / self.scale)
+        codes = pd.Categorical(process, categories=self.processes).codes
+        onehot = np.zeros((len(process), len(self.processes)))
+        known = codes >= 0
+        onehot[np.flatnonzero(known), codes[known]] = 1.0
+        return np.hstack([z, PROCESS_WEIGHT * onehot])
+
+    def extend(self, new_rows: pd.DataFrame) -> None:
+        """Add roasts appended to the log since the tree was built."""
+        process = _normalize_process(self._column(new_rows, SIMILARITY_CATEGORY))
+        self.pending = np.vstack([self.pending, self._encode(self._numeric(new_rows), process)])
+        self.keys = np.concatenate([self.keys, self._keys(new_rows)])
+
+    def needs_rebuild(self) -> bool:
+        return len(self.pending) > max(MIN_PENDING, REBUILD_FRACTION * self.n_tree)
+
+    def encode_session(self, session: Dict[str, Any]) -> np.ndarray:
+        values = {}
+        for col in SIMILARITY_NUMERIC:
+            v = session.get(col)
+            if v is None and col in SESSION_ALIASES:
+                v = session.get(SESSION_ALIASES[col])
+            values[col] = [v]
+        row = pd.DataFrame(values)
+        process = _normalize_process([session.get(SIMILARITY_CATEGORY)])
+        return self._encode(self._numeric(row), process)
+
+    def query(self, session: Dict[str, Any], k: int = DEFAULT_K) -> Tuple[np.ndarray, np.ndarray]:
+        """(row positions in the roast log, distances) of the k most similar roasts, nearest first."""
+        x = self.encode_session(session)
+        rows = np.empty(0, dtype=np.intp)
+        dist = np.empty(0)
+        if self.tree is not None and self.n_tree:
+            d, i = self.tree.query(x, k=min(k, self.n_tree))
+            rows, dist = i[0], d[0]
+        if len(self.pending):
+            pd_dist = np.sqrt(((self.pending - x) ** 2).sum(axis=1))
+            rows = np.concatenate([rows, self.n_tree + np.arange(len(self.pending))])
+            dist = np.concatenate([dist, pd_dist])
+        order = np.argsort(dist, kind="stable")[:k]
+        return rows[order], dist[order]
+
+# -------------------------------------------------------------------
+# Cached per roast log version
+# -------------------------------------------------------------------
+
+_INDEX: Optional[Tuple[Optional[RoastLogVersion], SimilarRoastIndex]] = None
+
+
+def get_similar_index(roast_df: pd.DataFrame, version: Optional[RoastLogVersion]) -> SimilarRoastIndex:
+    """
+    SimilarRoastIndex for this roast log version. When the log only grew
+    (a roast was saved) and earlier rows' compared columns are unchanged,
+    the new rows are appended to the cached index instead of rebuilding.
+    """
+    global _INDEX
+    if version is None:
+        return SimilarRoastIndex(roast_df)
+    if _INDEX is not None:
+        cached_version, index = _INDEX
+        if cached_version == version:
+            return index
+        n = index.n_rows
+        appended = (
+            len(roast_df) >= n
+            and np.array_equal(SimilarRoastIndex._keys(roast_df.iloc[:n]), index.keys)
+        )
+        if appended:
+            if len(roast_df) > n:
+                index.extend(roast_df.iloc[n:])
+            if not index.needs_rebuild():
+                _INDEX = (version, index)
+                return index
+
+    index = SimilarRoastIndex(roast_df)
+    _INDEX = (version, index)
+    return index
+
+
+def find_similar_roasts(
+    session: Dict[str, Any],
+    k: int = DEFAULT_K,
+    roast_df: Optional[pd.DataFrame] = None,
+    version: Optional[RoastLogVersion] = None,
+) -> pd.DataFrame:
+    """
+    The k past roasts closest to `session`'s conditions: MATCH_COLUMNS plus
+    similarity_distance, indexed by roast_df row label. Reads the roast log
+    when roast_df is not given.
+    """
+    if roast_df is None:
+        roast_df, version = load_roast_log()
+    if roast_df is None or len(roast_df) == 0:
+        return pd.DataFrame(columns=MATCH_COLUMNS + ["similarity_distance"])
+
+    rows, dist = get_similar_index(roast_df, version).query(session, k)
+    matches = roast_df.iloc[rows].reindex(columns=MATCH_COLUMNS)
+    matches["similarity_distance"] = dist
+    return matches
+
+
+def describe_match(row: pd.Series) -> List[str]:
+    """Report cells for one match: date, bean, batch, room, drop."""
+    def num(key: str, fmt: str, suffix: str = "") -> str:
+        v = pd.to_numeric(row.get(key), errors="coerce")
+        return "n/a" if pd.isna(v) else f"{v:{fmt}}{suffix}"
+
+    drop = pd.to_numeric(row.get("stage_9_time_sec"), errors="coerce")
+    drop_txt = "n/a" if pd.isna(drop) else f"{int(drop) // 60:02d}:{int(drop) % 60:02d}"
+    bean = " / ".join(str(row.get(c)) for c in ("country", "process_method") if pd.notna(row.get(c)))
+    return [
+        str(row.get("roast_date", ""))[:10],
+        bean or "n/a",
+        num("batch_weight_lbs", "g", " lb"),
+        f"{num('room_temp_f', '.0f', '°F')}, {num('humidity_pct', '.0f', '%')}",
+        f"{num('end_temp_f', '.0f', '°F')} @ {drop_txt}",
+        num("overall_rating", ".3g"),
+        f"{row['similarity_distance']:.2f}",
+    ]
+
+
+MATCH_HEADERS = ["Date", "Bean", "Batch", "Room", "Drop", "Rating", "Distance"]
+
+
+def print_match_table(title: str, matches: pd.DataFrame) -> None:
+    """Print matches (with a similarity_distance column) as an aligned table."""
+    if matches.empty:
+        return
+    print(f"\n{title}:")
+    table = [MATCH_HEADERS] + [describe_match(row) for _, row in matches.iterrows()]
+    widths = [max(len(r[c]) for r in table) for c in range(len(MATCH_HEADERS))]
+    for r in table:
+        print("  " + "  ".join(cell.ljust(w) for cell, w in zip(r, widths)))
+
+
+def print_similar_roasts(session: Dict[str, Any], k: int = DEFAULT_K) -> None:
+    """CLI report section listing the most similar past roasts."""
+    print_match_table("Most Similar Past Roasts", find_similar_roasts(session, k))
+
+# -------------------------------------------------------------------
+# CLI
+# -------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Find past roasts with similar room, bean and batch conditions.")
+    parser.add_argument("--room-temp", type=float, dest="room_temp_f")
+    parser.add_argument("--humidity", type=float, dest="humidity_pct")
+    parser.add_argument("--bean-temp", type=float, dest="room_bean_temp_f")
+    parser.add_argument("--moisture", type=float, dest="green_bean_moisture_pct")
+    parser.add_argument("--batch", type=float, dest="batch_weight_lbs")
+    parser.add_argument("--altitude", type=float, dest="altitude_meters")
+    parser.add_argument("--process", dest="process_method")
+    parser.add_argument("-k", type=int, default=DEFAULT_K, help="number of roasts to show")
+    args = parser.parse_args()
+
+    session = {k: v for k, v in vars(args).items() if k != "k" and v is not None}
+    if not os.path.exists(DATA_FILE):
+        print(f"❌ No roast log at {DATA_FILE}")
+        return
+    print_similar_roasts(session, args.k)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,9 @@ It uses more features than Scout, so it'll take more data to train effectively.
 """
 
 import json
+import os
 import numpy as np
 import pandas as pd
-from catboost import CatBoostRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error
 
 # Centralized paths
 from scripts_utility.paths import DATA_FILE, CORE_MODEL_PATH
@@ -21,10 +19,29 @@ from typing import get_origin, Optional
 from scripts_utility.schema import RoastSession
 
 # Dynamic thresholds
-from scripts_main.train_core_config import get_thresholds
+from scripts_main.train_core_config import (
+    get_thresholds,
+    load_hparams,
+    CV_FOLDS,
+    HPARAMS_PATH,
+    USE_PHASE_FEATURES,
+    USE_PROFILE_FEATURE,
+)
+from scripts_main.light_models import CATBOOST_MIN_ROWS, make_model
+from scripts_main.model_evaluation import (
+    cross_validate_kinds,
+    fold_iterations,
+    primary_scheme,
+    print_cv_table,
+    select_model_kinds,
+)
+from scripts_main.roast_phases import ANCHOR_FEATURE_COLUMNS, compute_phases, roast_phases
+from scripts_main.roast_profiles import PROFILE_COLUMN, fit_profiles, profile_labels, roast_profiles
+from scripts_main.training_profile import finish_trace, predict_sample, print_profile, profile_step
+from scripts_utility.tracing import current_tracer, span, tracing
 
 DATE_COLS = ["purchase_date", "roast_date"]
-CATEGORICAL_COLS = ["supplier", "country", "region", "variety", "process_method"]  # agtron removed
+CATEGORICAL_COLS = ["supplier", "country", "region", "variety", "process_method", PROFILE_COLUMN]  # agtron removed
 
 # --- Load CSV data ---
 def load_roast_data():
@@ -63,13 +80,36 @@ def preprocess(df: pd.DataFrame) -> pd.DataFrame:
 
 
 # --- ML builder ---
-def train_core(df):
-    
-    # Ensure model directory exists (fresh machine safety)
-    CORE_MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
+# Defaults; per-target values from models/hparams.json (hparam_search) win
+CORE_PARAMS = dict(iterations=500, depth=8, learning_rate=0.05)
+
+
+def core_datasets(df, dates=None, profile=None, cached=True):
+    """
+    ({target: (X, y, dates)}, valid_features, (feature_thresh, target_thresh))
+    for every Core target with enough coverage and variance.
+    `dates` (raw roast_date, same index as df) orders the rolling-origin folds.
+    Per-target preparation time goes into `profile` when given.
+    With cached=False, phase and profile features are computed from df
+    alone, without touching the derived store or the saved profile model
+    (backtest windows: no shared files, no roasts from the future).
+    """
+    feature_candidates = list(CORE_FEATURE_ORDER)
+    if USE_PHASE_FEATURES:
+        # Cached per roast id; only new/edited roasts are recomputed
+        with span("preprocess", step="roast_phases"):
+            phases = (roast_phases(df) if cached else compute_phases(df))[ANCHOR_FEATURE_COLUMNS]
+        df = df.drop(columns=ANCHOR_FEATURE_COLUMNS, errors="ignore").join(phases)
+        feature_candidates += ANCHOR_FEATURE_COLUMNS
+    if USE_PROFILE_FEATURE:
+        # Cluster labels from the roast log ("P3"); new roasts join the nearest profile
+        with span("preprocess", step="roast_profiles"):
+            labels = profile_labels((roast_profiles(df) if cached else fit_profiles(df))[PROFILE_COLUMN])
+        df = df.assign(**{PROFILE_COLUMN: labels})
+        feature_candidates.append(PROFILE_COLUMN)
 
     # Ensure all expected features exist
-    for col in CORE_FEATURE_ORDER:
+    for col in feature_candidates:
         if col not in df.columns:
             df[col] = np.nan
 
@@ -80,7 +120,7 @@ def train_core(df):
 
     # Apply feature coverage threshold
     valid_features, dropped_features = [], []
-    for col in CORE_FEATURE_ORDER:
+    for col in feature_candidates:
         coverage = df[col].notna().mean()
         if coverage >= feature_thresh:
             valid_features.append(col)
@@ -90,87 +130,164 @@ def train_core(df):
     if dropped_features:
         print(f"⚠️ Dropped {len(dropped_features)} low‑coverage features: {', '.join(dropped_features)}")
 
-    models, metrics, trained_targets = {}, {}, []
-
+    datasets = {}
     for col in CORE_PREDICTABLES:
         coverage = df[col].notna().mean()
         if coverage < target_thresh:
             print(f"⚠️ Skipping {col}: insufficient coverage ({coverage:.0%})")
             continue
 
-        df_target = df[[col] + valid_features].dropna(subset=[col])
-        y = df_target[col]
-        if isinstance(y, pd.DataFrame):
-            y = y.iloc[:, 0]
-        X = df_target[valid_features]
-
-        if y.nunique() <= 1:
-            print(f"⚠️ Skipping {col}: target has no variance")
-            continue
-
-        # Reindex to ensure alignment
-        X = X.reset_index(drop=True)
-        y = y.reset_index(drop=True)
-
-        # Train/test split
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
-        )
-
-        # Deduplicate columns
-        X_train = X_train.loc[:, ~X_train.columns.duplicated()]
-        X_test = X_test.loc[:, ~X_test.columns.duplicated()]
-
-        # Drop NaNs in y_train
-        non_nan_mask = ~y_train.isna()
-        if non_nan_mask.sum() < len(y_train):
-            print(f"⚠️ Dropped {len(y_train) - non_nan_mask.sum()} NaN rows from y_train for {col}")
-        X_train = X_train.loc[non_nan_mask]
-        y_train = y_train.loc[non_nan_mask]
-
-        if y_train.nunique() <= 1:
-            print(f"⚠️ Skipping {col}: target has no variance (train split)")
-            continue
+        with profile_step(profile, col, "prepare"):
+            df_target = df[[col] + valid_features].dropna(subset=[col])
+            y = df_target[col]
+            if isinstance(y, pd.DataFrame):
+                y = y.iloc[:, 0]
+            X = df_target[valid_features]
+
+            if y.nunique() <= 1:
+                print(f"⚠️ Skipping {col}: target has no variance")
+                continue
+
+            # Deduplicate columns, reindex to ensure alignment
+            X = X.loc[:, ~X.columns.duplicated()].reset_index(drop=True)
+            target_dates = dates.reindex(df_target.index).reset_index(drop=True) if dates is not None else None
+            datasets[col] = (X, y.reset_index(drop=True), target_dates)
+
+    return datasets, valid_features, (feature_thresh, target_thresh)
+
+
+def core_params(valid_features, thread_count=-1):
+    """CatBoostRegressor arguments shared by every Core target."""
+    # CatBoost expects categorical indices, not names
+    cat_features = [i for i, c in enumerate(dict.fromkeys(valid_features)) if c in CATEGORICAL_COLS]
+    return dict(CORE_PARAMS, cat_features=cat_features, thread_count=thread_count, verbose=0)
+
+
+def fit_core(df, dates=None, cv_folds=CV_FOLDS, thread_count=-1, cached=True, workers=None, use_hparams=True):
+    """
+    Fit every Core target in memory. Returns ({target: model}, meta) where
+    meta is the metadata train_core saves, minus model paths. Each target
+    gets the kind (ridge, kNN or CatBoost) with the lowest CV error;
+    meta["model_kinds"] records it, meta["profile"] the per-target
+    rows, features, timings and memory (see training_profile).
+    `dates` (raw roast_date, same index as df) orders the rolling-origin folds;
+    `cached` as in core_datasets; `workers` caps the fold
+    pool (1 = in this process). use_hparams=False ignores models/hparams.json
+    (it was searched on the whole log).
+    """
+    profile = {}
+    datasets, valid_features, (feature_thresh, target_thresh) = core_datasets(df, dates, profile, cached)
+    params = core_params(valid_features, thread_count)
+
+    # CatBoost is only tried on targets with enough rows (see light_models)
+    large = {col: d for col, d in datasets.items() if len(d[1]) >= CATBOOST_MIN_ROWS}
+    tuned = {col: hp for col, hp in load_hparams("core").items() if col in large} if use_hparams else {}
+    if tuned:
+        print(f"🎛 Using searched hyperparameters for {len(tuned)} targets ({HPARAMS_PATH.name})")
+
+    # K-fold + rolling-origin error per target and model kind, all untuned
+    # (CatBoost folds for all targets in one process pool, rolling origin
+    # only, each early-stopped on its own training rows)
+    cv_by_kind = {}
+    if cv_folds >= 2 and datasets:
+        print(f"📏 Cross-validating {len(datasets)} targets ({cv_folds} folds per scheme, "
+              f"{len(large)} with CatBoost)...")
+        try:
+            with span("cross_validate"):
+                cv_by_kind = cross_validate_kinds(datasets, params, cv_folds, workers)
+        except Exception as e:
+            print(f"⚠️ Cross-validation failed: {str(e).splitlines()[-1]}")
+    kinds = select_model_kinds(datasets, cv_by_kind)
+
+    # Untuned CatBoost targets take their tree count from where the CV folds
+    # stopped; searched ones keep the searched count
+    best_iterations = {}
+    for col in large:
+        if col not in tuned:
+            n = fold_iterations(cv_by_kind.get("catboost", {}).get(col), params["iterations"])
+            if n is not None:
+                best_iterations[col] = n
+    target_params = {
+        col: {**tuned.get(col, {}), **({"iterations": best_iterations[col]} if col in best_iterations else {})}
+        for col in large
+    }
 
+    fitted, metrics, metrics_cv = {}, {}, {}
+    for col, (X, y, _) in datasets.items():
         try:
-            # CatBoost expects categorical indices, not names
-            cat_features = [i for i, c in enumerate(X_train.columns) if c in CATEGORICAL_COLS]
-
-            model = CatBoostRegressor(
-                iterations=500,
-                depth=8,
-                learning_rate=0.05,
-                cat_features=cat_features,
-                verbose=0
-            )
-
-            model.fit(X_train, y_train)
-            preds = model.predict(X_test)
-            mae = mean_absolute_error(y_test, preds)
-            metrics[col] = mae
-            print(f"✅ {col}: MAE={mae:.3f}")
-
-            model_path = CORE_MODEL_PATH.with_name(f"{col}_catboost.cbm")
-            model.save_model(model_path)
-            models[col] = str(model_path)
-            trained_targets.append(col)
+            # Final model on every row (fold-stopped tree count for CatBoost);
+            # its error comes from the folds above
+            kind = kinds[col]
+            col_params = {**params, **target_params.get(col, {}), "kind": kind}
+            detail = f"{col_params['iterations']} trees" if kind == "catboost" else kind
+            model = make_model(col_params, len(y))
+            with profile_step(profile, col, "fit"):
+                model.fit(X, y)
+            with profile_step(profile, col, "predict"):
+                model.predict(predict_sample(X))
+            # File size is filled in by train_core once the model is saved
+            profile[col].update(kind=kind, rows=len(y), features=X.shape[1], model_bytes=None)
+
+            summary = primary_scheme(cv_by_kind.get(kind, {}).get(col, {}))
+            if summary is not None:
+                metrics[col] = summary["mae_mean"]
+                metrics_cv[col] = cv_by_kind[kind][col]
+                print(f"✅ {col}: MAE={summary['mae_mean']:.3f} ± {summary['mae_std']:.3f} "
+                      f"({summary['folds']} folds, {detail})")
+            else:
+                print(f"✅ {col}: trained on {len(y)} rows, {detail} (too few to cross-validate)")
+            fitted[col] = model
 
         except Exception as e:
             print(f"❌ Skipped {col}: {str(e).splitlines()[-1]}")
             continue
 
-    # Save metadata with only valid features + trained targets
+    metrics_cv = {col: cv for col, cv in metrics_cv.items() if col in fitted}
+    print_cv_table(metrics_cv)
+
+    # Metadata with only valid features + trained targets
     meta = {
         "feature_order": valid_features,
         "categorical_cols": CATEGORICAL_COLS,
-        "predictables": trained_targets,
-        "models": models,
+        "predictables": list(fitted),
         "metrics": metrics,
+        "metrics_cv": metrics_cv,
+        "model_kinds": {col: kinds[col] for col in fitted},
+        "best_iterations": {col: n for col, n in best_iterations.items() if col in fitted and kinds[col] == "catboost"},
+        "hparams": {col: hp for col, hp in tuned.items() if col in fitted and kinds[col] == "catboost"},
         "thresholds": {
             "feature_threshold": feature_thresh,
             "target_threshold": target_thresh
         },
+        "profile": {col: entry for col, entry in profile.items() if col in fitted},
     }
+    return fitted, meta
+
+
+def train_core(df, dates=None):
+    """Fit every Core target and save the models + metadata into models/core/."""
+
+    # Ensure model directory exists (fresh machine safety)
+    CORE_MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+    fitted, meta = fit_core(df, dates)
+    models = {}
+    for col, model in fitted.items():
+        kind = meta["model_kinds"][col]
+        with span("save", target=col):
+            if kind == "catboost":
+                model_path = CORE_MODEL_PATH.with_name(f"{col}_catboost.cbm")
+                model.save_model(model_path)
+            else:
+                import joblib
+
+                model_path = CORE_MODEL_PATH.with_name(f"{col}_{kind}.joblib")
+                joblib.dump(model, model_path)
+        models[col] = str(model_path)
+        meta["profile"][col]["model_bytes"] = os.path.getsize(model_path)
+    meta = {**meta, "models": models}
+    valid_features, trained_targets = meta["feature_order"], meta["predictables"]
+
     meta_path = CORE_MODEL_PATH.with_name("ml_catboost_meta.json")
     with open(meta_path, "w") as f:
         json.dump(meta, f, indent=2)
@@ -179,19 +296,31 @@ def train_core(df):
     print("🎯 Trained targets:", trained_targets)
     print(f"💾 Metadata saved to {meta_path}")
     print(f"📊 Summary: trained {len(models)} models, skipped {len(CORE_PREDICTABLES) - len(models)}")
+    print_profile(meta["profile"], current_tracer())
 
 # --- Main ---
-def main():
-    print("📦 Loading roast data...")
-    df = load_roast_data()
-    if df.empty:
-        print("❌ No roast logs found.")
-        return
-    print("🛠 Preprocessing...")
-    df = preprocess(df)
-    print("🤖 Training CatBoost models...")
-    train_core(df)
-    print("✅ Training complete.")
+def main(trace_path=None):
+    """Retrain Core from the roast log; `trace_path` also writes a Chrome / speedscope trace."""
+    with tracing() as tracer:
+        print("📦 Loading roast data...")
+        with span("load"):
+            df = load_roast_data()
+        if df.empty:
+            print("❌ No roast logs found.")
+            return
+        print("🛠 Preprocessing...")
+        with span("preprocess"):
+            dates = pd.to_datetime(df["roast_date"], errors="coerce") if "roast_date" in df.columns else None
+            df = preprocess(df)
+        print("🤖 Training models...")
+        train_core(df, dates)
+        print("✅ Training complete.")
+    finish_trace(tracer, trace_path)
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Retrain Core from data/roast_data.csv.")
+    parser.add_argument("--trace", default=None,
+                        help="write a Chrome trace (.json) or speedscope file (.speedscope.json) of the retrain")
+    main(parser.parse_args().trace)
@@ -5,7 +5,11 @@ Central config for ML training.
 Keeps thresholds and knobs in one place so you can tune without touching core code.
 """
 
+import json
 import math
+from typing import Any, Dict
+
+from scripts_utility.paths import MODELS_DIR
 
 def dynamic_threshold(num_rows: int, floor: float = 0.05, ceiling: float = 0.40) -> float:
     """
@@ -28,3 +32,35 @@ def get_thresholds(num_rows: int) -> tuple[float, float]:
     feature_thresh = dynamic_threshold(num_rows)
     target_thresh = dynamic_threshold(num_rows)
     return feature_thresh, target_thresh
+
+# Folds per scheme (K-fold and rolling-origin by roast date) for the MAE
+# stored in the metadata and the confidence shown in reports; 0 skips it.
+CV_FOLDS = 5
+
+# Add rate-of-rise / first-crack features derived from the anchor stages
+# (1, 6, 9) to Core's inputs — see scripts_main/roast_phases.py.
+USE_PHASE_FEATURES = False
+
+# Add the roast profile id ("P3", see scripts_main/roast_profiles.py) as a
+# categorical input. At prediction time it is the profile you plan to follow.
+USE_PROFILE_FEATURE = False
+
+# Per-target CatBoost settings found by scripts_main/hparam_search.py:
+# {"core": {target: {depth, learning_rate, l2_leaf_reg, iterations}}, "scout": {...}}.
+# Targets not in the file use the defaults in train_core / train_scout;
+# a searched target keeps its searched "iterations". Delete the file to go back.
+HPARAMS_PATH = MODELS_DIR / "hparams.json"
+HPARAM_KEYS = ("depth", "learning_rate", "l2_leaf_reg", "iterations")
+
+def load_hparams(model: str) -> Dict[str, Dict[str, Any]]:
+    """{target: CatBoost params} saved for "core" or "scout"; {} if there are none."""
+    try:
+        with open(HPARAMS_PATH) as f:
+            saved = json.load(f).get(model, {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+    return {
+        target: {k: v for k, v in params.items() if k in HPARAM_KEYS}
+        for target, params in saved.items()
+        if isinstance(params, dict)
+    }
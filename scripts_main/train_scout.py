@@ -1,15 +1,35 @@
 # scripts_main/train_scout.py
 
 import os
+from typing import Optional, Tuple
+
 import pandas as pd
 import joblib
-from catboost import CatBoostRegressor
+
+from scripts_main.light_models import CATBOOST_MIN_ROWS, make_model
+from scripts_main.model_evaluation import (
+    cross_validate_kinds,
+    cv_confidence,
+    fold_iterations,
+    print_cv_table,
+    select_model_kinds,
+)
 
 from scripts_utility.master_order import (
     SCOUT_FEATURE_ORDER,
     SCOUT_PREDICTABLES,
     SCOUT_CATEGORICAL_COLS,
 )
+from scripts_main.train_core_config import HPARAMS_PATH, load_hparams
+from scripts_main.training_profile import (
+    Profile,
+    finish_trace,
+    predict_sample,
+    print_profile,
+    profile_step,
+    serialized_size,
+)
+from scripts_utility.tracing import span, tracing
 from scripts_utility.paths import SCOUT_MODEL_PATH, DATA_FILE
 
 
@@ -21,70 +41,186 @@ def preprocess(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def train_scout(X: pd.DataFrame, y: pd.DataFrame) -> dict:
-    models: dict = {}
-    X = X.reset_index(drop=True)
+# Defaults; per-target values from models/hparams.json (hparam_search) win
+SCOUT_PARAMS = dict(iterations=200, depth=6, learning_rate=0.1, loss_function="MAE")
 
+
+def scout_datasets(
+    X: pd.DataFrame,
+    y: pd.DataFrame,
+    dates: Optional[pd.Series] = None,
+    profile: Optional[Profile] = None,
+) -> Tuple[dict, dict]:
+    """
+    ({target: (X, y, dates)} for targets a model can learn,
+     {target: training mean} for targets with too few rows).
+    Per-target preparation time goes into `profile` when given.
+    """
+    X = X.reset_index(drop=True)
+    dates = dates.reset_index(drop=True) if dates is not None else None
+    datasets, means = {}, {}
     for target in y.columns:
-        y_target = pd.to_numeric(y[target], errors="coerce").reset_index(drop=True)
-        mask = y_target.notna().to_numpy()
-        X_train, y_train = X.loc[mask], y_target.loc[mask]
+        with profile_step(profile, target, "prepare"):
+            y_target = pd.to_numeric(y[target], errors="coerce").reset_index(drop=True)
+            mask = y_target.notna().to_numpy()
+            X_train, y_train = X.loc[mask], y_target.loc[mask]
 
         unique_vals = y_train.unique()
 
         if len(y_train) >= 3 and len(unique_vals) > 1:
-            cat_features = [
-                i for i, col in enumerate(X_train.columns)
-                if col in SCOUT_CATEGORICAL_COLS
-            ]
-            model = CatBoostRegressor(
-                iterations=200,
-                depth=6,
-                learning_rate=0.1,
-                loss_function="MAE",
-                verbose=False,
-            )
-            model.fit(X_train, y_train, cat_features=cat_features)
-            models[target] = ("catboost", model)
-            print(f"✅ Trained CatBoost for {target} on {len(y_train)} samples")
+            datasets[target] = (X_train, y_train, dates.loc[mask] if dates is not None else None)
         elif len(y_train) > 0:
-            models[target] = ("mean", y_train.mean())
+            means[target] = y_train.mean()
             print(f"⚠️ Fallback mean for {target} (n={len(y_train)})")
         else:
             print(f"❌ Skipped {target} (no data)")
+    return datasets, means
 
-    return models
 
+def scout_params(columns, thread_count: int = -1) -> dict:
+    """CatBoostRegressor arguments shared by every Scout target."""
+    cat_features = [i for i, col in enumerate(columns) if col in SCOUT_CATEGORICAL_COLS]
+    return dict(SCOUT_PARAMS, cat_features=cat_features, thread_count=thread_count, verbose=False)
 
-def main():
-    # 1. Load roast data from the canonical path
-    if not DATA_FILE.exists():
-        raise FileNotFoundError(f"Roast data CSV not found at: {DATA_FILE}")
 
-    print(f"📄 Loading roast data from {DATA_FILE}")
-    df = pd.read_csv(DATA_FILE)
-
-    # 2. Preprocess (if needed later)
-    df = preprocess(df)
-
-    # 3. Split into features and targets
-    X = df[SCOUT_FEATURE_ORDER].copy()
-    y = df[SCOUT_PREDICTABLES].copy()
-
-    # 4. Train models
-    models = train_scout(X, y)
-
-    # 5. Ensure models/scout directory exists
-    SCOUT_MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
-
-    # 6. Save payload
-    payload = {
-        "models": models,
-        "feature_columns": list(X.columns),
+def train_scout(
+    X: pd.DataFrame,
+    y: pd.DataFrame,
+    dates: Optional[pd.Series] = None,
+    cv: bool = True,
+    thread_count: int = -1,
+    profile: Optional[Profile] = None,
+    workers: Optional[int] = None,
+    use_hparams: bool = True,
+) -> Tuple[dict, dict]:
+    """
+    Returns (models, metrics_cv). Entries are (kind, model, confidence)
+    where kind is "ridge", "knn" or "catboost", whichever cross-validates
+    best (see light_models); CatBoost tree counts come from where its
+    CV folds early-stopped (model_evaluation.fold_iterations).
+    Targets with fewer than 3 rows get ("mean", value).
+    `dates` (roast_date, aligned with X) orders the validation and
+    rolling-origin folds.
+    cv=False skips cross-validation (metrics_cv is empty) and picks the
+    kind from the row count alone.
+    `profile` (see training_profile), when given, is filled per target.
+    `workers` caps the fold pool (1 = in this process).
+    use_hparams=False ignores models/hparams.json (searched on the whole log).
+    """
+    datasets, means = scout_datasets(X, y, dates, profile)
+    models: dict = {target: ("mean", value) for target, value in means.items()}
+    if profile is not None:
+        for target in means:
+            profile[target].update(kind="mean", rows=int(y[target].notna().sum()), features=0, model_bytes=0)
+    params = scout_params(X.columns, thread_count)
+
+    # CatBoost is only tried on targets with enough rows
+    large = {target: d for target, d in datasets.items() if len(d[1]) >= CATBOOST_MIN_ROWS}
+    tuned = {target: hp for target, hp in load_hparams("scout").items() if target in large} if use_hparams else {}
+    if tuned:
+        print(f"🎛 Using searched hyperparameters for {len(tuned)} targets ({HPARAMS_PATH.name})")
+
+    cv_by_kind: dict = {}
+    if cv and datasets:
+        print(f"📏 Cross-validating {len(datasets)} targets ({len(large)} with CatBoost)...")
+        try:
+            with span("cross_validate"):
+                cv_by_kind = cross_validate_kinds(datasets, params, workers=workers)
+        except Exception as e:
+            print(f"⚠️ Cross-validation failed: {str(e).splitlines()[-1]}")
+    kinds = select_model_kinds(datasets, cv_by_kind)
+
+    # Untuned CatBoost targets take their tree count from where the CV folds
+    # stopped; searched ones keep the searched count
+    best_iterations = {}
+    for target in large:
+        if target not in tuned:
+            n = fold_iterations(cv_by_kind.get("catboost", {}).get(target), params["iterations"])
+            if n is not None:
+                best_iterations[target] = n
+    target_params = {
+        target: {**tuned.get(target, {}), **({"iterations": best_iterations[target]} if target in best_iterations else {})}
+        for target in large
     }
-    joblib.dump(payload, SCOUT_MODEL_PATH)
-    print(f"✅ Scout models trained and saved to {SCOUT_MODEL_PATH}")
+
+    metrics_cv: dict = {}
+    for target, (X_train, y_train, _) in datasets.items():
+        kind = kinds[target]
+        target_fit = {**params, **target_params.get(target, {}), "kind": kind}
+        model = make_model(target_fit, len(y_train))
+        with profile_step(profile, target, "fit"):
+            model.fit(X_train, y_train)
+        with profile_step(profile, target, "predict"):
+            model.predict(predict_sample(X_train))
+        if profile is not None:
+            profile[target].update(
+                kind=kind, rows=len(y_train), features=X_train.shape[1], model_bytes=serialized_size(model),
+            )
+        target_cv = cv_by_kind.get(kind, {}).get(target)
+        if target_cv:
+            metrics_cv[target] = target_cv
+        conf = cv_confidence(target_cv)
+        models[target] = (kind, model, 1.0 if conf is None else conf)
+        detail = f"{target_fit['iterations']} trees" if kind == "catboost" else kind
+        print(f"✅ Trained {target} on {len(y_train)} samples ({detail})")
+
+    if profile is not None:
+        for target in [t for t in profile if t not in models]:
+            del profile[target]
+    print_cv_table(metrics_cv)
+    return models, metrics_cv
+
+
+def main(trace_path: Optional[str] = None):
+    """Retrain Scout from the roast log; `trace_path` also writes a Chrome / speedscope trace."""
+    with tracing() as tracer:
+        # 1. Load roast data from the canonical path
+        if not DATA_FILE.exists():
+            raise FileNotFoundError(f"Roast data CSV not found at: {DATA_FILE}")
+
+        print(f"📄 Loading roast data from {DATA_FILE}")
+        with span("load"):
+            df = pd.read_csv(DATA_FILE)
+
+        # 2. Preprocess (if needed later)
+        with span("preprocess"):
+            df = preprocess(df)
+
+            # 3. Split into features and targets
+            X = df[SCOUT_FEATURE_ORDER].copy()
+            y = df[SCOUT_PREDICTABLES].copy()
+            dates = pd.to_datetime(df["roast_date"], errors="coerce") if "roast_date" in df.columns else None
+
+        # 4. Train models
+        profile: Profile = {}
+        models, metrics_cv = train_scout(X, y, dates, profile=profile)
+
+        # 5. Ensure models/scout directory exists
+        SCOUT_MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+        # 6. Save payload
+        payload = {
+            "models": models,
+            "feature_columns": list(X.columns),
+            "metrics_cv": metrics_cv,
+            "model_kinds": {target: info[0] for target, info in models.items()},
+            "best_iterations": {
+                target: int(info[1].tree_count_) for target, info in models.items() if info[0] == "catboost"
+            },
+            "profile": profile,
+        }
+        with span("save"):
+            joblib.dump(payload, SCOUT_MODEL_PATH)
+        print(f"✅ Scout models trained and saved to {SCOUT_MODEL_PATH}")
+
+    print_profile(profile, tracer)
+    finish_trace(tracer, trace_path)
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Retrain Scout from data/roast_data.csv.")
+    parser.add_argument("--trace", default=None,
+                        help="write a Chrome trace (.json) or speedscope file (.speedscope.json) of the retrain")
+    main(parser.parse_args().trace)
@@ -0,0 +1,120 @@
+# scripts_main/training_profile.py
+"""
+Per-target resource report for Scout and Core retrains.
+
+For every target the trainers record:
+  rows, features       size of the training set
+  prepare_s            building the target's X / y from the roast log
+  fit_s, predict_s     final model fit, and predicting the first
+                       PREDICT_SAMPLE_ROWS training rows
+  rss_delta_mb         largest growth of the process's resident memory
+                       over one step (current RSS after minus before)
+  model_bytes          size of the saved model
+The profile is saved in the training metadata ("profile") and printed as
+a table, slowest target first. Shared steps (loading, cross-validation,
+saving) are timed as spans too; run a trainer with
+--trace to write the whole retrain as a Chrome trace or speedscope file
+(see scripts_utility/tracing.py).
+
+Resident memory is sampled with psutil when it is installed, else from
+/proc/self/statm; it covers this process only (not the cross-validation
+workers) and is None where neither is available.
+"""
+
+import os
+import pickle
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from scripts_utility.tracing import Tracer, span
+
+Profile = Dict[str, Dict[str, Any]]
+
+# Shared steps shown under the per-target table, in order
+SHARED_STEPS = ("load", "preprocess", "cross_validate", "save")
+
+# The predict step is timed on this many training rows, the same for every target
+PREDICT_SAMPLE_ROWS = 100
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident memory of this process right now, in MB (None if it can't be read)."""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def predict_sample(X: Any) -> Any:
+    """The rows the predict step is timed on (first PREDICT_SAMPLE_ROWS of X)."""
+    return X.iloc[:PREDICT_SAMPLE_ROWS]
+
+
+@contextmanager
+def profile_step(profile: Optional[Profile], target: str, step: str) -> Iterator[None]:
+    """Time one step of one target as a span, and add it to `profile` when given."""
+    with span(step, target=target):
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                entry = profile.setdefault(target, {})
+                entry[f"{step}_s"] = entry.get(f"{step}_s", 0.0) + time.perf_counter() - start
+                rss_after = current_rss_mb()
+                if rss_before is not None and rss_after is not None:
+                    delta = max(entry.get("rss_delta_mb") or 0.0, rss_after - rss_before)
+                    entry["rss_delta_mb"] = round(delta, 2)
+                else:
+                    entry.setdefault("rss_delta_mb", None)
+
+
+def serialized_size(model: Any) -> int:
+    """Pickled size in bytes (how the Scout payload stores each model)."""
+    return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def print_profile(profile: Profile, tracer: Optional[Tracer] = None) -> None:
+    """Per-target table, slowest first, then the shared steps from `tracer`."""
+    if not profile:
+        return
+
+    def total(entry):
+        return sum(entry.get(k, 0.0) for k in ("prepare_s", "fit_s", "predict_s"))
+
+    rows = sorted(profile.items(), key=lambda kv: total(kv[1]), reverse=True)
+    width = max(len(t) for t in profile)
+    print("\n⏱ Training profile (slowest target first)")
+    print(f"   {'target'.ljust(width)}  {'kind':>8} {'rows':>6} {'feats':>5} {'prep s':>7} {'fit s':>7} "
+          f"{'pred ms':>8} {'ΔRSS MB':>8} {'size KB':>8}")
+    for target, e in rows:
+        rss = e.get("rss_delta_mb")
+        size = e.get("model_bytes")
+        print(f"   {target.ljust(width)}  {e.get('kind', ''):>8} {e.get('rows', 0):>6} {e.get('features', 0):>5} "
+              f"{e.get('prepare_s', 0.0):>7.3f} {e.get('fit_s', 0.0):>7.3f} {e.get('predict_s', 0.0) * 1000:>8.1f} "
+              f"{'n/a' if rss is None else f'{rss:.1f}':>8} {'n/a' if size is None else f'{size / 1024:.1f}':>8}")
+
+    if tracer is not None:
+        totals = tracer.totals()
+        shared = [f"{step.replace('_', ' ')} {totals[step]:.2f}s" for step in SHARED_STEPS if step in totals]
+        if shared:
+            print(f"   shared: {', '.join(shared)}")
+
+
+def finish_trace(tracer: Tracer, path: Optional[str]) -> None:
+    """Write the retrain's spans to `path` (Chrome trace, or speedscope for *.speedscope.json)."""
+    if not path:
+        return
+    tracer.write(path)
+    viewer = "https://www.speedscope.app" if str(path).endswith(".speedscope.json") else "chrome://tracing or ui.perfetto.dev"
+    print(f"🧵 Trace written to {path} (open in {viewer})")
@@ -0,0 +1,205 @@
+# scripts_main/what_if_sweep.py
+"""
+What-if sweeps over the roasting environment.
+
+Takes a base session plus value ranges for a few environment variables,
+builds the full grid with numpy, and scores every grid point in one batch
+(one predict call per target model). The result keeps each target as an
+N-dimensional array so any two variables can be viewed as a surface.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from scripts_utility.master_order import CORE_FEATURE_ORDER, SCOUT_FEATURE_ORDER
+from scripts_utility.paths import SCOUT_MODEL_PATH
+
+# Variables the sweep may vary (everything else comes from the base session)
+SWEEP_VARIABLES = [
+    "room_temp_f",
+    "humidity_pct",
+    "room_bean_temp_f",
+    "green_bean_moisture_pct",
+    "batch_weight_lbs",
+]
+
+# stage_9_time_sec is an input anchor, so no model predicts it; the latest
+# predicted stage time and the final burner are the closest surfaces
+DEFAULT_SURFACE_TARGETS = ["stage_8_time_sec", "stage_9_burner_pct"]
+
+# Refuse grids that would not fit comfortably in one batch
+MAX_GRID_POINTS = 250_000
+
+
+@dataclass
+class SweepResult:
+    model: str                              # "scout" or "core"
+    variables: List[str]                    # swept variables, in axis order
+    axes: List[np.ndarray]                  # values along each axis
+    base: Dict[str, Any]                    # base session (flat inputs)
+    predictions: Dict[str, np.ndarray]      # target -> array shaped like the grid
+    ignored_variables: List[str] = field(default_factory=list)  # not model features
+    elapsed_sec: float = 0.0
+
+    @property
+    def n_points(self) -> int:
+        return int(np.prod([len(a) for a in self.axes])) if self.axes else 0
+
+    def surface(
+        self,
+        target: str,
+        x_var: str,
+        y_var: str,
+        fixed: Optional[Dict[str, float]] = None,
+    ) -> np.ndarray:
+        """
+        2-D slice of `target` with rows along y_var and columns along x_var.
+        Other swept variables are held at the grid value nearest `fixed`
+        (default: the base session value, else the middle of the range).
+        """
+        values = self.predictions[target]
+        index: List[Any] = []
+        for var, axis in zip(self.variables, self.axes):
+            if var in (x_var, y_var):
+                index.append(slice(None))
+                continue
+            want = (fixed or {}).get(var, self.base.get(var))
+            try:
+                index.append(int(np.abs(axis - float(want)).argmin()))
+            except (TypeError, ValueError):
+                index.append(len(axis) // 2)
+
+        sliced = values[tuple(index)]
+        remaining = [v for v in self.variables if v in (x_var, y_var)]
+        if x_var == y_var:
+            return sliced[np.newaxis, :]
+        return sliced if remaining == [y_var, x_var] else sliced.T
+
+
+def sweep_range(low: float, high: float, steps: int) -> np.ndarray:
+    return np.linspace(float(low), float(high), max(1, int(steps)))
+
+
+def build_grid(ranges: Dict[str, Sequence[float]]) -> Tuple[List[str], List[np.ndarray], Dict[str, np.ndarray]]:
+    """Full Cartesian grid: (variables, axes, {variable: flat values})."""
+    unknown = [v for v in ranges if v not in SWEEP_VARIABLES]
+    if unknown:
+        raise ValueError(f"Cannot sweep {', '.join(unknown)}; choose from {', '.join(SWEEP_VARIABLES)}")
+
+    variables = [v for v in SWEEP_VARIABLES if v in ranges]
+    axes = [np.asarray(ranges[v], dtype=float).ravel() for v in variables]
+    n_points = int(np.prod([len(a) for a in axes])) if axes else 0
+    if n_points > MAX_GRID_POINTS:
+        raise ValueError(f"Sweep grid has {n_points} points (limit {MAX_GRID_POINTS})")
+
+    mesh = np.meshgrid(*axes, indexing="ij")
+    return variables, axes, {v: m.ravel() for v, m in zip(variables, mesh)}
+
+
+def _is_provided(value: Any) -> bool:
+    return value not in (None, "", "NaN")
+
+# -------------------------------------------------------------------
+# Batch scoring
+# -------------------------------------------------------------------
+
+def score_scout_grid(
+    base: Dict[str, Any],
+    grid: Dict[str, np.ndarray],
+    n_points: int,
+    payload: Tuple[dict, list],
+) -> Tuple[Dict[str, np.ndarray], List[str]]:
+    from scripts_main.infer_scout import preprocess
+
+    models, feature_columns = payload
+    X = preprocess(base, feature_columns)
+    X = X.loc[X.index.repeat(n_points)].reset_index(drop=True)
+
+    ignored = [var for var in grid if var not in X.columns]
+    for var, values in grid.items():
+        if var in X.columns:
+            X[var] = values
+
+    predictions: Dict[str, np.ndarray] = {}
+    for target, (kind, model, *_) in models.items():
+        if _is_provided(base.get(target)):
+            predictions[target] = np.full(n_points, float(base[target]))
+        elif kind == "mean":
+            predictions[target] = np.full(n_points, float(model))
+        else:
+            predictions[target] = np.asarray(model.predict(X), dtype=float)
+    return predictions, ignored
+
+
+def score_core_grid(
+    base: Dict[str, Any],
+    grid: Dict[str, np.ndarray],
+    n_points: int,
+    bundle: Dict[str, Any],
+) -> Tuple[Dict[str, np.ndarray], List[str]]:
+    from scripts_main.infer_core import preprocess, build_core_frame, predict_core_frame
+
+    row = preprocess(dict(base))
+    df = build_core_frame([row], bundle["meta"].get("feature_order", []))
+    df = df.loc[df.index.repeat(n_points)].reset_index(drop=True)
+
+    ignored = [var for var in grid if var not in df.columns]
+    for var, values in grid.items():
+        if var in df.columns:
+            df[var] = values
+
+    raw, _ = predict_core_frame(bundle, df)
+    predictions: Dict[str, np.ndarray] = {}
+    for target, values in raw.items():
+        if _is_provided(row.get(target)):
+            predictions[target] = np.full(n_points, float(row[target]))
+        else:
+            predictions[target] = np.asarray(values, dtype=float)
+    return predictions, ignored
+
+
+def run_sweep(
+    base: Dict[str, Any],
+    ranges: Dict[str, Sequence[float]],
+    model: str = "scout",
+    payload: Optional[Tuple[dict, list]] = None,
+    bundle: Optional[Dict[str, Any]] = None,
+) -> SweepResult:
+    """
+    Score every combination of `ranges` on top of `base`.
+    Pass a preloaded Scout `payload` / Core `bundle` to skip reading models from disk.
+    """
+    start = time.perf_counter()
+    variables, axes, grid = build_grid(ranges)
+    n_points = int(np.prod([len(a) for a in axes])) if axes else 1
+    shape = tuple(len(a) for a in axes)
+
+    if model == "scout":
+        flat = {key: base.get(key) for key in SCOUT_FEATURE_ORDER}
+        if payload is None:
+            from scripts_main.infer_scout import load_payload
+            payload = load_payload(SCOUT_MODEL_PATH)
+        flat_predictions, ignored = score_scout_grid(flat, grid, n_points, payload)
+    elif model == "core":
+        flat = {key: base.get(key) for key in CORE_FEATURE_ORDER}
+        if bundle is None:
+            from scripts_main.infer_core import load_core_bundle
+            bundle = load_core_bundle()
+        if bundle is None:
+            raise RuntimeError("No Core metadata found — have you trained models yet?")
+        flat_predictions, ignored = score_core_grid(flat, grid, n_points, bundle)
+    else:
+        raise ValueError(f"Unknown model: {model}")
+
+    return SweepResult(
+        model=model,
+        variables=variables,
+        axes=axes,
+        base=flat,
+        predictions={t: v.reshape(shape) for t, v in flat_predictions.items()},
+        ignored_variables=ignored,
+        elapsed_sec=time.perf_counter() - start,
+    )
@@ -0,0 +1,217 @@
+# scripts_utility/curve_model.py
+"""
+Smooth roast curves through the stage points.
+
+Each roast's (time, temp) points are joined with a monotone piecewise cubic
+(PCHIP, Fritsch–Carlson slopes): it passes through every point, never
+overshoots between them, and each piece rises or falls with its endpoints.
+Any number of roasts are fitted and evaluated together as (n, k) arrays,
+so "temp at 9:30" or "when does it hit 400°F" for thousands of roasts is
+a few NumPy passes. Missing points (NaN) are skipped per roast.
+"""
+
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+# Points per curve when sampling for plots
+CURVE_POINTS = 64
+
+# Bisection steps when inverting a curve piece (piece width / 2**40)
+_INVERT_STEPS = 40
+
+
+def _poly(coeffs, dx):
+    """Evaluate cubic pieces (c3, c2, c1, c0) at dx past their left knot (Horner)."""
+    c3, c2, c1, c0 = coeffs
+    out = c3 * dx
+    out += c2
+    out *= dx
+    out += c1
+    out *= dx
+    out += c0
+    return out
+
+
+def _edge_slope(h0, h1, d0, d1):
+    """One-sided three-point end slope, limited to keep the end piece monotone."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        m = ((2 * h0 + h1) * d0 - h0 * d1) / (h0 + h1)
+    m = np.where(np.sign(m) != np.sign(d0), 0.0, m)
+    return np.where((np.sign(d0) != np.sign(d1)) & (np.abs(m) > 3 * np.abs(d0)), 3 * d0, m)
+
+
+@dataclass
+class CurveModel:
+    """
+    Fitted curves for n roasts. Row i's valid knots are x[i, :counts[i]]
+    (increasing) and y[i, :counts[i]]; rows with fewer than 2 points
+    evaluate to NaN. Build with CurveModel.fit.
+    """
+    x: np.ndarray        # (n, k) knot times, NaN past counts
+    y: np.ndarray        # (n, k) knot temps
+    slopes: np.ndarray   # (n, k) dy/dx at each knot
+    counts: np.ndarray   # (n,) number of valid knots
+    coeffs: Tuple[np.ndarray, ...] = ()  # cubic, quadratic, linear, constant per piece, flattened (n * (k-1),)
+
+    @classmethod
+    def fit(cls, times, temps) -> "CurveModel":
+        """Fit (n, k) or (k,) arrays of times and temps (any order, NaN = missing)."""
+        x = np.atleast_2d(np.asarray(times, dtype=float))
+        y = np.atleast_2d(np.asarray(temps, dtype=float))
+
+        # Sort each row by time with missing points last; repeated times keep the first
+        key = np.where(np.isnan(x) | np.isnan(y), np.inf, x)
+        for _ in range(2):
+            order = np.argsort(key, axis=1, kind="stable")
+            key = np.take_along_axis(key, order, axis=1)
+            y = np.take_along_axis(y, order, axis=1)
+            repeat = np.zeros(key.shape, dtype=bool)
+            repeat[:, 1:] = key[:, 1:] == key[:, :-1]
+            if not repeat.any():
+                break
+            key[repeat] = np.inf
+
+        valid = np.isfinite(key)
+        counts = valid.sum(axis=1)
+        x = np.where(valid, key, np.nan)
+        y = np.where(valid, y, np.nan)
+        n, k = x.shape
+        rows = np.arange(n)
+
+        slopes = np.full((n, k), np.nan)
+        if k >= 2:
+            h = np.diff(x, axis=1)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                d = np.diff(y, axis=1) / h
+
+            # Interior knots: weighted harmonic mean of neighbouring secants, 0 at extrema
+            if k >= 3:
+                h0, h1, d0, d1 = h[:, :-1], h[:, 1:], d[:, :-1], d[:, 1:]
+                w1, w2 = 2 * h1 + h0, h1 + 2 * h0
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    harmonic = (w1 + w2) / (w1 / d0 + w2 / d1)
+                slopes[:, 1:-1] = np.where(d0 * d1 > 0, harmonic, 0.0)
+
+            # End knots (a 2-point curve is a straight line)
+            last = np.maximum(counts - 1, 1)
+            prev = np.maximum(last - 2, 0)
+            straight = counts == 2
+            if k >= 3:
+                left = _edge_slope(h[:, 0], h[:, 1], d[:, 0], d[:, 1])
+                right = _edge_slope(h[rows, last - 1], h[rows, prev], d[rows, last - 1], d[rows, prev])
+            else:
+                left = right = d[:, 0]
+            slopes[:, 0] = np.where(straight, d[:, 0], left)
+            slopes[rows, last] = np.where(straight, d[rows, last - 1], right)
+
+        # Piece j as c3·dx³ + c2·dx² + c1·dx + c0, dx = time past knot j
+        coeffs: Tuple[np.ndarray, ...] = ()
+        if k >= 2:
+            m0, m1 = slopes[:, :-1], slopes[:, 1:]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                c2 = (3 * d - 2 * m0 - m1) / h
+                c3 = (m0 + m1 - 2 * d) / (h * h)
+            coeffs = tuple(np.ascontiguousarray(c).ravel() for c in (c3, c2, m0, y[:, :-1]))
+
+        return cls(x=x, y=y, slopes=slopes, counts=counts, coeffs=coeffs)
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    @property
+    def start(self) -> np.ndarray:
+        """First knot time per roast."""
+        return self.x[:, 0]
+
+    @property
+    def end(self) -> np.ndarray:
+        """Last knot time per roast (NaN for empty rows)."""
+        last = np.maximum(self.counts - 1, 0)
+        return self.x[np.arange(len(self)), last]
+
+    def _pieces(self, flat: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """Coefficients of the pieces at flat indices row * (k-1) + j."""
+        return tuple(c.take(flat) for c in self.coeffs)
+
+    def _queries(self, values) -> Tuple[np.ndarray, bool]:
+        """Broadcast a scalar, (m,) or (n, m) query to (n, m)."""
+        q = np.asarray(values, dtype=float)
+        scalar = q.ndim == 0
+        if q.ndim <= 1:
+            q = np.broadcast_to(np.atleast_1d(q), (len(self), q.size))
+        elif q.shape[0] != len(self):
+            raise ValueError(f"Expected {len(self)} rows of queries, got {q.shape[0]}")
+        return q, scalar
+
+    def temp_at_time(self, times) -> np.ndarray:
+        """
+        Temperature at each query time: a scalar or (m,) applies to every
+        roast, (n, m) gives each roast its own times. Returns (n,) for a
+        scalar, else (n, m); NaN outside a roast's first..last point.
+        """
+        q, scalar = self._queries(times)
+        n, k = self.x.shape
+        if k < 2:
+            out = np.full(q.shape, np.nan)
+            return out[:, 0] if scalar else out
+        fitted = self.counts >= 2
+        start, end = self.start[:, None], self.end[:, None]
+
+        # Piece index per query: knots at or before it (k is small, so one
+        # comparison pass per knot beats a search)
+        qc = np.clip(q, start, end)
+        j = np.zeros(q.shape, dtype=np.intp)
+        for c in range(1, k - 1):
+            with np.errstate(invalid="ignore"):
+                j += qc >= self.x[:, c:c + 1]
+        j = np.minimum(j, np.maximum(self.counts - 2, 0)[:, None])
+
+        flat = j + np.arange(n)[:, None] * (k - 1)
+        out = _poly(self._pieces(flat), qc - self.x[:, :-1].ravel().take(flat))
+        out[~(fitted[:, None] & (q >= start) & (q <= end))] = np.nan
+        return out[:, 0] if scalar else out
+
+    def time_at_temp(self, temps) -> np.ndarray:
+        """
+        First time each roast rises through each query temperature (same
+        shapes as temp_at_time). NaN if the curve never climbs to it, e.g.
+        a roast dropped before first crack.
+        """
+        q, scalar = self._queries(temps)
+        n, k = self.x.shape
+        out = np.full(q.shape, np.nan)
+        if k < 2:
+            return out[:, 0] if scalar else out
+
+        # First piece whose endpoints bracket the temp on the way up
+        y0, y1 = self.y[:, None, :-1], self.y[:, None, 1:]
+        with np.errstate(invalid="ignore"):
+            crosses = (y0 < q[..., None]) & (y1 >= q[..., None])
+        found = crosses.any(axis=-1)
+        j = crosses.argmax(axis=-1)
+
+        flat = j + np.arange(n)[:, None] * (k - 1)
+        x0 = self.x[:, :-1].ravel().take(flat)
+        h = self.x[:, 1:].ravel().take(flat) - x0
+
+        # PCHIP pieces are monotone, so bisection on dx in [0, h] converges
+        pieces = self._pieces(flat)
+        lo = np.zeros(q.shape)
+        hi = np.where(found, h, 0.0)
+        with np.errstate(invalid="ignore"):
+            for _ in range(_INVERT_STEPS):
+                mid = 0.5 * (lo + hi)
+                below = _poly(pieces, mid) < q
+                lo = np.where(below, mid, lo)
+                hi = np.where(below, hi, mid)
+        out = np.where(found, x0 + 0.5 * (lo + hi), np.nan)
+        return out[:, 0] if scalar else out
+
+    def sample(self, points: int = CURVE_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+        """(times, temps), each (n, points), evenly spaced from each roast's first to last point."""
+        grid = np.linspace(0.0, 1.0, points)
+        start, end = self.start[:, None], self.end[:, None]
+        times = start + (end - start) * grid
+        return times, self.temp_at_time(times)
@@ -0,0 +1,109 @@
+# scripts_utility/derived_store.py
+"""
+Per-roast derived columns (fuel estimates, ...) kept next to the roast log
+in data/roast_derived.csv, keyed by roast id.
+
+Each group of columns also stores a hash of the roast-log columns it was
+computed from ("<group>__hash"), so only new or edited roasts are
+recomputed; the rest are read back as-is.
+"""
+
+import os
+from typing import Callable, List
+
+import pandas as pd
+
+from scripts_utility.paths import ROOT_DIR
+
+DERIVED_FILE = ROOT_DIR / "data" / "roast_derived.csv"
+
+
+def load_derived(path=DERIVED_FILE) -> pd.DataFrame:
+    if not os.path.exists(path):
+        return pd.DataFrame(index=pd.Index([], name="id"))
+    try:
+        return pd.read_csv(path, index_col="id", dtype={"id": str})
+    except (ValueError, pd.errors.EmptyDataError) as e:
+        print(f"⚠️ Ignoring unreadable {path}: {e}")
+        return pd.DataFrame(index=pd.Index([], name="id"))
+
+
+def save_derived(df: pd.DataFrame, path=DERIVED_FILE) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    df.index.name = "id"
+    df.to_csv(tmp)
+    os.replace(tmp, path)
+
+
+def row_hashes(roast_df: pd.DataFrame, columns: List[str]) -> pd.Series:
+    """Hex hash of each row's input columns (missing columns count as blank)."""
+    inputs = roast_df.reindex(columns=columns)
+    hashed = pd.util.hash_pandas_object(inputs, index=False)
+    return hashed.map(lambda h: f"{h:016x}")
+
+
+def ensure_derived(
+    roast_df: pd.DataFrame,
+    group: str,
+    input_columns: List[str],
+    output_columns: List[str],
+    compute: Callable[[pd.DataFrame], pd.DataFrame],
+    path=DERIVED_FILE,
+    version: str = "",
+    save: bool = True,
+) -> pd.DataFrame:
+    """
+    Derived `output_columns` for every row of roast_df (same index).
+    Rows whose inputs changed since the last run, or that were never
+    computed, go through `compute` in one call and are saved back
+    (only returned with save=False, e.g. while rendering a report).
+    Changing `version` (e.g. when `compute` itself changes) recomputes every row.
+    """
+    if roast_df.empty:
+        return pd.DataFrame(index=roast_df.index, columns=output_columns, dtype=float)
+
+    hash_col = f"{group}__hash"
+    # Rows without an id can't be keyed; they are recomputed every time
+    if "id" in roast_df.columns:
+        no_id = roast_df["id"].isna()
+        ids = roast_df["id"].astype(object).where(~no_id, "").astype(str)
+    else:
+        no_id = pd.Series(True, index=roast_df.index)
+        ids = pd.Series("", index=roast_df.index)
+    hashes = row_hashes(roast_df, input_columns)
+    if version:
+        hashes = f"{version}:" + hashes
+
+    store = load_derived(path)
+    store = store[~store.index.duplicated(keep="last")]
+    known = store[hash_col].reindex(ids.values) if hash_col in store.columns else pd.Series(index=ids.values, dtype=object)
+    stale = known.values != hashes.values
+    missing_cols = [c for c in output_columns if c not in store.columns]
+    if missing_cols:
+        stale[:] = True
+
+    if stale.any():
+        fresh = compute(roast_df.loc[stale]).reindex(columns=output_columns)
+        fresh.index = roast_df.index[stale]
+
+    if stale.any() and save:
+        keyed = ~no_id[stale]
+        to_store = fresh[keyed.values].copy()
+        to_store.index = ids[stale][keyed].values
+        to_store[hash_col] = hashes[stale][keyed].values
+        to_store = to_store[~to_store.index.duplicated(keep="last")]
+        if not to_store.empty:
+            store = store.reindex(
+                index=store.index.union(to_store.index),
+                columns=store.columns.union(to_store.columns, sort=False),
+            )
+            store[hash_col] = store[hash_col].astype(object)
+            store.loc[to_store.index, to_store.columns] = to_store
+            save_derived(store, path)
+
+    result = store.reindex(ids.values).reindex(columns=output_columns)
+    result.index = roast_df.index
+    if stale.any():
+        result.loc[stale] = fresh.values
+    return result
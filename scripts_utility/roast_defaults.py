@@ -0,0 +1,55 @@
+# scripts_utility/roast_defaults.py
+# Shop defaults: what the GUI input windows pre-fill (see form_defaults),
+# and what the planners use when no form is filled in.
+
+from typing import Any, Dict
+
+DEFAULT_STAGE_TEMPS_F: Dict[int, float] = {
+    0: 400.0,
+    1: 300.0,
+    2: 320.0,
+    3: 340.0,
+    4: 360.0,
+    5: 380.0,
+    6: 400.0,
+    7: 430.0,
+    8: 445.0,
+    9: 455.0,
+}
+
+# Anchor stage times (stage -> seconds): 04:00, 08:00, 11:00
+DEFAULT_ANCHOR_TIMES_SEC: Dict[int, float] = {
+    1: 240.0,
+    6: 480.0,
+    9: 660.0,
+}
+
+DEFAULT_ENVIRONMENT: Dict[str, float] = {
+    "room_temp_f": 70.0,
+    "humidity_pct": 50.0,
+    "room_bean_temp_f": 70.0,
+    "green_bean_moisture_pct": 10.0,
+    "batch_weight_lbs": 200.0,
+}
+
+
+def form_defaults() -> Dict[str, str]:
+    """Form field -> pre-filled text: numbers as typed, anchor times as MMSS ("0400")."""
+    text = {key: f"{value:g}" for key, value in DEFAULT_ENVIRONMENT.items()}
+    for i, temp in DEFAULT_STAGE_TEMPS_F.items():
+        text[f"stage_{i}_temp_f"] = f"{temp:g}"
+    for i, sec in DEFAULT_ANCHOR_TIMES_SEC.items():
+        text[f"stage_{i}_time_mmss"] = f"{int(sec) // 60:02d}{int(sec) % 60:02d}"
+    return text
+
+
+def default_session(**overrides: Any) -> Dict[str, Any]:
+    """Environment + stage temps + anchor times, with overrides applied."""
+    session: Dict[str, Any] = dict(DEFAULT_ENVIRONMENT)
+    for i, temp in DEFAULT_STAGE_TEMPS_F.items():
+        session[f"stage_{i}_temp_f"] = temp
+    session["stage_0_time_sec"] = 0.0
+    for i, sec in DEFAULT_ANCHOR_TIMES_SEC.items():
+        session[f"stage_{i}_time_sec"] = sec
+    session.update(overrides)
+    return session
@@ -0,0 +1,51 @@
+# scripts_utility/roast_log.py
+"""
+The roast log (data/roast_data.csv) read once per file version.
+
+The version is the file's (mtime_ns, size), which changes whenever a roast
+is saved, so similar-roast lookups, shape search and the GUI history plots
+all share one parsed DataFrame and key their own caches on the version.
+Callers must treat the returned DataFrame as read-only.
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from scripts_utility.paths import DATA_FILE
+
+# (mtime_ns, size) of the roast log; changes whenever a roast is saved
+RoastLogVersion = Tuple[int, int]
+
+# GUI prediction workers load the log off the UI thread
+_CACHE_LOCK = threading.Lock()
+_ROAST_LOG_CACHE: Dict[str, Tuple[RoastLogVersion, pd.DataFrame]] = {}
+
+
+def roast_log_version(path=DATA_FILE) -> Optional[RoastLogVersion]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def load_roast_log(path=DATA_FILE) -> Tuple[Optional[pd.DataFrame], Optional[RoastLogVersion]]:
+    """(roast log, version), re-read only when the file changes; (None, None) if it is missing."""
+    version = roast_log_version(path)
+    if version is None:
+        return None, None
+
+    key = os.path.abspath(path)
+    with _CACHE_LOCK:
+        cached = _ROAST_LOG_CACHE.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1], version
+
+    # Parsed outside the lock so a slow read never blocks another thread's cache hit
+    roast_df = pd.read_csv(path)
+    with _CACHE_LOCK:
+        _ROAST_LOG_CACHE[key] = (version, roast_df)
+    return roast_df, version
@@ -0,0 +1,131 @@
+# scripts_utility/startup_benchmark.py
+"""
+Import-time benchmark for the CLI and GUI entrypoints.
+
+Runs each entry module in a fresh interpreter with `python -X importtime`,
+reports the cumulative import cost and the heaviest imports, and checks it
+against a startup budget. Heavy ML/plotting packages must not be imported
+before the operator chooses an option that needs them.
+
+Usage (from the project root):
+    python -m scripts_utility.startup_benchmark [--runs 5] [--json results.jsonl]
+
+Exits with status 1 when any entrypoint is over budget.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from scripts_utility.paths import ROOT_DIR
+
+# Budget for importing each entry module (median of runs, milliseconds)
+STARTUP_BUDGET_MS: Dict[str, float] = {
+    "main": 150.0,
+    "gui.gui_main_window": 600.0,  # PySide6.QtWidgets dominates
+}
+
+# Packages that must stay out of startup
+FORBIDDEN_AT_STARTUP = ["pandas", "catboost", "sklearn", "matplotlib", "joblib"]
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Parse `-X importtime` output into (module, self_us, cumulative_us) rows."""
+    rows: List[Tuple[str, int, int]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].strip())
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue  # header line
+        rows.append((parts[2].strip(), self_us, cumulative_us))
+    return rows
+
+
+def measure_module(module: str) -> List[Tuple[str, int, int]]:
+    """Import `module` in a fresh interpreter and return its importtime rows."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    return parse_importtime(proc.stderr)
+
+
+def benchmark_module(module: str, runs: int = 5, top: int = 8) -> Dict[str, object]:
+    totals_ms: List[float] = []
+    last_rows: List[Tuple[str, int, int]] = []
+    for _ in range(runs):
+        last_rows = measure_module(module)
+        # The entry module's own row carries the cumulative cost of everything it imports
+        top_level = [r for r in last_rows if r[0] == module]
+        totals_ms.append((top_level[-1][2] if top_level else 0) / 1000.0)
+
+    imported = {name for name, _, _ in last_rows}
+    forbidden = sorted(
+        pkg for pkg in FORBIDDEN_AT_STARTUP
+        if any(name == pkg or name.startswith(pkg + ".") for name in imported)
+    )
+    heaviest = sorted(last_rows, key=lambda r: r[1], reverse=True)[:top]
+
+    return {
+        "module": module,
+        "median_ms": statistics.median(totals_ms),
+        "min_ms": min(totals_ms),
+        "budget_ms": STARTUP_BUDGET_MS.get(module),
+        "forbidden_imports": forbidden,
+        "heaviest_self_ms": [(name, self_us / 1000.0) for name, self_us, _ in heaviest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RoastMaster startup import benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="append results as one JSON line to this file")
+    parser.add_argument("modules", nargs="*", default=list(STARTUP_BUDGET_MS))
+    args = parser.parse_args()
+
+    failed = False
+    results = []
+    for module in args.modules:
+        try:
+            result = benchmark_module(module, runs=args.runs)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            failed = True
+            continue
+        results.append(result)
+
+        budget = result["budget_ms"]
+        over = budget is not None and result["median_ms"] > budget
+        status = "❌" if over or result["forbidden_imports"] else "✅"
+        budget_txt = f"{budget:.0f} ms" if budget is not None else "none"
+        print(f"{status} {module}: median {result['median_ms']:.1f} ms "
+              f"(min {result['min_ms']:.1f} ms, budget {budget_txt})")
+        if result["forbidden_imports"]:
+            print(f"   ⚠️ Heavy packages imported at startup: {', '.join(result['forbidden_imports'])}")
+        for name, ms in result["heaviest_self_ms"]:
+            print(f"   {ms:8.1f} ms  {name}")
+        failed = failed or over or bool(result["forbidden_imports"])
+
+    if args.json:
+        with open(args.json, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"timestamp": datetime.now().isoformat(), "results": results}) + "\n")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
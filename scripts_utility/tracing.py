@@ -0,0 +1,232 @@
+# scripts_utility/tracing.py
+"""
+Lightweight timing spans.
+
+Code marks its phases with
+
+    with span("fit", target="end_temp_f") as args:
+        ...
+        args["rows"] = len(X)     # optional extra fields
+
+Two ways to listen:
+  - `tracing()` activates a Tracer for the current context (thread / task);
+    it keeps every finished span and can write them as a Chrome trace
+    (chrome://tracing, Perfetto) or a speedscope file, or print a
+    per-phase breakdown (print_breakdown).
+  - `subscribe(callback)` calls callback(span) for every finished span in
+    any thread, e.g. to log slow predictions from the GUI or the daemon.
+With neither, `span` costs one context-variable lookup. Standard library
+only, so it is safe to import from main.py and the GUI at startup.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class Span:
+    name: str
+    start: float  # time.perf_counter() seconds
+    duration: float
+    args: Dict[str, Any] = field(default_factory=dict)
+    thread: int = 0
+
+    @property
+    def label(self) -> str:
+        """Name plus target, e.g. "fit end_temp_f"."""
+        target = self.args.get("target")
+        return f"{self.name} {target}" if target else self.name
+
+
+class Tracer:
+    """Collects finished spans; write() saves them for a trace viewer."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def record(self, s: Span) -> None:
+        with self._lock:
+            self.spans.append(s)
+
+    def totals(self) -> Dict[str, float]:
+        """Seconds per span name, summed over every occurrence."""
+        out: Dict[str, float] = {}
+        for s in self.spans:
+            out[s.name] = out.get(s.name, 0.0) + s.duration
+        return out
+
+    # ----------------------------
+    # Trace files
+    # ----------------------------
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Chrome trace event format: one complete ("X") event per span, in µs."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": s.label,
+                "cat": s.name,
+                "ph": "X",
+                "ts": round((s.start - self.origin) * 1e6, 1),
+                "dur": round(s.duration * 1e6, 1),
+                "pid": pid,
+                "tid": s.thread,
+                "args": {k: v for k, v in s.args.items() if isinstance(v, (str, int, float, bool, type(None)))},
+            }
+            for s in self.spans
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def speedscope(self, name: str = "RoastMaster") -> Dict[str, Any]:
+        """speedscope evented profile, one profile per thread."""
+        frames: Dict[str, int] = {}
+        profiles = []
+        for thread in sorted({s.thread for s in self.spans}):
+            events = []
+            for s in self.spans:
+                if s.thread != thread:
+                    continue
+                frame = frames.setdefault(s.label, len(frames))
+                start, end = s.start - self.origin, s.start - self.origin + s.duration
+                # At equal times: closes before opens, inner spans close first, outer open first
+                events.append((start, 1, -s.duration, "O", frame))
+                events.append((end, 0, -s.start, "C", frame))
+            events.sort(key=lambda e: e[:3])
+            profiles.append({
+                "type": "evented",
+                "name": f"{name} (thread {thread})",
+                "unit": "seconds",
+                "startValue": events[0][0] if events else 0.0,
+                "endValue": max((e[0] for e in events), default=0.0),
+                "events": [{"type": kind, "frame": frame, "at": at} for at, _, _, kind, frame in events],
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": label} for label in frames]},
+            "profiles": profiles,
+            "name": name,
+        }
+
+    def write(self, path: str) -> None:
+        """Speedscope file when the name ends in .speedscope.json, else a Chrome trace."""
+        data = self.speedscope() if str(path).endswith(".speedscope.json") else self.chrome_trace()
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+
+_current: ContextVar[Optional[Tracer]] = ContextVar("roastmaster_tracer", default=None)
+_subscribers: Tuple[Callable[[Span], None], ...] = ()
+_subscribers_lock = threading.Lock()
+
+
+def current_tracer() -> Optional[Tracer]:
+    return _current.get()
+
+
+def subscribe(callback: Callable[[Span], None]) -> Callable[[], None]:
+    """Call callback(span) for every finished span, in every thread. Returns an unsubscribe function."""
+    global _subscribers
+    with _subscribers_lock:
+        _subscribers = _subscribers + (callback,)
+
+    def unsubscribe() -> None:
+        global _subscribers
+        with _subscribers_lock:
+            _subscribers = tuple(cb for cb in _subscribers if cb is not callback)
+
+    return unsubscribe
+
+
+def log_slow_predictions(threshold_ms: float) -> Callable[[], None]:
+    """Print every infer_* span slower than threshold_ms, from any thread. Returns unsubscribe."""
+
+    def on_span(s: Span) -> None:
+        if s.name.startswith("infer_") and s.duration * 1000 >= threshold_ms:
+            rows = f", {s.args['rows']} rows" if "rows" in s.args else ""
+            print(f"🐢 Slow {s.name}: {s.duration * 1000:.1f} ms{rows}")
+
+    return subscribe(on_span)
+
+
+@contextmanager
+def tracing(tracer: Optional[Tracer] = None) -> Iterator[Tracer]:
+    """Record spans into `tracer` (a new one by default) inside the block."""
+    tracer = tracer if tracer is not None else Tracer()
+    token = _current.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str, **args) -> Iterator[Dict[str, Any]]:
+    """Time the block as `name`; yields the span's args dict for extra fields."""
+    tracer, subscribers = _current.get(), _subscribers
+    if tracer is None and not subscribers:
+        yield args
+        return
+    start = time.perf_counter()
+    try:
+        yield args
+    finally:
+        finished = Span(name, start, time.perf_counter() - start, args, threading.get_ident())
+        if tracer is not None:
+            tracer.record(finished)
+        for callback in subscribers:
+            try:
+                callback(finished)
+            except Exception as e:
+                # A broken listener must never break a prediction
+                print(f"⚠️ Trace subscriber failed: {e}")
+
+
+# ----------------------------
+# Per-phase breakdown
+# ----------------------------
+def breakdown(tracer: Tracer, root: str) -> Tuple[float, List[Tuple[str, int, float]]]:
+    """
+    (total seconds of the `root` spans, [(phase, calls, seconds)] in the order
+    phases first ran). Phases are every other span name.
+    """
+    total = sum(s.duration for s in tracer.spans if s.name == root)
+    phases: Dict[str, List[float]] = {}
+    for s in sorted(tracer.spans, key=lambda s: s.start):
+        if s.name != root:
+            phases.setdefault(s.name, []).append(s.duration)
+    return total, [(name, len(d), sum(d)) for name, d in phases.items()]
+
+
+def breakdown_line(tracer: Tracer, root: str) -> str:
+    """One line, e.g. "infer_core 12.3 ms: frame_build 2.1, predict 8.9 (21×)"."""
+    total, phases = breakdown(tracer, root)
+    parts = [f"{name} {sec * 1000:.1f}" + (f" ({calls}×)" if calls > 1 else "") for name, calls, sec in phases]
+    return f"{root} {total * 1000:.1f} ms: {', '.join(parts)}"
+
+
+def print_breakdown(tracer: Tracer, root: str, slowest: int = 5) -> None:
+    """Table of time per phase of the `root` span(s), plus the slowest per-target spans."""
+    total, phases = breakdown(tracer, root)
+    if not phases and not total:
+        print("⏱ No timing spans were recorded.")
+        return
+    print(f"\n⏱ {root}: {total * 1000:.1f} ms")
+    print(f"   {'phase':<18} {'calls':>5} {'ms':>9} {'share':>7}")
+    for name, calls, sec in phases:
+        share = f"{sec / total:.0%}" if total > 0 else ""
+        print(f"   {name:<18} {calls:>5} {sec * 1000:>9.2f} {share:>7}")
+    other = total - sum(sec for _, _, sec in phases)
+    if total > 0 and other > 0:
+        print(f"   {'other':<18} {'':>5} {other * 1000:>9.2f} {other / total:>7.0%}")
+
+    targeted = sorted((s for s in tracer.spans if s.args.get("target")), key=lambda s: s.duration, reverse=True)
+    if targeted:
+        top = ", ".join(f"{s.label} {s.duration * 1000:.2f}" for s in targeted[:slowest])
+        print(f"   slowest targets (ms): {top}")
@@ -0,0 +1,71 @@
+# tests/test_curve_model.py
+
+import numpy as np
+
+from scripts_utility.curve_model import CurveModel
+
+TIMES = np.array([0.0, 60.0, 150.0, 300.0, 420.0, 540.0, 600.0, 660.0, 720.0, 780.0])
+TEMPS = np.array([400.0, 210.0, 260.0, 300.0, 330.0, 360.0, 385.0, 400.0, 420.0, 440.0])
+
+
+def test_passes_through_every_point():
+    curves = CurveModel.fit(TIMES, TEMPS)
+    np.testing.assert_allclose(curves.temp_at_time(TIMES)[0], TEMPS)
+
+
+def test_never_overshoots_between_points():
+    curves = CurveModel.fit(TIMES, TEMPS)
+    for t0, t1, y0, y1 in zip(TIMES[:-1], TIMES[1:], TEMPS[:-1], TEMPS[1:]):
+        temps = curves.temp_at_time(np.linspace(t0, t1, 50))[0]
+        assert temps.min() >= min(y0, y1) - 1e-9
+        assert temps.max() <= max(y0, y1) + 1e-9
+
+
+def test_nan_outside_first_and_last_point():
+    curves = CurveModel.fit(TIMES, TEMPS)
+    assert np.isnan(curves.temp_at_time(-1.0)[0])
+    assert np.isnan(curves.temp_at_time(TIMES[-1] + 1.0)[0])
+
+
+def test_missing_points_are_skipped_and_order_does_not_matter():
+    times = TIMES.copy()
+    times[4] = np.nan
+    shuffled = np.random.default_rng(0).permutation(len(TIMES))
+    curves = CurveModel.fit(np.vstack([times, times[shuffled]]), np.vstack([TEMPS, TEMPS[shuffled]]))
+    assert list(curves.counts) == [9, 9]
+    query = np.linspace(0.0, TIMES[-1], 40)
+    temps = curves.temp_at_time(query)
+    np.testing.assert_allclose(temps[0], temps[1])
+
+
+def test_rows_with_fewer_than_two_points_are_nan():
+    times = np.array([[0.0, 60.0, 120.0], [0.0, np.nan, np.nan]])
+    temps = np.array([[400.0, 300.0, 350.0], [400.0, np.nan, np.nan]])
+    out = CurveModel.fit(times, temps).temp_at_time(30.0)
+    assert np.isfinite(out[0])
+    assert np.isnan(out[1])
+
+
+def test_time_at_temp_inverts_temp_at_time():
+    curves = CurveModel.fit(TIMES, TEMPS)
+    targets = np.array([250.0, 300.0, 385.0, 430.0])
+    times = curves.time_at_temp(targets)[0]
+    np.testing.assert_allclose(curves.temp_at_time(times)[0], targets, atol=1e-6)
+
+
+def test_time_at_temp_is_first_rise_and_nan_when_never_reached():
+    curves = CurveModel.fit(TIMES, TEMPS)
+    # 300 °F is passed on the way down from charge, but the first rise through it is at 300 s
+    assert abs(curves.time_at_temp(300.0)[0] - 300.0) < 1e-6
+    assert np.isnan(curves.time_at_temp(500.0)[0])
+
+
+def test_per_row_queries_and_sample():
+    curves = CurveModel.fit(np.vstack([TIMES, TIMES * 2]), np.vstack([TEMPS, TEMPS]))
+    out = curves.temp_at_time(np.array([[60.0], [120.0]]))
+    np.testing.assert_allclose(out[:, 0], [TEMPS[1], TEMPS[1]])
+
+    times, temps = curves.sample(16)
+    assert times.shape == temps.shape == (2, 16)
+    np.testing.assert_allclose(times[:, -1], [TIMES[-1], TIMES[-1] * 2])
+    np.testing.assert_allclose(temps[:, 0], TEMPS[0])
@@ -0,0 +1,95 @@
+# tests/test_derived_store.py
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from scripts_utility.derived_store import ensure_derived, load_derived
+
+
+class CountingCompute:
+    """Doubles column "a"; remembers which rows it was asked for."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, df: pd.DataFrame) -> pd.DataFrame:
+        self.calls.append(list(df["id"]))
+        return pd.DataFrame({"double_a": pd.to_numeric(df["a"]) * 2.0}, index=df.index)
+
+
+def _roasts():
+    return pd.DataFrame({"id": ["r1", "r2", "r3"], "a": [1.0, 2.0, 3.0], "b": ["x", "y", "z"]})
+
+
+def _ensure(roast_df, compute, path, **kw):
+    return ensure_derived(roast_df, "test", ["a"], ["double_a"], compute, path=path, **kw)
+
+
+def test_computes_once_then_reads_back(tmp_path):
+    path = tmp_path / "derived.csv"
+    compute = CountingCompute()
+    roast_df = _roasts()
+
+    first = _ensure(roast_df, compute, path)
+    assert list(first["double_a"]) == [2.0, 4.0, 6.0]
+    assert compute.calls == [["r1", "r2", "r3"]]
+    assert os.path.exists(path)
+
+    second = _ensure(roast_df, compute, path)
+    assert list(second["double_a"]) == [2.0, 4.0, 6.0]
+    assert len(compute.calls) == 1
+    assert list(second.index) == list(roast_df.index)
+
+
+def test_only_new_or_edited_rows_are_recomputed(tmp_path):
+    path = tmp_path / "derived.csv"
+    compute = CountingCompute()
+    _ensure(_roasts(), compute, path)
+
+    roast_df = _roasts()
+    roast_df.loc[1, "a"] = 10.0   # edited input
+    roast_df.loc[2, "b"] = "w"    # column the group does not read
+    roast_df = pd.concat([roast_df, pd.DataFrame({"id": ["r4"], "a": [4.0], "b": ["v"]})], ignore_index=True)
+
+    out = _ensure(roast_df, compute, path)
+    assert compute.calls[-1] == ["r2", "r4"]
+    assert list(out["double_a"]) == [2.0, 20.0, 6.0, 8.0]
+
+
+def test_version_change_recomputes_every_row(tmp_path):
+    path = tmp_path / "derived.csv"
+    compute = CountingCompute()
+    _ensure(_roasts(), compute, path, version="1")
+    _ensure(_roasts(), compute, path, version="1")
+    _ensure(_roasts(), compute, path, version="2")
+    assert compute.calls == [["r1", "r2", "r3"], ["r1", "r2", "r3"]]
+
+
+def test_save_false_leaves_the_store_untouched(tmp_path):
+    path = tmp_path / "derived.csv"
+    compute = CountingCompute()
+
+    out = _ensure(_roasts(), compute, path, save=False)
+    assert list(out["double_a"]) == [2.0, 4.0, 6.0]
+    assert not os.path.exists(path)
+
+    _ensure(_roasts(), compute, path)
+    before = load_derived(path)
+    edited = _roasts()
+    edited.loc[0, "a"] = 5.0
+    assert _ensure(edited, compute, path, save=False)["double_a"].iloc[0] == 10.0
+    pd.testing.assert_frame_equal(load_derived(path), before)
+
+
+def test_rows_without_id_are_recomputed_but_not_stored(tmp_path):
+    path = tmp_path / "derived.csv"
+    compute = CountingCompute()
+    roast_df = _roasts()
+    roast_df.loc[2, "id"] = np.nan  # blank id cell in the roast log
+
+    _ensure(roast_df, compute, path)
+    _ensure(roast_df, compute, path)
+    assert len(compute.calls) == 2 and len(compute.calls[-1]) == 1
+    assert sorted(load_derived(path).index) == ["r1", "r2"]
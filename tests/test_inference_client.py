@@ -0,0 +1,68 @@
+# tests/test_inference_client.py
+
+import socket
+import threading
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from scripts_main import inference_client
+from scripts_main.inference_client import decode_message, encode_message, request
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """One-shot daemon stand-in that answers a single request with `reply`."""
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    monkeypatch.setattr(inference_client, "INFERENCE_PORT", listener.getsockname()[1])
+
+    def start(reply: bytes):
+        def serve():
+            conn, _ = listener.accept()
+            with conn:
+                conn.makefile("rb").readline()
+                conn.sendall(reply)
+
+        threading.Thread(target=serve, daemon=True).start()
+
+    yield start
+    listener.close()
+
+
+def test_messages_round_trip_datetimes_and_numpy_scalars():
+    when = datetime(2025, 3, 1, 7, 30)
+    message = decode_message(encode_message({"when": when, "temp": np.float64(401.5)}))
+    assert message == {"when": when, "temp": 401.5}
+
+
+def test_result_from_the_server(server):
+    server(encode_message({"ok": True, "result": "pong"}))
+    assert request("ping") == "pong"
+
+
+def test_server_error_returns_none(server, capsys):
+    server(encode_message({"ok": False, "error": "no models"}))
+    assert request("infer_core", {}) is None
+    assert "no models" in capsys.readouterr().out
+
+
+def test_garbled_reply_returns_none(server):
+    server(b"not json\n")
+    assert request("ping") is None
+
+
+def test_unserializable_inputs_return_none(server):
+    server(b"")
+    assert request("infer_core", {"bean": object()}) is None
+
+
+def test_no_daemon_returns_none(monkeypatch):
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    monkeypatch.setattr(inference_client, "INFERENCE_PORT", port)
+    assert request("ping") is None
@@ -0,0 +1,82 @@
+# tests/test_model_evaluation.py
+
+import numpy as np
+import pandas as pd
+
+from scripts_main.model_evaluation import (
+    MIN_VALIDATION_ROWS,
+    VALIDATION_FRACTION,
+    kfold_splits,
+    rolling_origin_splits,
+    validation_split,
+)
+
+
+def _dates(n: int, seed: int = 0) -> pd.Series:
+    days = np.random.default_rng(seed).permutation(n)
+    return pd.Series(pd.Timestamp("2024-01-01") + pd.to_timedelta(days, unit="D"))
+
+
+def test_kfold_tests_every_row_exactly_once():
+    splits = kfold_splits(23, folds=5)
+    assert len(splits) == 5
+    tested = np.concatenate([test for _, test in splits])
+    assert sorted(tested) == list(range(23))
+    for train, test in splits:
+        assert not set(train) & set(test)
+        assert len(train) + len(test) == 23
+
+
+def test_kfold_uses_fewer_folds_for_small_targets():
+    assert len(kfold_splits(6, folds=5)) == 3
+    assert kfold_splits(3, folds=5) == []
+
+
+def test_rolling_origin_trains_only_on_older_roasts():
+    dates = _dates(30)
+    splits = rolling_origin_splits(dates, folds=4)
+    assert len(splits) == 4
+    for train, test in splits:
+        assert dates.iloc[train].max() < dates.iloc[test].min()
+    # The training window grows; the last fold tests the newest roasts
+    assert [len(train) for train, _ in splits] == sorted(len(train) for train, _ in splits)
+    assert dates.iloc[splits[-1][1]].max() == dates.max()
+
+
+def test_rolling_origin_leaves_out_undated_rows():
+    dates = _dates(20).astype(object)
+    dates.iloc[[3, 7]] = None
+    splits = rolling_origin_splits(dates, folds=3)
+    used = set(np.concatenate([np.concatenate([train, test]) for train, test in splits]))
+    assert not used & {3, 7}
+    assert rolling_origin_splits(pd.Series([None] * 10), folds=3) == []
+
+
+def test_validation_split_holds_out_the_newest_roasts():
+    n = 40
+    dates = _dates(n)
+    train, valid = validation_split(n, dates)
+    assert len(valid) == int(round(n * VALIDATION_FRACTION))
+    assert sorted(np.concatenate([train, valid])) == list(range(n))
+    assert dates.iloc[train].max() < dates.iloc[valid].min()
+
+
+def test_validation_split_keeps_undated_rows_in_training():
+    n = 40
+    dates = _dates(n).astype(object)
+    dates.iloc[[0, 5]] = None
+    train, valid = validation_split(n, dates)
+    assert {0, 5} <= set(train)
+
+
+def test_validation_split_without_dates_is_random_and_reproducible():
+    train, valid = validation_split(50)
+    again = validation_split(50)
+    np.testing.assert_array_equal(valid, again[1])
+    assert valid.tolist() != list(range(40, 50))
+    assert sorted(np.concatenate([train, valid])) == list(range(50))
+
+
+def test_validation_split_is_none_for_small_targets():
+    too_small = int(np.ceil((MIN_VALIDATION_ROWS - 0.5) / VALIDATION_FRACTION)) - 1
+    assert validation_split(too_small) is None
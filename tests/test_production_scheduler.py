@@ -0,0 +1,69 @@
+# tests/test_production_scheduler.py
+
+import numpy as np
+import pytest
+
+from scripts_main.production_scheduler import (
+    _best_relocation,
+    _best_two_opt,
+    improve_order,
+    nearest_neighbour,
+    path_cost,
+)
+
+
+def _instance(n: int, seed: int):
+    """Asymmetric changeover costs and start costs."""
+    rng = np.random.default_rng(seed)
+    cost = rng.uniform(60.0, 600.0, size=(n, n))
+    np.fill_diagonal(cost, 0.0)
+    start = rng.uniform(0.0, 900.0, size=n)
+    order = rng.permutation(n)
+    return cost, start, order
+
+
+@pytest.mark.parametrize("n, seed", [(2, 0), (3, 1), (6, 2), (9, 3)])
+def test_two_opt_delta_matches_the_best_reversal(n, seed):
+    cost, start, order = _instance(n, seed)
+    base = path_cost(order, cost, start)
+    deltas = {}
+    for i in range(n):
+        for j in range(i + 1, n):
+            moved = order.copy()
+            moved[i:j + 1] = moved[i:j + 1][::-1]
+            deltas[(i, j)] = path_cost(moved, cost, start) - base
+
+    delta, i, j = _best_two_opt(order, cost, start)
+    assert delta == pytest.approx(min(deltas.values()))
+    assert deltas[(i, j)] == pytest.approx(delta)
+
+
+@pytest.mark.parametrize("n, seed", [(2, 0), (3, 1), (6, 2), (9, 3)])
+def test_relocation_delta_matches_the_best_move(n, seed):
+    cost, start, order = _instance(n, seed)
+    base = path_cost(order, cost, start)
+    deltas = {}
+    for a in range(n):
+        rest = np.delete(order, a)
+        for q in range(n):
+            deltas[(a, q)] = path_cost(np.insert(rest, q, order[a]), cost, start) - base
+
+    delta, a, q = _best_relocation(order, cost, start)
+    best = min(deltas.values())
+    if best < 0:
+        assert delta == pytest.approx(best)
+        assert deltas[(a, q)] == pytest.approx(delta)
+    else:
+        assert (delta, a, q) == (0.0, -1, -1)
+
+
+def test_improve_order_keeps_every_job_and_never_gets_worse():
+    cost, start, _ = _instance(12, 4)
+    first = nearest_neighbour(cost, start)
+    improved = improve_order(first, cost, start, time_budget_sec=5.0)
+    assert sorted(improved) == list(range(12))
+    assert path_cost(improved, cost, start) <= path_cost(first, cost, start) + 1e-9
+
+    # Local optimum: no single move helps any more
+    assert _best_two_opt(improved, cost, start)[0] >= -1e-9
+    assert _best_relocation(improved, cost, start)[0] >= -1e-9
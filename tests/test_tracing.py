@@ -0,0 +1,126 @@
+# tests/test_tracing.py
+
+import json
+import threading
+
+from scripts_utility.tracing import (
+    Tracer,
+    breakdown,
+    breakdown_line,
+    current_tracer,
+    log_slow_predictions,
+    span,
+    subscribe,
+    tracing,
+)
+
+
+def test_span_without_listeners_is_a_no_op():
+    assert current_tracer() is None
+    with span("fit", target="end_temp_f") as args:
+        args["rows"] = 3
+    assert args == {"target": "end_temp_f", "rows": 3}
+
+
+def test_tracing_records_nested_spans_with_args():
+    with tracing() as tracer:
+        with span("infer_core"):
+            with span("frame_build") as args:
+                args["rows"] = 1
+            for target in ("end_temp_f", "stage_9_time_sec"):
+                with span("predict", target=target):
+                    pass
+    assert current_tracer() is None
+    assert [s.name for s in tracer.spans] == ["frame_build", "predict", "predict", "infer_core"]
+    assert tracer.spans[0].args == {"rows": 1}
+    assert tracer.spans[1].label == "predict end_temp_f"
+
+    total, phases = breakdown(tracer, "infer_core")
+    assert total == tracer.spans[-1].duration
+    assert [(name, calls) for name, calls, _ in phases] == [("frame_build", 1), ("predict", 2)]
+    assert breakdown_line(tracer, "infer_core").startswith("infer_core ")
+    assert "(2×)" in breakdown_line(tracer, "infer_core")
+
+
+def _span_in_thread(name: str) -> None:
+    def run():
+        with span(name):
+            pass
+
+    worker = threading.Thread(target=run)
+    worker.start()
+    worker.join()
+
+
+def test_tracer_is_per_thread():
+    with tracing() as tracer:
+        _span_in_thread("elsewhere")
+        with span("here"):
+            pass
+    assert [s.name for s in tracer.spans] == ["here"]
+
+
+def test_subscribers_see_every_thread_until_unsubscribed():
+    seen = []
+    unsubscribe = subscribe(lambda s: seen.append(s.name))
+    try:
+        _span_in_thread("in_thread")
+        with span("in_main"):
+            pass
+    finally:
+        unsubscribe()
+    with span("after"):
+        pass
+    assert seen == ["in_thread", "in_main"]
+
+
+def test_broken_subscriber_never_breaks_the_span(capsys):
+    def broken(_):
+        raise RuntimeError("boom")
+
+    unsubscribe = subscribe(broken)
+    try:
+        with span("predict"):
+            value = 42
+    finally:
+        unsubscribe()
+    assert value == 42
+    assert "Trace subscriber failed: boom" in capsys.readouterr().out
+
+
+def test_log_slow_predictions_only_reports_infer_spans(capsys):
+    unsubscribe = log_slow_predictions(0.0)
+    try:
+        with span("infer_scout") as args:
+            args["rows"] = 7
+        with span("fit"):
+            pass
+    finally:
+        unsubscribe()
+    out = capsys.readouterr().out
+    assert "Slow infer_scout" in out and "7 rows" in out
+    assert "fit" not in out
+
+
+def test_trace_files(tmp_path):
+    tracer = Tracer()
+    with tracing(tracer):
+        with span("infer_core"):
+            with span("predict", target="end_temp_f", model=object()):
+                pass
+
+    chrome_path = tmp_path / "trace.json"
+    tracer.write(str(chrome_path))
+    events = json.loads(chrome_path.read_text())["traceEvents"]
+    assert [e["name"] for e in events] == ["predict end_temp_f", "infer_core"]
+    assert all(e["ph"] == "X" for e in events)
+    assert events[0]["args"] == {"target": "end_temp_f"}  # non-JSON args are dropped
+
+    speedscope_path = tmp_path / "trace.speedscope.json"
+    tracer.write(str(speedscope_path))
+    data = json.loads(speedscope_path.read_text())
+    (profile,) = data["profiles"]
+    kinds = [e["type"] for e in profile["events"]]
+    assert kinds == ["O", "O", "C", "C"]
+    frames = [f["name"] for f in data["shared"]["frames"]]
+    assert frames[profile["events"][0]["frame"]] == "infer_core"